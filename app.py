@@ -1,14 +1,43 @@
-from flask import Flask, request, jsonify, session, send_from_directory, redirect, url_for
+from flask import Flask, Response, g, has_request_context, request, jsonify, session, send_from_directory, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.dml import UpdateBase
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import click
+import cProfile
+import csv
+import hashlib
+import json
+import math
+import mmap
+import numpy as np
 import os
+import pstats
+import queue
+import random
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
 from functools import wraps
 from dotenv import load_dotenv
 from authlib.integrations.flask_client import OAuth
 import secrets
+import socket
+
+try:
+    import fcntl
+except ImportError:  # Windows: the schema lock is skipped
+    fcntl = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,6 +45,12 @@ load_dotenv()
 app = Flask(__name__, static_folder='frontend/build', static_url_path='')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 
+# Proxies in front of the app (Render's router by default). remote_addr is then
+# the client from X-Forwarded-For rather than the proxy; 0 when serving directly.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '1'))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS, x_proto=TRUSTED_PROXY_HOPS)
+
 # Session configuration - CRITICAL for OAuth
 app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
 app.config['SESSION_COOKIE_HTTPONLY'] = True
@@ -65,6 +100,49 @@ if 'supabase.co' in DATABASE_URL:
             'sslmode': 'require'
         }
     }
+# Cooperative serving mode. Under `gunicorn --worker-class gevent` every request
+# runs in a greenlet, so a worker keeps serving while others wait on Postgres or
+# on Google's token endpoint. psycopg2 must be told to yield while it waits, and
+# per-connection caches must stay per OS thread rather than per greenlet.
+try:
+    from gevent import monkey as gevent_monkey
+    GREEN_WORKERS = gevent_monkey.is_module_patched('socket')
+except ImportError:
+    GREEN_WORKERS = False
+
+if GREEN_WORKERS:
+    ThreadLocal = gevent_monkey.get_original('threading', 'local')
+    
+    def gevent_wait_callback(conn, timeout=None):
+        from gevent.socket import wait_read, wait_write
+        from psycopg2 import OperationalError, extensions
+        while True:
+            state = conn.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                wait_read(conn.fileno(), timeout=timeout)
+            elif state == extensions.POLL_WRITE:
+                wait_write(conn.fileno(), timeout=timeout)
+            else:
+                raise OperationalError(f'Bad result from poll: {state!r}')
+    
+    if DATABASE_URL.startswith('postgresql://'):
+        from psycopg2 import extensions
+        extensions.set_wait_callback(gevent_wait_callback)
+        # Greenlets queue for pooled connections instead of opening one each
+        engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        engine_options.setdefault('pool_size', int(os.environ.get('DB_POOL_SIZE', 10)))
+        engine_options.setdefault('max_overflow', int(os.environ.get('DB_MAX_OVERFLOW', 20)))
+    print("🟢 Serving with gevent workers")
+else:
+    ThreadLocal = threading.local
+
+# Requests one worker runs at once: greenlets under gevent, threads otherwise.
+# The Dockerfile passes gunicorn these same variables.
+WORKER_CONCURRENCY = int(os.environ['GUNICORN_WORKER_CONNECTIONS'] if GREEN_WORKERS and 'GUNICORN_WORKER_CONNECTIONS' in os.environ
+                         else os.environ.get('GUNICORN_THREADS', 1000 if GREEN_WORKERS else 8))
+
 app.config['UPLOAD_FOLDER'] = 'uploads'
 
 # Create uploads directory if it doesn't exist
@@ -123,6 +201,46 @@ class WorkLog(db.Model):
     status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
     approved_by_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True, info={'backfill_from': 'created_at'})
+    
+    __table_args__ = (
+        db.Index('ix_work_log_volunteer_updated', 'volunteer_id', 'updated_at'),
+        db.Index('ix_work_log_volunteer_date', 'volunteer_id', 'date'),
+        db.Index('ix_work_log_status_date', 'status', 'date'),
+        db.Index('ix_work_log_date', 'date'),
+        # Approval inbox: only pending rows, oldest first
+        db.Index('ix_work_log_pending', 'created_at', 'id',
+                 postgresql_where=db.text("status = 'pending'"), sqlite_where=db.text("status = 'pending'")),
+        # Archived logs keep their id, so SQLite must never hand it out again
+        {'sqlite_autoincrement': True},
+    )
+
+class ArchivedWorkLog(db.Model):
+    """Approved work logs moved out of work_log once older than the archive horizon"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Original WorkLog id
+    volunteer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    hours_worked = db.Column(db.Float, nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='approved')
+    approved_by_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    volunteer = db.relationship('User', foreign_keys=[volunteer_id])
+    
+    __table_args__ = (
+        db.Index('ix_archived_work_log_volunteer_date', 'volunteer_id', 'date'),
+        db.Index('ix_archived_work_log_date', 'date'),
+    )
+
+class WorkLogArchiveRollup(db.Model):
+    """Per-volunteer totals of archived work logs, so hour totals skip the archive"""
+    id = db.Column(db.Integer, primary_key=True)
+    volunteer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True)
+    hours = db.Column(db.Float, nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
 
 class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -140,6 +258,13 @@ class TeamMember(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     role = db.Column(db.String(50), default='member')  # leader, member
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True, info={'backfill_from': 'joined_at'})
+    
+    __table_args__ = (
+        db.Index('ix_team_member_team_updated', 'team_id', 'updated_at'),
+        db.Index('unique_team_member', 'team_id', 'user_id', unique=True,
+                 info={'dedupe': True, 'dedupe_prefer': ('role', 'leader')}),
+    )
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -153,36 +278,16 @@ class Project(db.Model):
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True, info={'backfill_from': 'created_at'})
     
-    updates = db.relationship('ProjectUpdate', backref='project', lazy=True, cascade='all, delete-orphan')
+    __table_args__ = (
+        db.Index('ix_project_volunteer_updated', 'volunteer_id', 'updated_at'),
+        db.Index('ix_project_team_updated', 'team_id', 'updated_at'),
+        db.Index('ix_project_submitted', 'created_at', 'id',
+                 postgresql_where=db.text("status = 'submitted'"), sqlite_where=db.text("status = 'submitted'")),
+    )
     
-    def can_be_deleted_by(self, user_id):
-        """Check if project can be deleted by user"""
-        # Only creator can delete
-        if self.volunteer_id != user_id:
-            return False, "Only project creator can delete this project"
-        
-        # Check for team member work logs if it's a team project
-        if self.team_id:
-            team_members = TeamMember.query.filter_by(team_id=self.team_id).all()
-            member_ids = [m.user_id for m in team_members if m.user_id != user_id]
-            
-            if member_ids:
-                existing_logs = WorkLog.query.filter(
-                    WorkLog.volunteer_id.in_(member_ids)
-                ).join(Document, Document.work_log_id == WorkLog.id, isouter=True).filter(
-                    Document.project_id == self.id
-                ).first()
-                
-                if existing_logs:
-                    return False, "Cannot delete project with team member work logs"
-        
-        # Check for any work logs associated with this project
-        project_logs = WorkLog.query.join(Document).filter(Document.project_id == self.id).first()
-        if project_logs:
-            return False, "Cannot delete project with associated work logs"
-        
-        return True, "Project can be deleted"
+    updates = db.relationship('ProjectUpdate', backref='project', lazy=True, cascade='all, delete-orphan')
 
 class ProjectUpdate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -191,6 +296,9 @@ class ProjectUpdate(db.Model):
     description = db.Column(db.Text, nullable=False)
     created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True, info={'backfill_from': 'created_at'})
+    
+    __table_args__ = (db.Index('ix_project_update_project_updated', 'project_id', 'updated_at'),)
 
 class Document(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -201,6 +309,7 @@ class Document(db.Model):
     work_log_id = db.Column(db.Integer, db.ForeignKey('work_log.id'))
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True, info={'backfill_from': 'created_at'})
     
     # Team access relationship
     team_access = db.relationship('DocumentTeamAccess', backref='document', lazy=True, cascade='all, delete-orphan')
@@ -214,6 +323,146 @@ class DocumentTeamAccess(db.Model):
     # Ensure unique document-team combinations
     __table_args__ = (db.UniqueConstraint('document_id', 'team_id', name='unique_document_team'),)
 
+class SyncTombstone(db.Model):
+    """Deleted rows, kept so the sync feed can tell clients what to drop"""
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(30), nullable=False)  # work_logs, projects, documents, team_members, project_updates
+    entity_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)  # Owner of the deleted row (None = visible to everyone)
+    team_id = db.Column(db.Integer)  # Team the deleted row was shared through
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class StreamEvent(db.Model):
+    """Outbox of server-sent events; the ID doubles as the stream sequence number"""
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)  # work_log.created, work_log.approved, project.submitted, ...
+    user_id = db.Column(db.Integer)  # Volunteer the event is about
+    team_id = db.Column(db.Integer)  # Team the event is about, if any
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class CacheInvalidation(db.Model):
+    """Outbox of committed cache tag invalidations; the ID is the bus sequence number"""
+    id = db.Column(db.Integer, primary_key=True)
+    origin = db.Column(db.String(64), nullable=False)  # Worker that committed the write
+    tags = db.Column(db.Text, nullable=False)  # JSON list of table names
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class IdempotencyKey(db.Model):
+    """First response to a request sent with an Idempotency-Key header, replayed for retries"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    endpoint = db.Column(db.String(100), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)  # Null while the first request is still running
+    locked_until = db.Column(db.DateTime)  # A running request past this is presumed dead
+    response_body = db.Column(db.Text)
+    mimetype = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    __table_args__ = (db.UniqueConstraint('user_id', 'key', name='unique_idempotency_key'),)
+
+class Event(db.Model):
+    """A drive or session many volunteers attend; closing it logs everyone's hours"""
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    location = db.Column(db.String(200))
+    date = db.Column(db.Date, nullable=False)
+    hours = db.Column(db.Float, nullable=False)  # Credited to each attendee unless overridden
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'))
+    created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(20), default='open')  # open, closed
+    closed_by_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    closed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    attendees = db.relationship('EventAttendee', backref='event', lazy=True)
+
+class EventAttendee(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    hours = db.Column(db.Float)  # Overrides the event's hours for this attendee
+    checked_in_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('unique_event_attendee', 'event_id', 'user_id', unique=True, info={'dedupe': True}),
+    )
+
+class HourBucket(db.Model):
+    """Work log hours pre-aggregated per volunteer, status and day/week/month"""
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)  # day, week, month
+    bucket_start = db.Column(db.Date, nullable=False)  # Day, Monday of the week, or first of the month
+    volunteer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    hours = db.Column(db.Float, nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('period', 'bucket_start', 'volunteer_id', 'status', name='unique_hour_bucket'),
+        db.Index('ix_hour_bucket_volunteer', 'volunteer_id', 'period', 'bucket_start'),
+    )
+
+class LeaderboardScore(db.Model):
+    """Approved hours per volunteer for the all-time, yearly and monthly leaderboards"""
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)  # all, year, month
+    period_start = db.Column(db.Date, nullable=False)  # First day of the year/month, date.min for all-time
+    volunteer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    hours = db.Column(db.Float, nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('period', 'period_start', 'volunteer_id', name='unique_leaderboard_score'),
+        db.Index('ix_leaderboard_score_rank', 'period', 'period_start', 'hours'),
+    )
+
+class PendingApprovalCount(db.Model):
+    """Items awaiting review per kind (work_log, project) and team; team_id 0 is the total"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    team_id = db.Column(db.Integer, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (db.UniqueConstraint('kind', 'team_id', name='unique_pending_approval_count'),)
+
+class ApprovalClaim(db.Model):
+    """A reviewer's lease on a pending item so two reviewers don't pick up the same one"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    item_id = db.Column(db.Integer, nullable=False)
+    reviewer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    claimed_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'item_id', name='unique_approval_claim'),
+        db.Index('ix_approval_claim_reviewer', 'reviewer_id', 'kind'),
+    )
+
+class BackgroundJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)  # export_work_logs, team_report, import_volunteers, delete_team
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed, cancelled
+    params = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    progress = db.Column(db.Integer, nullable=False, default=0)  # 0-100
+    progress_message = db.Column(db.String(200))
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    claimed_by = db.Column(db.String(100))  # Claim token of the worker running it; a requeue hands out a new one
+    finished_at = db.Column(db.DateTime)
+    
+    __table_args__ = (db.Index('ix_background_job_status_id', 'status', 'id'),)
+
 # Authentication decorator
 def login_required(f):
     @wraps(f)
@@ -246,6 +495,1246 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Health, readiness and load shedding. /healthz only says the process is up;
+# /readyz tells the load balancer whether to route traffic here, based on pool
+# headroom, database round-trip time and whether the schema is up to date.
+READY_DB_LATENCY_BUDGET_MS = float(os.environ.get('READY_DB_LATENCY_BUDGET_MS', 250))
+READY_MIN_POOL_HEADROOM = int(os.environ.get('READY_MIN_POOL_HEADROOM', 1))
+READY_CACHE_SECONDS = float(os.environ.get('READY_CACHE_SECONDS', 2))
+SCHEMA_CHECK_SECONDS = 300  # The schema only changes on deploy; inspect it rarely
+# Requests (API calls and open streams) a worker may hold at once before
+# refusing more; 0 sizes it to WORKER_CONCURRENCY less SHED_RESERVED_SLOTS,
+# which stay free for health probes, and to no more than the connection pool
+# plus SHED_QUEUE_ALLOWANCE requests waiting for a connection
+SHED_INFLIGHT_LIMIT = int(os.environ.get('SHED_INFLIGHT_LIMIT', 0))
+SHED_RESERVED_SLOTS = 1
+SHED_QUEUE_ALLOWANCE = 32
+SHED_EXEMPT_ENDPOINTS = {'healthz', 'readyz', 'stream_events'}
+
+inflight = {'count': 0, 'lock': threading.Lock()}
+
+def pool_status():
+    """Connections checked out and total capacity of the engine's pool (None if unbounded)"""
+    pool = db.engine.pool
+    if not hasattr(pool, 'checkedout') or not hasattr(pool, 'size'):
+        return {'checked_out': None, 'capacity': None, 'headroom': None}
+    max_overflow = getattr(pool, '_max_overflow', 0)
+    capacity = None if max_overflow < 0 else pool.size() + max_overflow
+    checked_out = pool.checkedout()
+    return {
+        'checked_out': checked_out,
+        'capacity': capacity,
+        'headroom': None if capacity is None else capacity - checked_out
+    }
+
+def missing_schema_objects():
+    """Tables, columns and indexes the models declare but the database lacks.
+    
+    Mirrors what db.create_all() and upgrade_schema() would add.
+    """
+    inspector = db.inspect(db.engine)
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            missing.append(f'table {table.name}')
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(f'column {table.name}.{column.name}' for column in table.columns if column.name not in existing)
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(f'index {index.name}' for index in table.indexes if index.name not in existing_indexes)
+    return missing
+
+class ReadinessProbe:
+    """Runs the readiness checks at most once per READY_CACHE_SECONDS.
+    
+    Concurrent probes while a check is running get the previous result rather
+    than queueing behind a slow database.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.result = None
+        self.checked_at = 0
+        self.schema = None
+        self.schema_checked_at = 0
+    
+    def check(self):
+        now = time.monotonic()
+        if self.result is not None and now - self.checked_at < READY_CACHE_SECONDS:
+            return self.result
+        if not self.lock.acquire(blocking=self.result is None):
+            return self.result
+        try:
+            self.result = self.run_checks()
+            self.checked_at = time.monotonic()
+            return self.result
+        finally:
+            self.lock.release()
+    
+    def run_checks(self):
+        checks = {}
+        failing = []
+        
+        pool = pool_status()
+        checks['pool'] = pool
+        if pool['headroom'] is not None and pool['headroom'] < READY_MIN_POOL_HEADROOM:
+            failing.append('pool')
+        
+        if 'pool' in failing:
+            # Waiting for a connection would only measure the queue
+            checks['database'] = {'latency_ms': None, 'budget_ms': READY_DB_LATENCY_BUDGET_MS}
+        else:
+            try:
+                with db.engine.connect() as conn:
+                    # Time the round trip only; opening a connection is not query latency
+                    started = time.perf_counter()
+                    conn.execute(db.text('SELECT 1'))
+                    latency = (time.perf_counter() - started) * 1000
+                checks['database'] = {'latency_ms': round(latency, 1), 'budget_ms': READY_DB_LATENCY_BUDGET_MS}
+                if latency > READY_DB_LATENCY_BUDGET_MS:
+                    failing.append('database')
+            except Exception as e:
+                checks['database'] = {'error': str(e), 'budget_ms': READY_DB_LATENCY_BUDGET_MS}
+                failing.append('database')
+        
+        if 'database' not in failing and (
+            self.schema is None or time.monotonic() - self.schema_checked_at > SCHEMA_CHECK_SECONDS
+        ):
+            try:
+                self.schema = missing_schema_objects()
+                self.schema_checked_at = time.monotonic()
+            except Exception as e:
+                self.schema = [f'inspection failed: {e}']
+        checks['schema'] = {'missing': self.schema}
+        if self.schema:
+            failing.append('schema')
+        
+        return {'status': 'not_ready' if failing else 'ready', 'failing': failing, 'checks': checks}
+
+readiness_probe = ReadinessProbe()
+
+def inflight_limit():
+    if SHED_INFLIGHT_LIMIT:
+        return SHED_INFLIGHT_LIMIT
+    limit = WORKER_CONCURRENCY - SHED_RESERVED_SLOTS
+    capacity = pool_status()['capacity']
+    return limit if capacity is None else min(limit, capacity + SHED_QUEUE_ALLOWANCE)
+
+@app.before_request
+def shed_load():
+    """Refuse API requests with 503 once this worker holds more than it can serve"""
+    if not request.path.startswith('/api/') or request.endpoint in SHED_EXEMPT_ENDPOINTS:
+        return
+    limit = inflight_limit()
+    with inflight['lock']:
+        # Open streams hold a thread or greenlet too
+        if inflight['count'] + open_streams['count'] >= limit:
+            overloaded = True
+        else:
+            overloaded = False
+            inflight['count'] += 1
+            g.inflight = True
+    if overloaded:
+        response = jsonify({'error': 'Server is busy, please retry shortly', 'retry_after': 1})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+@app.teardown_request
+def release_inflight(exc):
+    if g.pop('inflight', False):
+        with inflight['lock']:
+            inflight['count'] -= 1
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving; never touches the database"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: 503 while the pool is exhausted, the database is over its
+    latency budget or the schema is behind the models"""
+    result = dict(readiness_probe.check(), inflight=inflight['count'], open_streams=open_streams['count'],
+                  inflight_limit=inflight_limit())
+    return jsonify(result), 200 if result['status'] == 'ready' else 503
+
+# Rate limiting and admission control. Token buckets are kept in each worker
+# and reconciled through a small SQLite file every RATE_LIMIT_SYNC_SECONDS, so
+# every gunicorn worker on the host converges on one budget without a write
+# per request. Concurrency slots must be exact and live in the file.
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() != 'false'
+RATE_LIMIT_DB = os.environ.get('RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'akshar-paaul-vms-ratelimit.sqlite3'))
+RATE_LIMIT_SYNC_SECONDS = float(os.environ.get('RATE_LIMIT_SYNC_SECONDS', '1'))
+
+# (burst, tokens per second) for each signed-in user, or IP address, across the API
+USER_RATE_LIMIT = (120, 2.0)
+
+# Extra per-user buckets for endpoints that are cheap to flood
+ROUTE_RATE_LIMITS = {
+    'login': (10, 10 / 60),
+    'register': (5, 5 / 60),
+    'google_login': (10, 10 / 60),
+    'search_users': (10, 2.0),
+    'upload_document': (20, 20 / 60),
+    'create_work_log': (30, 30 / 60),
+    'bulk_team_members': (10, 10 / 60),
+    'create_job': (10, 10 / 60),
+    'event_check_in': (5, 5 / 60),
+}
+
+# Requests allowed to run at once, across all workers, for expensive endpoints
+CONCURRENCY_LIMITS = {
+    'get_team_all_work_logs': 4,
+    'get_team_pending_approvals': 4,
+    'get_unassigned_work_logs': 2,
+    'get_unassigned_projects': 2,
+    'get_unassigned_volunteers': 2,
+    'sync_changes': 4,
+    'hours_report': 2,
+    'get_team_leaderboard': 2,
+}
+# Requests each user may run at once. Every dashboard loads the work log list,
+# so it is capped per user rather than sharing one host-wide pool
+USER_CONCURRENCY_LIMITS = {
+    'get_work_logs': 2,
+}
+CONCURRENCY_SLOT_TTL = 120  # Seconds before a slot left by a crashed worker is reclaimed
+
+class RateLimitStore:
+    """Token buckets and concurrency slots in a SQLite file shared by local workers"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.local = ThreadLocal()
+        self.pruned_at = 0
+    
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS slot (id INTEGER PRIMARY KEY, key TEXT NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_slot_key ON slot (key, expires)')
+            self.local.conn = conn
+        return conn
+    
+    def transaction(self, work):
+        conn = self.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = work(conn, time.time())
+            conn.execute('COMMIT')
+            return result
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    
+    def peek(self, buckets):
+        """Levels of (key, burst, rate) buckets, read without taking the write lock"""
+        conn = self.connect()
+        now = time.time()
+        levels = {}
+        for key, burst, rate in buckets:
+            row = conn.execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+            levels[key] = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+        return levels
+    
+    def merge(self, spent):
+        """Deduct tokens spent elsewhere from shared (key, count, burst, rate) buckets.
+        
+        Returns {key: tokens left} after the deduction. A bucket may go below
+        zero when workers overspent between syncs; it then refills from there.
+        """
+        def work(conn, now):
+            levels = {}
+            for key, count, burst, rate in spent:
+                row = conn.execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+                tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+                levels[key] = tokens - count
+            conn.executemany(
+                'INSERT INTO bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                [(key, tokens, now) for key, tokens in levels.items()]
+            )
+            if now - self.pruned_at > 300:
+                # Buckets idle for an hour are full again; forget them
+                conn.execute('DELETE FROM bucket WHERE updated < ?', (now - 3600,))
+                self.pruned_at = now
+            return levels
+        return self.transaction(work)
+    
+    def acquire(self, key, limit):
+        """Take a concurrency slot for key; returns its id, or None when all are in use"""
+        def work(conn, now):
+            conn.execute('DELETE FROM slot WHERE key = ? AND expires < ?', (key, now))
+            in_use = conn.execute('SELECT COUNT(*) FROM slot WHERE key = ?', (key,)).fetchone()[0]
+            if in_use >= limit:
+                return None
+            return conn.execute('INSERT INTO slot (key, expires) VALUES (?, ?)', (key, now + CONCURRENCY_SLOT_TTL)).lastrowid
+        return self.transaction(work)
+    
+    def release(self, slot_id):
+        self.connect().execute('DELETE FROM slot WHERE id = ?', (slot_id,))
+
+rate_limit_store = RateLimitStore(RATE_LIMIT_DB)
+
+class LocalTokenBuckets:
+    """This worker's view of the shared token buckets.
+    
+    Requests are admitted against the in-process level; a bucket this worker
+    has not seen yet starts from the shared level. At most once per interval,
+    one request pushes what this worker spent since the last sync into the
+    shared store, without waiting for another thread already doing so, and
+    adopts the merged levels. Workers can overspend a bucket by what they
+    take in one interval.
+    """
+    
+    def __init__(self, store, interval=RATE_LIMIT_SYNC_SECONDS):
+        self.store = store
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.buckets = {}  # key -> [tokens, updated, burst, rate]
+        self.spent = {}
+        self.synced_at = 0.0
+    
+    def take(self, buckets):
+        """Take a token from every (key, burst, rate) bucket, or from none.
+        
+        Returns 0 when admitted, otherwise the seconds until a token is free.
+        """
+        missing = [bucket for bucket in buckets if bucket[0] not in self.buckets]
+        shared = self.store.peek(missing) if missing else {}
+        now = time.time()
+        with self.lock:
+            wait = 0
+            levels = []
+            for key, burst, rate in buckets:
+                entry = self.buckets.get(key)
+                tokens = shared.get(key, burst) if entry is None else min(burst, entry[0] + (now - entry[1]) * rate)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+                levels.append((key, tokens, burst, rate))
+            if not wait:
+                for key, tokens, burst, rate in levels:
+                    self.buckets[key] = [tokens - 1, now, burst, rate]
+                    self.spent[key] = self.spent.get(key, 0) + 1
+        
+        if now - self.synced_at >= self.interval and self.sync_lock.acquire(blocking=False):
+            try:
+                self.sync(now)
+            except sqlite3.Error as e:
+                # Fail open: the spend is forgotten rather than failing the request
+                print(f"⚠️ Rate limit sync failed: {str(e)}")
+            finally:
+                self.sync_lock.release()
+        return wait
+    
+    def sync(self, now):
+        with self.lock:
+            spent, self.spent = self.spent, {}
+            entries = [(key, count, self.buckets[key][2], self.buckets[key][3]) for key, count in spent.items()]
+            # Buckets idle for an hour are full again; forget them
+            for key in [key for key, entry in self.buckets.items() if now - entry[1] > 3600]:
+                del self.buckets[key]
+        self.synced_at = now
+        if not entries:
+            return
+        
+        levels = self.store.merge(entries)
+        with self.lock:
+            for key, tokens in levels.items():
+                entry = self.buckets.get(key)
+                if entry is not None:
+                    # Tokens taken here while the merge ran are not in the shared level yet
+                    entry[0], entry[1] = tokens - self.spent.get(key, 0), now
+
+local_buckets = LocalTokenBuckets(rate_limit_store)
+
+def too_many_requests(wait, message='Too many requests, please slow down'):
+    retry_after = max(1, math.ceil(wait))
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+@app.before_request
+def admit_request():
+    # CORS preflights are sent by the browser, not the user, and are never charged
+    if not RATE_LIMIT_ENABLED or not request.path.startswith('/api/') or request.method == 'OPTIONS':
+        return
+    
+    endpoint = request.endpoint
+    identity = f"user:{session['user_id']}" if 'user_id' in session else f'ip:{request.remote_addr}'
+    buckets = [(identity, *USER_RATE_LIMIT)]
+    if endpoint in ROUTE_RATE_LIMITS:
+        buckets.append((f'{endpoint}:{identity}', *ROUTE_RATE_LIMITS[endpoint]))
+    
+    try:
+        wait = local_buckets.take(buckets)
+        if wait:
+            return too_many_requests(wait)
+        
+        if endpoint in CONCURRENCY_LIMITS:
+            slot = rate_limit_store.acquire(endpoint, CONCURRENCY_LIMITS[endpoint])
+        elif endpoint in USER_CONCURRENCY_LIMITS:
+            slot = rate_limit_store.acquire(f'{endpoint}:{identity}', USER_CONCURRENCY_LIMITS[endpoint])
+        if endpoint in CONCURRENCY_LIMITS or endpoint in USER_CONCURRENCY_LIMITS:
+            if slot is None:
+                return too_many_requests(1, 'Server is busy, please retry shortly')
+            g.admission_slot = slot
+    except sqlite3.Error as e:
+        # Fail open: a broken limiter must not take the API down with it
+        print(f"⚠️ Rate limiter unavailable: {str(e)}")
+
+@app.teardown_request
+def release_admission_slot(exc):
+    slot = g.pop('admission_slot', None)
+    if slot is not None:
+        try:
+            rate_limit_store.release(slot)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not release admission slot: {str(e)}")
+
+# Admin profiling: any endpoint called with ?profile=1 by an admin gets a
+# '_profile' key with the slowest functions, every SQL statement and its plan.
+# The SQL listeners are only attached while a profiled request is running.
+PROFILE_TOP_FUNCTIONS = 25
+profiling_lock = threading.Lock()
+profiled_requests = 0
+
+def before_profiled_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'profile' in g:
+        conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+def after_profiled_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'profile' in g and conn.info.get('profile_started'):
+        elapsed = time.perf_counter() - conn.info['profile_started'].pop()
+        g.profile['queries'].append({
+            'statement': statement,
+            'parameters': parameters,
+            'executemany': executemany,
+            'ms': round(elapsed * 1000, 3)
+        })
+
+def set_query_listeners(delta):
+    global profiled_requests
+    with profiling_lock:
+        profiled_requests += delta
+        attached = db.event.contains(db.engine, 'before_cursor_execute', before_profiled_query)
+        if profiled_requests > 0 and not attached:
+            db.event.listen(db.engine, 'before_cursor_execute', before_profiled_query)
+            db.event.listen(db.engine, 'after_cursor_execute', after_profiled_query)
+        elif profiled_requests == 0 and attached:
+            db.event.remove(db.engine, 'before_cursor_execute', before_profiled_query)
+            db.event.remove(db.engine, 'after_cursor_execute', after_profiled_query)
+
+@app.before_request
+def start_profiling():
+    if request.args.get('profile') != '1':
+        return
+    user = get_current_user()
+    if not user or user.role != 'admin':
+        return
+    
+    set_query_listeners(1)
+    g.profile = {'queries': [], 'profiler': cProfile.Profile(), 'started': time.perf_counter()}
+    try:
+        g.profile['profiler'].enable()
+    except ValueError:
+        # Another profiler is already running in this process
+        g.profile['profiler'] = None
+
+def stop_profiling():
+    profile = g.pop('profile', None)
+    if profile is None:
+        return None
+    if profile['profiler']:
+        profile['profiler'].disable()
+    set_query_listeners(-1)
+    return profile
+
+def explain_queries(queries):
+    """Attach the database's plan for each SELECT (EXPLAIN ANALYZE on PostgreSQL)"""
+    prefix = {
+        'sqlite': 'EXPLAIN QUERY PLAN ',
+        'postgresql': 'EXPLAIN (ANALYZE, BUFFERS) '
+    }.get(db.engine.dialect.name)
+    if not prefix:
+        return
+    
+    with db.engine.connect() as conn:
+        for query in queries:
+            if query['executemany'] or not query['statement'].lstrip().upper().startswith('SELECT'):
+                continue
+            try:
+                rows = conn.exec_driver_sql(prefix + query['statement'], query['parameters']).fetchall()
+                query['plan'] = [' | '.join(str(value) for value in row) for row in rows]
+            except Exception as e:
+                query['plan_error'] = str(e)
+            conn.rollback()
+
+def profile_report(profile):
+    functions = []
+    if profile['profiler']:
+        stats = pstats.Stats(profile['profiler'])
+        slowest = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+        for (filename, line, name), (primitive_calls, calls, total, cumulative, callers) in slowest:
+            functions.append({
+                'function': f'{name} ({os.path.join(*filename.split(os.sep)[-2:])}:{line})',
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3)
+            })
+    
+    queries = profile['queries']
+    explain_queries(queries)
+    for query in queries:
+        parameters = query['parameters']
+        query['parameters'] = {key: repr(value) for key, value in parameters.items()} \
+            if isinstance(parameters, dict) else [repr(value) for value in parameters or ()]
+    
+    return {
+        'request_ms': round((time.perf_counter() - profile['started']) * 1000, 3),
+        'sql_ms': round(sum(query['ms'] for query in queries), 3),
+        'query_count': len(queries),
+        'queries': queries,
+        'functions': functions
+    }
+
+@app.after_request
+def attach_profile(response):
+    profile = stop_profiling() if 'profile' in g else None
+    if profile is None or not response.is_json:
+        return response
+    
+    payload = response.get_json()
+    if isinstance(payload, dict):
+        payload['_profile'] = profile_report(profile)
+        response.set_data(app.json.dumps(payload))
+    return response
+
+@app.teardown_request
+def discard_profile(exc):
+    if 'profile' in g:
+        stop_profiling()
+
+# Request coalescing: concurrent identical reads in one worker share a single
+# computation instead of each recomputing the same response.
+SINGLE_FLIGHT_WAIT = float(os.environ.get('SINGLE_FLIGHT_WAIT_SECONDS', 10))
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.stats = {'computed': 0, 'coalesced': 0, 'wait_timeouts': 0}
+    
+    def do(self, key, compute, timeout=None):
+        """Run compute() once per key at a time; concurrent callers get its result.
+        
+        A caller that waits longer than timeout for the running call stops
+        waiting and runs compute() itself.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                self.stats['computed'] += 1
+            else:
+                self.stats['coalesced'] += 1
+        
+        if not leader:
+            if not call['done'].wait(timeout):
+                with self.lock:
+                    self.stats['wait_timeouts'] += 1
+                return compute()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+        
+        try:
+            call['result'] = compute()
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call['done'].set()
+        return call['result']
+
+request_flights = SingleFlight()
+
+def role_scope(**view_args):
+    return get_current_user().role
+
+def team_scope(team_id, **view_args):
+    """Callers that see the same team response: admins, members, or one outsider"""
+    user = get_current_user()
+    if user.role == 'admin':
+        return 'admin'
+    if membership(team_id, user.id):
+        return f'member:{team_id}'
+    return f'user:{user.id}'
+
+def single_flight(scope=role_scope):
+    """Coalesce concurrent identical GETs of the decorated view.
+    
+    The key is the endpoint, its URL arguments, the query string and
+    scope(**view_args); the scope must capture everything that makes the
+    response differ between callers. Waiters get the leader's status and
+    headers (but not its cookies) and give up after SINGLE_FLIGHT_WAIT
+    seconds to run the view themselves. Apply below
+    login_required/admin_required.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if 'profile' in g:
+                return f(*args, **kwargs)
+            
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                scope(**kwargs)
+            )
+            
+            def compute():
+                response = app.make_response(f(*args, **kwargs))
+                headers = [(name, value) for name, value in response.headers.items()
+                           if name.lower() not in ('content-length', 'content-type', 'set-cookie')]
+                return response.get_data(), response.status_code, response.mimetype, headers
+            
+            body, status, mimetype, headers = request_flights.do(key, compute, SINGLE_FLIGHT_WAIT)
+            return Response(body, status=status, mimetype=mimetype, headers=headers)
+        return decorated_function
+    return decorator
+
+# Response cache: GET responses are cached per endpoint, arguments and
+# permission scope, under tags naming the tables they read. Every committed
+# INSERT/UPDATE/DELETE invalidates its table's tag, whichever route, job or
+# command issued it.
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() != 'false'
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1000))
+RESPONSE_CACHE_DB = os.environ.get('RESPONSE_CACHE_DB')  # Optional SQLite file shared by local workers
+
+class LRUCache:
+    """In-process LRU of (expires, value) entries"""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.time() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def __len__(self):
+        return len(self.entries)
+
+class SQLiteCacheBackend:
+    """Cache entries and tag versions in a SQLite file shared by local workers"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.local = ThreadLocal()
+    
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS entry (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS tag (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            self.local.conn = conn
+        return conn
+    
+    def get(self, key):
+        row = self.connect().execute('SELECT value, expires FROM entry WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+    
+    def set(self, key, value, ttl):
+        conn = self.connect()
+        conn.execute('INSERT OR REPLACE INTO entry (key, value, expires) VALUES (?, ?, ?)',
+                     (key, json.dumps(value), time.time() + ttl))
+        if random.random() < 0.01:
+            conn.execute('DELETE FROM entry WHERE expires < ?', (time.time(),))
+    
+    def tag_versions(self, tags):
+        marks = ','.join('?' * len(tags))
+        versions = dict(self.connect().execute(f'SELECT name, version FROM tag WHERE name IN ({marks})', list(tags)))
+        return {tag: versions.get(tag, 0) for tag in tags}
+    
+    def bump(self, tags):
+        self.connect().executemany(
+            'INSERT INTO tag (name, version) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET version = version + 1',
+            [(tag,) for tag in tags]
+        )
+    
+    def clear(self):
+        self.connect().execute('DELETE FROM entry')
+
+class ResponseCache:
+    """Two-level cache invalidated by tag version: bumping a tag orphans its entries"""
+    
+    def __init__(self, max_entries, backend=None):
+        self.local = LRUCache(max_entries)
+        self.backend = backend
+        self.versions = {}
+        self.metrics = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+        self.endpoint_metrics = {}
+    
+    def versioned_key(self, key, tags):
+        versions = self.backend.tag_versions(tags) if self.backend else {tag: self.versions.get(tag, 0) for tag in tags}
+        return repr((key, sorted(versions.items())))
+    
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.backend:
+            value = self.backend.get(key)
+            if value is not None:
+                self.local.set(key, value, RESPONSE_CACHE_TTL)
+        return value
+    
+    def set(self, key, value, ttl):
+        self.local.set(key, value, ttl)
+        if self.backend:
+            self.backend.set(key, value, ttl)
+        self.metrics['stores'] += 1
+    
+    def record(self, endpoint, hit):
+        outcome = 'hits' if hit else 'misses'
+        self.metrics[outcome] += 1
+        counts = self.endpoint_metrics.setdefault(endpoint, {'hits': 0, 'misses': 0})
+        counts[outcome] += 1
+    
+    def invalidate(self, tags):
+        for tag in tags:
+            self.versions[tag] = self.versions.get(tag, 0) + 1
+        if self.backend:
+            self.backend.bump(tags)
+        self.metrics['invalidations'] += len(tags)
+    
+    def clear(self):
+        self.local.clear()
+        if self.backend:
+            self.backend.clear()
+        self.metrics['flushes'] = self.metrics.get('flushes', 0) + 1
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, SQLiteCacheBackend(RESPONSE_CACHE_DB) if RESPONSE_CACHE_DB else None)
+
+def invalidate_cache(*tags):
+    """Invalidate tags by hand, for changes the write listener cannot see"""
+    response_cache.invalidate(tags)
+
+# Bookkeeping tables no cached view reads; writes to them invalidate nothing
+CACHE_UNTRACKED_TABLES = {'cache_invalidation', 'stream_event', 'background_job', 'idempotency_key'}
+
+@db.event.listens_for(Engine, 'after_execute')
+def collect_cache_tags(conn, clauseelement, multiparams, params, execution_options, result):
+    if isinstance(clauseelement, UpdateBase) and clauseelement.table.name not in CACHE_UNTRACKED_TABLES:
+        conn.info.setdefault('cache_tags', set()).add(clauseelement.table.name)
+
+@db.event.listens_for(Engine, 'commit')
+def fire_cache_tags(conn):
+    tags = conn.info.pop('cache_tags', None)
+    if tags:
+        response_cache.invalidate(tags)
+
+@db.event.listens_for(Engine, 'rollback')
+def drop_cache_tags(conn):
+    conn.info.pop('cache_tags', None)
+
+def user_scope(**view_args):
+    """Admins share one scope; everyone else sees their own data"""
+    user = get_current_user()
+    return 'admin' if user.role == 'admin' else f'user:{user.id}'
+
+def cached_response(tags, scope=user_scope, ttl=None):
+    """Serve the decorated GET view from the response cache.
+    
+    tags are the table names the view reads. The key covers the endpoint, URL
+    arguments, query string and scope(**view_args), the same way as
+    single_flight. Apply below login_required/admin_required. Only 200
+    responses are stored.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not RESPONSE_CACHE_ENABLED or 'profile' in g:
+                return f(*args, **kwargs)
+            cache_bus.start()
+            
+            key = response_cache.versioned_key((
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                scope(**kwargs)
+            ), tags)
+            cached = response_cache.get(key)
+            response_cache.record(request.endpoint, cached is not None)
+            if cached is not None:
+                body, mimetype = cached
+                return Response(body, mimetype=mimetype, headers={'X-Cache': 'HIT'})
+            
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(key, (response.get_data(as_text=True), response.mimetype), ttl or RESPONSE_CACHE_TTL)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
+
+# Idempotency keys: a POST retried with the same Idempotency-Key header gets
+# the stored first response instead of creating a duplicate.
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24)))
+IDEMPOTENCY_LEASE = timedelta(seconds=int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', 60)))
+idempotency_replays = LRUCache(2000)  # Hot window of completed responses
+idempotency_gc = {'last_run': 0.0}
+
+def collect_idempotency_keys():
+    """Delete every expired idempotency key in one statement; returns the count"""
+    deleted = db.session.execute(
+        IdempotencyKey.__table__.delete().where(IdempotencyKey.expires_at < datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+def replay_response(stored, request_hash):
+    body, status, mimetype, stored_hash = stored
+    if stored_hash != request_hash:
+        return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+    return Response(body, status=status, mimetype=mimetype, headers={'Idempotent-Replayed': 'true'})
+
+def idempotency_in_progress(locked_until):
+    response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+    retry_after = (locked_until - datetime.utcnow()).total_seconds() if locked_until else 0
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, 409
+
+def idempotent(f):
+    """Honour an Idempotency-Key header on the decorated POST view.
+    
+    The key is reserved before the view runs, so a concurrent retry gets 409
+    instead of running twice. The reservation is a lease: if the worker dies
+    mid-request, a retry after IDEMPOTENCY_LEASE takes the key over and runs
+    the view itself. Responses below 500 are stored for IDEMPOTENCY_KEY_TTL
+    and replayed; server errors release the key so the client can retry.
+    Apply below login_required.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key', '').strip()
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), 400
+        
+        user_id = session['user_id']
+        request_hash = hashlib.sha256(
+            f'{request.method} {request.path}\n'.encode() + request.get_data()
+        ).hexdigest()
+        
+        stored = idempotency_replays.get((user_id, key))
+        if stored is not None:
+            return replay_response(stored, request_hash)
+        
+        existing = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+        if existing and existing.expires_at < datetime.utcnow():
+            db.session.delete(existing)
+            db.session.commit()
+            existing = None
+        lease = datetime.utcnow() + IDEMPOTENCY_LEASE
+        if existing and existing.status_code is None:
+            if existing.request_hash != request_hash:
+                return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+            if existing.locked_until is not None and existing.locked_until > datetime.utcnow():
+                return idempotency_in_progress(existing.locked_until)
+            
+            # The lease ran out, so the first request died; take it over unless another retry already has
+            table = IdempotencyKey.__table__
+            held = table.c.locked_until.is_(None) if existing.locked_until is None else table.c.locked_until == existing.locked_until
+            reserved = db.session.execute(
+                table.update()
+                .where(table.c.id == existing.id, table.c.status_code.is_(None), held)
+                .values(locked_until=lease)
+            ).rowcount
+            db.session.commit()
+            if not reserved:
+                return idempotency_in_progress(lease)
+        elif existing:
+            stored = (existing.response_body, existing.status_code, existing.mimetype, existing.request_hash)
+            idempotency_replays.set((user_id, key), stored, IDEMPOTENCY_KEY_TTL.total_seconds())
+            return replay_response(stored, request_hash)
+        else:
+            # Reserve the key; losing the race means a concurrent retry is running
+            reserved = insert_ignoring_conflicts(db.session.connection(), IdempotencyKey.__table__, [{
+                'user_id': user_id,
+                'key': key,
+                'endpoint': request.endpoint,
+                'request_hash': request_hash,
+                'locked_until': lease,
+                'created_at': datetime.utcnow(),
+                'expires_at': datetime.utcnow() + IDEMPOTENCY_KEY_TTL
+            }], ['user_id', 'key'])
+            db.session.commit()
+            if not reserved:
+                return idempotency_in_progress(lease)
+        
+        # Only the current lease holder may store or release the key
+        record = IdempotencyKey.query.filter_by(user_id=user_id, key=key, locked_until=lease)
+        try:
+            response = app.make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            record.delete()
+            db.session.commit()
+            raise
+        
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            stored = (response.get_data(as_text=True), response.status_code, response.mimetype, request_hash)
+            record.update({'status_code': stored[1], 'response_body': stored[0], 'mimetype': stored[2]})
+            idempotency_replays.set((user_id, key), stored, IDEMPOTENCY_KEY_TTL.total_seconds())
+        db.session.commit()
+        
+        # Expired keys are removed in bulk, at most every ten minutes per worker
+        if time.time() - idempotency_gc['last_run'] > 600:
+            idempotency_gc['last_run'] = time.time()
+            collect_idempotency_keys()
+        
+        return response
+    return decorated_function
+
+@app.cli.command('gc-idempotency-keys')
+def gc_idempotency_keys_command():
+    """Delete expired idempotency keys"""
+    print(f"Deleted {collect_idempotency_keys()} expired idempotency keys")
+
+# Named statements
+# The query shapes most routes repeat, built once at import with bind
+# parameters. Executing a prebuilt select() skips rebuilding a Query on every
+# call, and SQLAlchemy's compiled cache then reuses its SQL string.
+MEMBERSHIPS_BY_TEAM = db.select(TeamMember).where(TeamMember.team_id == db.bindparam('team_id'))
+MEMBERSHIPS_BY_USER = db.select(TeamMember).where(TeamMember.user_id == db.bindparam('user_id'))
+MEMBERSHIP = db.select(TeamMember).where(
+    TeamMember.team_id == db.bindparam('team_id'), TeamMember.user_id == db.bindparam('user_id')
+).limit(1)
+LED_TEAM_IDS = db.select(TeamMember.team_id).where(
+    TeamMember.user_id == db.bindparam('user_id'), TeamMember.role == 'leader'
+)
+PROJECT_IDS_BY_TEAM = db.select(Project.id).where(Project.team_id == db.bindparam('team_id'))
+USERS_BY_IDS = db.select(User).where(User.id.in_(db.bindparam('user_ids', expanding=True)))
+WORK_LOGS_BY_VOLUNTEER = db.select(WorkLog).where(WorkLog.volunteer_id == db.bindparam('volunteer_id'))
+HOURS_BY_VOLUNTEERS = db.select(db.func.sum(WorkLog.hours_worked)).where(
+    WorkLog.volunteer_id.in_(db.bindparam('volunteer_ids', expanding=True))
+)
+HOURS_PER_VOLUNTEER = db.select(WorkLog.volunteer_id, db.func.sum(WorkLog.hours_worked)).where(
+    WorkLog.volunteer_id.in_(db.bindparam('volunteer_ids', expanding=True))
+).group_by(WorkLog.volunteer_id)
+ARCHIVE_ROLLUPS_BY_VOLUNTEERS = db.select(WorkLogArchiveRollup).where(
+    WorkLogArchiveRollup.volunteer_id.in_(db.bindparam('volunteer_ids', expanding=True))
+)
+MEMBERSHIPS_OF_USERS = db.select(TeamMember).where(
+    TeamMember.team_id == db.bindparam('team_id'),
+    TeamMember.user_id.in_(db.bindparam('user_ids', expanding=True))
+)
+HOURS_BY_STATUS = db.select(WorkLog.status, db.func.sum(WorkLog.hours_worked)).where(
+    WorkLog.volunteer_id.in_(db.bindparam('volunteer_ids', expanding=True))
+).group_by(WorkLog.status)
+PROJECT_COUNTS_BY_STATUS = db.select(Project.status, db.func.count(Project.id)).where(
+    Project.team_id == db.bindparam('team_id')
+).group_by(Project.status)
+TEAMS_BY_NAME = db.select(Team).order_by(Team.name)
+TEAMS_BY_IDS = TEAMS_BY_NAME.where(Team.id.in_(db.bindparam('team_ids', expanding=True)))
+# Work log export; a null team_id or status leaves that filter out
+EXPORT_FILTERS = db.and_(
+    db.bindparam('team_id', type_=db.Integer).is_(None) | WorkLog.volunteer_id.in_(
+        db.select(TeamMember.user_id).where(TeamMember.team_id == db.bindparam('team_id', type_=db.Integer))
+    ),
+    db.bindparam('status', type_=db.String).is_(None) | (WorkLog.status == db.bindparam('status', type_=db.String))
+)
+EXPORT_WORK_LOG_COUNT = db.select(db.func.count(WorkLog.id)).where(EXPORT_FILTERS)
+EXPORT_WORK_LOG_BATCH = db.select(WorkLog, User).join(User, User.id == WorkLog.volunteer_id).where(
+    EXPORT_FILTERS, WorkLog.id > db.bindparam('after_id')
+).order_by(WorkLog.id).limit(db.bindparam('batch_size'))
+
+def team_memberships(team_id):
+    return db.session.execute(MEMBERSHIPS_BY_TEAM, {'team_id': team_id}).scalars().all()
+
+def user_memberships(user_id):
+    return db.session.execute(MEMBERSHIPS_BY_USER, {'user_id': user_id}).scalars().all()
+
+def membership(team_id, user_id):
+    """The user's membership of a team, or None"""
+    return db.session.execute(MEMBERSHIP, {'team_id': team_id, 'user_id': user_id}).scalars().first()
+
+def team_leadership(team_id, user_id):
+    """The user's membership of a team if they lead it, otherwise None"""
+    member = membership(team_id, user_id) if team_id else None
+    return member if member and member.role == 'leader' else None
+
+def led_team_ids(user_id):
+    return set(db.session.execute(LED_TEAM_IDS, {'user_id': user_id}).scalars())
+
+def users_by_ids(user_ids):
+    """{id: User} for the given IDs"""
+    if not user_ids:
+        return {}
+    return {u.id: u for u in db.session.execute(USERS_BY_IDS, {'user_ids': list(user_ids)}).scalars()}
+
+# Response shaping helpers
+VOLUNTEER_DETAIL_FIELDS = ('full_name', 'college_name', 'course', 'year_of_study', 'phone', 'email')
+
+def wants_normalized():
+    """Clients opt into sideloaded user/team records with ?format=normalized."""
+    return request.args.get('format') == 'normalized'
+
+def attach_user(row, user, fields=None, users=None, prefix='volunteer'):
+    """Embed a user's details into a listing row.
+    
+    When a users map is given (normalized responses) the row only references
+    the user by ID and the user is serialized once into the map instead.
+    Without detail fields only the username is embedded.
+    """
+    if users is None:
+        row[prefix] = user.username
+        if fields is not None:
+            row[f'{prefix}_details'] = {field: getattr(user, field) for field in fields}
+    else:
+        row[f'{prefix}_id'] = user.id
+        record = users.setdefault(user.id, {'id': user.id, 'username': user.username})
+        for field in fields or ():
+            record.setdefault(field, getattr(user, field))
+    return row
+
+def attach_team(row, team, teams=None):
+    """Embed a team's name into a listing row, or sideload it into the teams map."""
+    row['team_id'] = team.id
+    if teams is None:
+        row['team_name'] = team.name
+    else:
+        teams.setdefault(team.id, {'id': team.id, 'name': team.name})
+    return row
+
+# Sparse fieldsets: each listing field maps to the columns it needs and how to
+# serialize it. 'volunteer' and 'team' cover the embedded/sideloaded records.
+WORK_LOG_FIELDS = {
+    'id': ((WorkLog.id,), lambda log: log.id),
+    'date': ((WorkLog.date,), lambda log: log.date.isoformat()),
+    'hours_worked': ((WorkLog.hours_worked,), lambda log: log.hours_worked),
+    'description': ((WorkLog.description,), lambda log: log.description),
+    'status': ((WorkLog.status,), lambda log: log.status),
+    'volunteer': ((WorkLog.volunteer_id,), None)
+}
+
+# The same fields read from archived rows
+ARCHIVED_WORK_LOG_FIELDS = {
+    name: (tuple(getattr(ArchivedWorkLog, column.key) for column in columns), getter)
+    for name, (columns, getter) in WORK_LOG_FIELDS.items()
+}
+
+PROJECT_FIELDS = {
+    'id': ((Project.id,), lambda p: p.id),
+    'title': ((Project.title,), lambda p: p.title),
+    'description': ((Project.description,), lambda p: p.description),
+    'status': ((Project.status,), lambda p: p.status),
+    'created_at': ((Project.created_at,), lambda p: p.created_at.isoformat()),
+    'is_team_project': ((Project.is_team_project,), lambda p: p.is_team_project),
+    'start_date': ((Project.start_date,), lambda p: p.start_date.isoformat() if p.start_date else None),
+    'end_date': ((Project.end_date,), lambda p: p.end_date.isoformat() if p.end_date else None),
+    'volunteer': ((Project.volunteer_id,), None),
+    'team': ((Project.team_id,), None)
+}
+
+def requested_fields(allowed):
+    """Parse ?fields=a,b,c against the field names a listing supports.
+    
+    Returns (fields, error): fields is None when the parameter is absent, and
+    error is a ready-made 400 response for unknown field names.
+    """
+    raw = request.args.get('fields', '').strip()
+    if not raw:
+        return None, None
+    
+    fields = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = sorted(fields - set(allowed))
+    if unknown:
+        return None, (jsonify({'error': f'Unknown fields: {", ".join(unknown)}'}), 400)
+    return fields, None
+
+def load_fields(query, spec, fields):
+    """Restrict the SELECT list to the columns behind the requested fields"""
+    if fields is None:
+        return query
+    columns = {column for name in fields for column in spec[name][0]}
+    return query.options(db.load_only(*columns))
+
+def serialize_fields(obj, spec, names, only=None):
+    return {
+        name: spec[name][1](obj)
+        for name in names
+        if spec[name][1] and (only is None or name in only)
+    }
+
+WORK_LOG_ROW_FIELDS = ('id', 'date', 'hours_worked', 'description', 'status', 'volunteer')
+
+# Field names offered by the project listings
+PROJECT_LIST_FIELDS = ('id', 'title', 'description', 'status', 'created_at', 'is_team_project', 'volunteer', 'team')
+TEAM_PROJECT_FIELDS = ('id', 'title', 'description', 'status', 'created_at', 'start_date', 'end_date', 'volunteer')
+ADMIN_TEAM_PROJECT_FIELDS = TEAM_PROJECT_FIELDS + ('is_team_project',)
+
+def work_log_row(log, users=None, fields=VOLUNTEER_DETAIL_FIELDS, only=None):
+    row = serialize_fields(log, WORK_LOG_FIELDS, WORK_LOG_ROW_FIELDS, only)
+    if only is None or 'volunteer' in only:
+        attach_user(row, log.volunteer, fields, users)
+    return row
+
+WORK_LOG_STATUSES = ('pending', 'approved', 'rejected')
+
+def work_log_filters(allow_team=False):
+    """Parse work log filters from the query string.
+    
+    Supports start_date/end_date (YYYY-MM-DD, inclusive), status (comma
+    separated), volunteer_id, min_hours/max_hours and, where allowed, team_id.
+    Returns (filters, error) in the same way as requested_fields; pass filters
+    to work_log_criteria to build the SQL conditions.
+    """
+    args = request.args
+    filters = {}
+    try:
+        if args.get('start_date'):
+            filters['start_date'] = datetime.strptime(args['start_date'], '%Y-%m-%d').date()
+        if args.get('end_date'):
+            filters['end_date'] = datetime.strptime(args['end_date'], '%Y-%m-%d').date()
+    except ValueError:
+        return None, (jsonify({'error': 'start_date and end_date must be YYYY-MM-DD'}), 400)
+    
+    if args.get('status'):
+        statuses = [status.strip() for status in args['status'].split(',') if status.strip()]
+        unknown = sorted(set(statuses) - set(WORK_LOG_STATUSES))
+        if unknown:
+            return None, (jsonify({'error': f'Unknown status: {", ".join(unknown)}'}), 400)
+        filters['statuses'] = statuses
+    
+    for name, convert in (('volunteer_id', int), ('min_hours', float), ('max_hours', float)):
+        if args.get(name):
+            try:
+                filters[name] = convert(args[name])
+            except ValueError:
+                return None, (jsonify({'error': f'{name} must be a number'}), 400)
+    
+    if args.get('team_id') and allow_team:
+        team_id = args.get('team_id', type=int)
+        if team_id is None:
+            return None, (jsonify({'error': 'team_id must be a number'}), 400)
+        filters['team_id'] = team_id
+    
+    return filters, None
+
+def work_log_criteria(filters, model=WorkLog):
+    """SQL conditions for parsed filters against WorkLog or ArchivedWorkLog"""
+    criteria = []
+    if 'start_date' in filters:
+        criteria.append(model.date >= filters['start_date'])
+    if 'end_date' in filters:
+        criteria.append(model.date <= filters['end_date'])
+    if 'statuses' in filters:
+        criteria.append(model.status.in_(filters['statuses']))
+    if 'volunteer_id' in filters:
+        criteria.append(model.volunteer_id == filters['volunteer_id'])
+    if 'min_hours' in filters:
+        criteria.append(model.hours_worked >= filters['min_hours'])
+    if 'max_hours' in filters:
+        criteria.append(model.hours_worked <= filters['max_hours'])
+    if 'team_id' in filters:
+        criteria.append(model.volunteer_id.in_(
+            db.select(TeamMember.user_id).where(TeamMember.team_id == filters['team_id'])
+        ))
+    return criteria
+
+def archive_reached(filters):
+    """True when the filtered range can include archived work logs"""
+    if 'statuses' in filters and 'approved' not in filters['statuses']:
+        return False
+    newest = db.session.query(db.func.max(ArchivedWorkLog.date)).scalar()
+    if newest is None:
+        return False
+    return 'start_date' not in filters or filters['start_date'] <= newest
+
+def work_log_models(filters):
+    return (WorkLog, ArchivedWorkLog) if archive_reached(filters) else (WorkLog,)
+
+def fetch_work_logs(filters, volunteer_ids=None, only=None):
+    """Work logs matching the filters, newest first.
+    
+    Archived rows are read (and merged in) only when the date range reaches
+    into the archive.
+    """
+    logs = []
+    models = work_log_models(filters)
+    merging = len(models) > 1
+    if merging and only is not None:
+        only = set(only) | {'date'}  # The merge sorts on it; don't lazy-load it per row
+    for model in models:
+        query = model.query.filter(*work_log_criteria(filters, model))
+        if volunteer_ids is not None:
+            query = query.filter(model.volunteer_id.in_(volunteer_ids))
+        spec = WORK_LOG_FIELDS if model is WorkLog else ARCHIVED_WORK_LOG_FIELDS
+        logs.extend(load_fields(query, spec, only).order_by(model.date.desc()).all())
+    if merging:
+        logs.sort(key=lambda log: log.date, reverse=True)
+    return logs
+
+def count_work_logs(filters, volunteer_ids=None):
+    total = 0
+    for model in work_log_models(filters):
+        query = model.query.filter(*work_log_criteria(filters, model))
+        if volunteer_ids is not None:
+            query = query.filter(model.volunteer_id.in_(volunteer_ids))
+        total += query.count()
+    return total
+
+def archived_totals(volunteer_ids):
+    """Archived (hours, log_count) per volunteer, read from the rollups"""
+    if not volunteer_ids:
+        return {}
+    rollups = db.session.execute(ARCHIVE_ROLLUPS_BY_VOLUNTEERS, {'volunteer_ids': list(volunteer_ids)}).scalars()
+    return {rollup.volunteer_id: (rollup.hours, rollup.log_count) for rollup in rollups}
+
+def wants_count():
+    """True when the client asked for ?count=1 (totals only, no rows)"""
+    return request.args.get('count') in ('1', 'true')
+
 # Routes
 
 # Authentication Routes
@@ -450,47 +1939,52 @@ def get_work_logs():
     if not user:
         return jsonify({'error': 'Authentication required'}), 401
     
-    if user.role == 'volunteer':
-        logs = WorkLog.query.filter_by(volunteer_id=user.id).order_by(WorkLog.date.desc()).all()
-    else:
-        logs = WorkLog.query.order_by(WorkLog.date.desc()).all()
+    only, error = requested_fields(WORK_LOG_ROW_FIELDS)
+    if error:
+        return error
+    filters, error = work_log_filters(allow_team=user.role == 'admin')
+    if error:
+        return error
+    
+    volunteer_ids = [user.id] if user.role == 'volunteer' else None
+    if wants_count():
+        return jsonify({'count': count_work_logs(filters, volunteer_ids)})
+    logs = fetch_work_logs(filters, volunteer_ids, only)
+    
+    users = {} if wants_normalized() else None
+    with_volunteer = only is None or 'volunteer' in only
+    
+    # Get each volunteer's (first) team name in one query for the admin view
+    team_names = {}
+    if user.role == 'admin' and with_volunteer:
+        memberships = db.session.query(TeamMember.user_id, Team.name).join(
+            Team, Team.id == TeamMember.team_id
+        ).order_by(TeamMember.id).all()
+        for user_id, team_name in memberships:
+            team_names.setdefault(user_id, team_name)
     
     work_logs = []
     for log in logs:
-        log_data = {
-            'id': log.id,
-            'date': log.date.isoformat(),
-            'hours_worked': log.hours_worked,
-            'description': log.description,
-            'status': log.status,
-            'volunteer': log.volunteer.username
-        }
-        
-        # Add detailed volunteer info for admins
         if user.role == 'admin':
-            # Get volunteer's team information
-            team_membership = TeamMember.query.filter_by(user_id=log.volunteer.id).first()
-            team_name = None
-            if team_membership:
-                team = Team.query.get(team_membership.team_id)
-                team_name = team.name if team else None
-            
-            log_data['volunteer_details'] = {
-                'full_name': log.volunteer.full_name,
-                'college_name': log.volunteer.college_name,
-                'course': log.volunteer.course,
-                'year_of_study': log.volunteer.year_of_study,
-                'phone': log.volunteer.phone,
-                'email': log.volunteer.email,
-                'team_name': team_name
-            }
+            # Add detailed volunteer info for admins
+            log_data = work_log_row(log, users, only=only)
+            if not with_volunteer:
+                work_logs.append(log_data)
+                continue
+            details = users[log.volunteer_id] if users is not None else log_data['volunteer_details']
+            details['team_name'] = team_names.get(log.volunteer_id)
+        else:
+            log_data = work_log_row(log, users, fields=None, only=only)
         
         work_logs.append(log_data)
     
+    if users is not None:
+        return jsonify({'work_logs': work_logs, 'users': users})
     return jsonify({'work_logs': work_logs})
 
 @app.route('/api/volunteers/work-logs/create/', methods=['POST'])
 @login_required
+@idempotent
 def create_work_log():
     user = get_current_user()
     if not user:
@@ -509,12 +2003,16 @@ def create_work_log():
     )
     
     db.session.add(work_log)
+    db.session.flush()  # Get work log ID
+    publish_event('work_log.created', user_id=user.id, log_id=work_log.id,
+                  date=work_log.date.isoformat(), hours_worked=work_log.hours_worked)
     db.session.commit()
     
     return jsonify({'success': True, 'log_id': work_log.id})
 
 @app.route('/api/volunteers/work-logs/<int:log_id>/approve/', methods=['POST'])
 @admin_required
+@idempotent
 def approve_work_log(log_id):
     data = request.get_json()
     status = data.get('status')
@@ -525,6 +2023,7 @@ def approve_work_log(log_id):
     work_log = WorkLog.query.get_or_404(log_id)
     work_log.status = status
     work_log.approved_by_id = session['user_id']
+    publish_event(f'work_log.{status}', user_id=work_log.volunteer_id, log_id=work_log.id, status=status)
     
     db.session.commit()
     
@@ -533,41 +2032,44 @@ def approve_work_log(log_id):
 # Project Routes
 @app.route('/api/projects/', methods=['GET'])
 @login_required
+@cached_response(('project', 'team', 'team_member', 'user'))
 def get_projects():
     user = get_current_user()
     if not user:
         return jsonify({'error': 'Authentication required'}), 401
     
+    only, error = requested_fields(PROJECT_LIST_FIELDS)
+    if error:
+        return error
+    
     if user.role == 'volunteer':
-        projects = Project.query.filter_by(volunteer_id=user.id).order_by(Project.created_at.desc()).all()
+        projects = Project.query.filter_by(volunteer_id=user.id)
     else:
-        projects = Project.query.order_by(Project.created_at.desc()).all()
+        projects = Project.query
+    projects = load_fields(projects, PROJECT_FIELDS, only).order_by(Project.created_at.desc()).all()
+    
+    users = {} if wants_normalized() else None
+    teams = {} if users is not None else None
     
     project_list = []
     for project in projects:
-        project_data = {
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'status': project.status,
-            'volunteer': project.volunteer.username,
-            'created_at': project.created_at.isoformat(),
-            'is_team_project': project.is_team_project
-        }
+        project_data = serialize_fields(project, PROJECT_FIELDS, PROJECT_LIST_FIELDS, only)
+        if only is None or 'volunteer' in only:
+            attach_user(project_data, project.volunteer, users=users)
         
         # Add team information if it's a team project
-        if project.team_id:
-            team = Team.query.get(project.team_id)
-            if team:
-                project_data['team_name'] = team.name
-                project_data['team_id'] = team.id
+        if (only is None or 'team' in only) and project.team:
+            attach_team(project_data, project.team, teams)
         
         project_list.append(project_data)
     
+    if users is not None:
+        return jsonify({'projects': project_list, 'users': users, 'teams': teams})
     return jsonify({'projects': project_list})
 
 @app.route('/api/projects/create/', methods=['POST'])
 @login_required
+@idempotent
 def create_project():
     user = get_current_user()
     if not user:
@@ -611,6 +2113,7 @@ def get_project_updates(project_id):
 
 @app.route('/api/projects/<int:project_id>/updates/create/', methods=['POST'])
 @login_required
+@idempotent
 def create_project_update(project_id):
     user = User.query.get(session['user_id'])
     project = Project.query.get_or_404(project_id)
@@ -623,7 +2126,7 @@ def create_project_update(project_id):
         can_update = True
     elif project.is_team_project and project.team_id:
         # Check if user is a team member
-        is_member = TeamMember.query.filter_by(team_id=project.team_id, user_id=user.id).first()
+        is_member = membership(project.team_id, user.id)
         if is_member:
             can_update = True
     
@@ -655,6 +2158,8 @@ def submit_project(project_id):
     
     if project.status == 'draft':
         project.status = 'submitted'
+        publish_event('project.submitted', user_id=project.volunteer_id, team_id=project.team_id,
+                      project_id=project.id, title=project.title, status=project.status)
         db.session.commit()
         return jsonify({'success': True, 'message': 'Project submitted for review'})
     
@@ -662,6 +2167,7 @@ def submit_project(project_id):
 
 @app.route('/api/projects/<int:project_id>/approve/', methods=['POST'])
 @admin_required
+@idempotent
 def approve_project(project_id):
     data = request.get_json()
     action = data.get('action')  # 'approve' or 'reject'
@@ -679,9 +2185,93 @@ def approve_project(project_id):
     else:
         return jsonify({'error': 'Invalid action'}), 400
     
+    publish_event(f'project.{project.status}', user_id=project.volunteer_id, team_id=project.team_id,
+                  project_id=project.id, title=project.title, status=project.status)
     db.session.commit()
     return jsonify({'success': True, 'message': message})
 
+def project_delete_checks(project_ids, user_id):
+    """Whether user_id may delete each project, as {project_id: (can_delete, message)}.
+    
+    Work logs attached through the projects' documents are found with EXISTS
+    subqueries, so any number of projects is checked in one query.
+    """
+    linked_log = db.and_(Document.project_id == Project.id, Document.work_log_id == WorkLog.id)
+    has_member_logs = db.exists().where(
+        linked_log,
+        TeamMember.team_id == Project.team_id,
+        TeamMember.user_id == WorkLog.volunteer_id,
+        WorkLog.volunteer_id != Project.volunteer_id
+    )
+    has_logs = db.exists().where(linked_log)
+    rows = db.session.query(Project.id, Project.volunteer_id, has_member_logs, has_logs).filter(
+        Project.id.in_(project_ids)
+    ).all()
+    
+    checks = {}
+    for project_id, volunteer_id, member_logs, any_logs in rows:
+        # Only creator can delete
+        if volunteer_id != user_id:
+            checks[project_id] = (False, "Only project creator can delete this project")
+        elif member_logs:
+            checks[project_id] = (False, "Cannot delete project with team member work logs")
+        elif any_logs:
+            checks[project_id] = (False, "Cannot delete project with associated work logs")
+        else:
+            checks[project_id] = (True, "Project can be deleted")
+    return checks
+
+def project_deletion_impact(project_id):
+    """Rows that deleting the project would remove, counted in one query"""
+    document_ids = db.select(Document.id).where(Document.project_id == project_id)
+    updates, documents, shares = db.session.execute(db.select(
+        db.select(db.func.count(ProjectUpdate.id)).where(ProjectUpdate.project_id == project_id).scalar_subquery(),
+        db.select(db.func.count(Document.id)).where(Document.project_id == project_id).scalar_subquery(),
+        db.select(db.func.count(DocumentTeamAccess.id)).where(DocumentTeamAccess.document_id.in_(document_ids)).scalar_subquery()
+    )).one()
+    return {'project_updates': updates, 'documents': documents, 'document_shares': shares}
+
+def delete_project_records(project_id):
+    """Delete a project with its updates, documents and their shares (caller commits)"""
+    document_ids = db.select(Document.id).where(Document.project_id == project_id)
+    
+    # Record deletions for the sync feed
+    record_tombstones_from('projects', db.select(Project.id, Project.volunteer_id, Project.team_id).where(
+        Project.id == project_id
+    ))
+    record_tombstones_from('project_updates', db.select(ProjectUpdate.id, Project.volunteer_id, Project.team_id).join(
+        Project, Project.id == ProjectUpdate.project_id
+    ).where(ProjectUpdate.project_id == project_id))
+    record_document_tombstones(document_ids)
+    
+    db.session.execute(db.delete(DocumentTeamAccess).where(DocumentTeamAccess.document_id.in_(document_ids)))
+    db.session.execute(db.delete(Document).where(Document.project_id == project_id))
+    db.session.execute(db.delete(ProjectUpdate).where(ProjectUpdate.project_id == project_id))
+    
+    # The Core delete skips the flush hook that keeps the approval counters
+    project = db.session.query(Project.team_id, Project.status).filter(Project.id == project_id).first()
+    if project and project.status == 'submitted':
+        adjust_pending_counts(db.session.connection(), 'project', -1, {project.team_id: -1})
+    db.session.execute(db.delete(Project).where(Project.id == project_id))
+
+@app.route('/api/projects/deletable/', methods=['GET'])
+@login_required
+def get_deletable_projects():
+    """Which of ?ids=1,2,3 the current user can delete, checked in one query"""
+    try:
+        project_ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma separated list of project IDs'}), 400
+    if len(project_ids) > 500:
+        return jsonify({'error': 'At most 500 projects per request'}), 400
+    
+    checks = project_delete_checks(project_ids, session['user_id']) if project_ids else {}
+    return jsonify({'projects': [{
+        'id': project_id,
+        'deletable': checks.get(project_id, (False, None))[0],
+        'message': checks.get(project_id, (False, 'Project not found'))[1]
+    } for project_id in project_ids]})
+
 @app.route('/api/projects/<int:project_id>/delete/', methods=['DELETE'])
 @login_required
 def delete_project(project_id):
@@ -692,7 +2282,16 @@ def delete_project(project_id):
     project = Project.query.get_or_404(project_id)
     
     # Check if user can delete this project
-    can_delete, message = project.can_be_deleted_by(user.id)
+    can_delete, message = project_delete_checks([project_id], user.id)[project_id]
+    
+    if request.args.get('dry_run') in ('1', 'true'):
+        return jsonify({
+            'dry_run': True,
+            'project_id': project_id,
+            'deletable': can_delete,
+            'message': message,
+            'impact': project_deletion_impact(project_id)
+        })
     
     if not can_delete:
         return jsonify({'error': message}), 403
@@ -701,11 +2300,7 @@ def delete_project(project_id):
         # Store project info for response
         project_title = project.title
         
-        # Delete associated documents first (cascade should handle this, but being explicit)
-        Document.query.filter_by(project_id=project_id).delete()
-        
-        # Delete the project (this will cascade delete updates due to relationship)
-        db.session.delete(project)
+        delete_project_records(project_id)
         db.session.commit()
         
         return jsonify({
@@ -720,13 +2315,14 @@ def delete_project(project_id):
 # Team Management Routes
 @app.route('/api/teams/', methods=['GET'])
 @login_required
+@cached_response(('team', 'team_member', 'user'))
 def get_teams():
     user = User.query.get(session['user_id'])
     
     if user.role == 'volunteer':
         # Get teams where user is a member
-        team_memberships = TeamMember.query.filter_by(user_id=user.id).all()
-        teams = [membership.team for membership in team_memberships]
+        memberships = user_memberships(user.id)
+        teams = [m.team for m in memberships]
     else:
         # Admin can see all teams
         teams = Team.query.all()
@@ -745,6 +2341,7 @@ def get_teams():
 
 @app.route('/api/teams/create/', methods=['POST'])
 @login_required
+@idempotent
 def create_team():
     user = User.query.get(session['user_id'])
     
@@ -776,25 +2373,20 @@ def create_team():
 
 @app.route('/api/teams/<int:team_id>/members/', methods=['GET'])
 @login_required
+@cached_response(('team', 'team_member', 'user'), team_scope)
 def get_team_members(team_id):
     team = Team.query.get_or_404(team_id)
+    memberships = team_memberships(team_id)
     
-    members = []
-    for membership in team.members:
-        user = membership.user
-        members.append({
-            'id': user.id,
-            'username': user.username,
-            'full_name': user.full_name,
-            'college_name': user.college_name,
-            'role': membership.role,
-            'joined_at': membership.joined_at.isoformat()
-        })
-    
-    return jsonify({'members': members})
+    if wants_normalized():
+        users = {}
+        members = team_members_section(team, memberships, users)
+        return jsonify({'members': members, 'users': users})
+    return jsonify({'members': team_members_section(team, memberships)})
 
 @app.route('/api/teams/<int:team_id>/join/', methods=['POST'])
 @login_required
+@idempotent
 def join_team(team_id):
     user = User.query.get(session['user_id'])
     
@@ -802,7 +2394,7 @@ def join_team(team_id):
         return jsonify({'error': 'Only volunteers can join teams'}), 403
     
     # Check if already a member
-    existing = TeamMember.query.filter_by(team_id=team_id, user_id=user.id).first()
+    existing = membership(team_id, user.id)
     if existing:
         return jsonify({'error': 'Already a member of this team'}), 400
     
@@ -819,13 +2411,14 @@ def join_team(team_id):
 
 @app.route('/api/teams/<int:team_id>/add-member/', methods=['POST'])
 @login_required
+@idempotent
 def add_team_member(team_id):
     user = User.query.get(session['user_id'])
     data = request.get_json()
     
     # Check if user is team leader or admin
     team = Team.query.get_or_404(team_id)
-    is_leader = TeamMember.query.filter_by(team_id=team_id, user_id=user.id, role='leader').first()
+    is_leader = team_leadership(team_id, user.id)
     
     if user.role != 'admin' and not is_leader:
         return jsonify({'error': 'Only team leaders or admins can add members'}), 403
@@ -843,7 +2436,7 @@ def add_team_member(team_id):
         return jsonify({'error': 'Only volunteers can be added to teams'}), 400
     
     # Check if already a member
-    existing = TeamMember.query.filter_by(team_id=team_id, user_id=target_user.id).first()
+    existing = membership(team_id, target_user.id)
     if existing:
         return jsonify({'error': 'User is already a member of this team'}), 400
     
@@ -860,6 +2453,7 @@ def add_team_member(team_id):
 
 @app.route('/api/teams/<int:team_id>/remove-member/', methods=['POST'])
 @login_required
+@idempotent
 def remove_team_member(team_id):
     user = User.query.get(session['user_id'])
     data = request.get_json()
@@ -867,13 +2461,13 @@ def remove_team_member(team_id):
     
     # Check if user is team leader or admin
     team = Team.query.get_or_404(team_id)
-    is_leader = TeamMember.query.filter_by(team_id=team_id, user_id=user.id, role='leader').first()
+    is_leader = team_leadership(team_id, user.id)
     
     if user.role != 'admin' and not is_leader:
         return jsonify({'error': 'Only team leaders or admins can remove members'}), 403
     
     # Find the team member
-    team_member = TeamMember.query.filter_by(team_id=team_id, user_id=member_id).first()
+    team_member = membership(team_id, member_id)
     if not team_member:
         return jsonify({'error': 'Member not found in team'}), 404
     
@@ -881,11 +2475,109 @@ def remove_team_member(team_id):
     if team_member.role == 'leader':
         return jsonify({'error': 'Cannot remove team leader'}), 400
     
+    record_tombstones('team_members', [(team_member.id, team_member.user_id, team_id)])
     db.session.delete(team_member)
     db.session.commit()
     
     return jsonify({'success': True, 'message': 'Member removed from team successfully'})
 
+def resolve_users(identifiers):
+    """Resolve usernames, emails or ids in one query; returns ({id: user}, not_found)"""
+    names = [str(value) for value in identifiers]
+    ids = [int(value) for value in identifiers if str(value).isdigit()]
+    found = User.query.filter(
+        User.username.in_(names) | User.email.in_(names) | User.id.in_(ids)
+    ).all()
+    by_key = {}
+    for u in found:
+        by_key.update({u.username: u, u.email: u, str(u.id): u})
+    
+    resolved = {}
+    not_found = []
+    for value in names:
+        if value in by_key:
+            resolved[by_key[value].id] = by_key[value]
+        else:
+            not_found.append(value)
+    return resolved, not_found
+
+@app.route('/api/teams/<int:team_id>/members/bulk/', methods=['POST'])
+@login_required
+@idempotent
+def bulk_team_members(team_id):
+    """Add, remove or move many members in one transaction.
+    
+    Body: {"action": "add" | "remove" | "move", "members": [username, email or id, ...],
+    "to_team_id": <id, for move>}. Leaders stay where they are.
+    """
+    user = User.query.get(session['user_id'])
+    data = request.get_json() or {}
+    action = data.get('action')
+    identifiers = data.get('members') or []
+    
+    if action not in ('add', 'remove', 'move'):
+        return jsonify({'error': 'action must be add, remove or move'}), 400
+    if not isinstance(identifiers, list) or not identifiers:
+        return jsonify({'error': 'members must be a non-empty list'}), 400
+    if len(identifiers) > 1000:
+        return jsonify({'error': 'At most 1000 members per request'}), 400
+    
+    team = Team.query.get_or_404(team_id)
+    target_team = team
+    if action == 'move':
+        target_team = Team.query.get(data.get('to_team_id') or 0)
+        if not target_team or target_team.id == team_id:
+            return jsonify({'error': 'to_team_id must be another existing team'}), 400
+    
+    # Leaders manage their own team; moving needs leadership of both teams
+    if user.role != 'admin' and not {team_id, target_team.id} <= led_team_ids(user.id):
+        return jsonify({'error': 'Only team leaders or admins can manage members'}), 403
+    
+    resolved, not_found = resolve_users(identifiers)
+    not_volunteers = [u.username for u in resolved.values() if u.role != 'volunteer']
+    volunteer_ids = [u.id for u in resolved.values() if u.role == 'volunteer']
+    
+    result = {'not_found': not_found, 'not_volunteers': not_volunteers}
+    connection = db.session.connection()
+    
+    if action in ('remove', 'move'):
+        memberships = db.session.execute(
+            MEMBERSHIPS_OF_USERS, {'team_id': team_id, 'user_ids': volunteer_ids}
+        ).scalars().all()
+        leaders = [m.user_id for m in memberships if m.role == 'leader']
+        removable = [m for m in memberships if m.role != 'leader']
+        removable_ids = [m.user_id for m in removable]
+        
+        if action == 'move':
+            now = datetime.utcnow()
+            insert_ignoring_conflicts(connection, TeamMember.__table__, [
+                {'team_id': target_team.id, 'user_id': user_id, 'role': 'member', 'joined_at': now, 'updated_at': now}
+                for user_id in removable_ids
+            ], ['team_id', 'user_id'])
+        
+        if removable:
+            record_tombstones('team_members', [(m.id, m.user_id, team_id) for m in removable])
+            db.session.execute(TeamMember.__table__.delete().where(
+                TeamMember.__table__.c.id.in_([m.id for m in removable])
+            ))
+        result['moved' if action == 'move' else 'removed'] = len(removable)
+        result['leaders_skipped'] = [resolved[user_id].username for user_id in leaders]
+        member_ids = {m.user_id for m in memberships}
+        result['not_members'] = [resolved[user_id].username for user_id in volunteer_ids if user_id not in member_ids]
+    else:
+        now = datetime.utcnow()
+        result['added'] = insert_ignoring_conflicts(connection, TeamMember.__table__, [
+            {'team_id': team_id, 'user_id': user_id, 'role': 'member', 'joined_at': now, 'updated_at': now}
+            for user_id in volunteer_ids
+        ], ['team_id', 'user_id'])
+        result['already_members'] = len(volunteer_ids) - result['added']
+    
+    recount_pending_work_logs(connection, {team_id, target_team.id})
+    db.session.commit()
+    
+    result['success'] = True
+    return jsonify(result)
+
 @app.route('/api/users/search/', methods=['GET'])
 @login_required
 def search_users():
@@ -916,106 +2608,78 @@ def search_users():
     return jsonify({'users': user_list})
 
 # Team-specific data endpoints
-@app.route('/api/teams/<int:team_id>/projects/', methods=['GET'])
-@login_required
-def get_team_projects(team_id):
-    user = User.query.get(session['user_id'])
+def get_team_context(team_id, user):
+    """Load a team and its memberships once and check the user may view it.
+    
+    Returns (team, memberships, error) where error is a ready-made response
+    tuple when the user is neither an admin nor a member of the team.
+    """
     team = Team.query.get_or_404(team_id)
+    memberships = team_memberships(team_id)
     
     # Check if user is team member or admin
-    is_member = TeamMember.query.filter_by(team_id=team_id, user_id=user.id).first()
-    if user.role != 'admin' and not is_member:
-        return jsonify({'error': 'Access denied'}), 403
+    if user.role != 'admin' and not any(m.user_id == user.id for m in memberships):
+        return team, memberships, (jsonify({'error': 'Access denied'}), 403)
     
-    # Get team projects (both assigned to team and created by team members)
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
-    member_ids = [member.user_id for member in team_members]
+    return team, memberships, None
+
+def team_members_section(team, memberships, users=None):
+    member_ids = [m.user_id for m in memberships]
+    member_users = users_by_ids(member_ids)
+    
+    members = []
+    for membership in memberships:
+        user = member_users[membership.user_id]
+        if users is not None:
+            members.append(attach_user({
+                'role': membership.role,
+                'joined_at': membership.joined_at.isoformat()
+            }, user, ('full_name', 'college_name'), users, prefix='user'))
+            continue
+        members.append({
+            'id': user.id,
+            'username': user.username,
+            'full_name': user.full_name,
+            'college_name': user.college_name,
+            'role': membership.role,
+            'joined_at': membership.joined_at.isoformat()
+        })
+    
+    return members
+
+def team_projects_section(team, memberships, users=None, only=None):
+    member_ids = [m.user_id for m in memberships]
     
     # Get projects that are either assigned to the team OR created by team members
-    projects = Project.query.filter(
-        (Project.team_id == team_id) | 
+    projects = load_fields(Project.query.filter(
+        (Project.team_id == team.id) | 
         (Project.volunteer_id.in_(member_ids))
-    ).order_by(Project.created_at.desc()).all()
+    ), PROJECT_FIELDS, only).order_by(Project.created_at.desc()).all()
     
     project_list = []
     for project in projects:
-        project_list.append({
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'status': project.status,
-            'volunteer': project.volunteer.username,
-            'volunteer_details': {
-                'full_name': project.volunteer.full_name,
-                'college_name': project.volunteer.college_name
-            },
-            'created_at': project.created_at.isoformat(),
-            'start_date': project.start_date.isoformat() if project.start_date else None,
-            'end_date': project.end_date.isoformat() if project.end_date else None
-        })
+        row = serialize_fields(project, PROJECT_FIELDS, TEAM_PROJECT_FIELDS, only)
+        if only is None or 'volunteer' in only:
+            attach_user(row, project.volunteer, ('full_name', 'college_name'), users)
+        project_list.append(row)
     
-    return jsonify({'projects': project_list})
+    return project_list
 
-@app.route('/api/teams/<int:team_id>/work-logs/', methods=['GET'])
-@login_required
-def get_team_work_logs(team_id):
-    user = User.query.get(session['user_id'])
-    team = Team.query.get_or_404(team_id)
-    
-    # Check if user is team member or admin
-    is_member = TeamMember.query.filter_by(team_id=team_id, user_id=user.id).first()
-    if user.role != 'admin' and not is_member:
-        return jsonify({'error': 'Access denied'}), 403
-    
-    # Get work logs from all team members
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
-    member_ids = [member.user_id for member in team_members]
+def team_work_logs_section(team, memberships, users=None, only=None, filters=None):
+    member_ids = [m.user_id for m in memberships]
     
-    logs = WorkLog.query.filter(WorkLog.volunteer_id.in_(member_ids)).order_by(WorkLog.date.desc()).all()
+    logs = fetch_work_logs(filters or {}, member_ids, only)
     
-    work_logs = []
-    for log in logs:
-        work_logs.append({
-            'id': log.id,
-            'date': log.date.isoformat(),
-            'hours_worked': log.hours_worked,
-            'description': log.description,
-            'status': log.status,
-            'volunteer': log.volunteer.username,
-            'volunteer_details': {
-                'full_name': log.volunteer.full_name,
-                'college_name': log.volunteer.college_name,
-                'course': log.volunteer.course,
-                'year_of_study': log.volunteer.year_of_study,
-                'phone': log.volunteer.phone,
-                'email': log.volunteer.email
-            }
-        })
-    
-    return jsonify({'work_logs': work_logs})
+    return [work_log_row(log, users, only=only) for log in logs]
 
-@app.route('/api/teams/<int:team_id>/documents/', methods=['GET'])
-@login_required
-def get_team_documents(team_id):
-    user = User.query.get(session['user_id'])
-    team = Team.query.get_or_404(team_id)
-    
-    # Check if user is team member or admin
-    is_member = TeamMember.query.filter_by(team_id=team_id, user_id=user.id).first()
-    if user.role != 'admin' and not is_member:
-        return jsonify({'error': 'Access denied'}), 403
-    
-    # Get documents from team projects and team members
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
-    member_ids = [member.user_id for member in team_members]
-    
-    team_projects = Project.query.filter_by(team_id=team_id).all()
-    project_ids = [project.id for project in team_projects]
+def team_documents_section(team, memberships, users=None):
+    member_ids = [m.user_id for m in memberships]
+    project_ids = db.session.execute(PROJECT_IDS_BY_TEAM, {'team_id': team.id}).scalars().all()
     
     # Get documents that are specifically shared with this team
     team_access_docs = db.session.query(Document).join(
         DocumentTeamAccess, Document.id == DocumentTeamAccess.document_id
-    ).filter(DocumentTeamAccess.team_id == team_id).all()
+    ).filter(DocumentTeamAccess.team_id == team.id).all()
     
     # Get documents from team members and team projects
     member_project_docs = Document.query.filter(
@@ -1033,104 +2697,194 @@ def get_team_documents(team_id):
     
     doc_list = []
     for doc in documents:
-        doc_list.append({
+        doc_list.append(attach_user({
             'id': doc.id,
             'title': doc.title,
             'document_type': doc.document_type,
             'drive_link': doc.drive_link,
-            'uploaded_by': doc.uploaded_by_user.username,
-            'uploaded_by_details': {
-                'full_name': doc.uploaded_by_user.full_name,
-                'college_name': doc.uploaded_by_user.college_name,
-                'course': doc.uploaded_by_user.course
-            },
             'created_at': doc.created_at.isoformat()
-        })
+        }, doc.uploaded_by_user, ('full_name', 'college_name', 'course'), users, prefix='uploaded_by'))
     
-    return jsonify({'documents': doc_list})
+    return doc_list
 
-@app.route('/api/teams/<int:team_id>/stats/', methods=['GET'])
-@login_required
-def get_team_stats(team_id):
-    user = User.query.get(session['user_id'])
-    team = Team.query.get_or_404(team_id)
-    
-    # Check if user is team member or admin
-    is_member = TeamMember.query.filter_by(team_id=team_id, user_id=user.id).first()
-    if user.role != 'admin' and not is_member:
-        return jsonify({'error': 'Access denied'}), 403
-    
-    # Get team statistics
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
-    member_ids = [member.user_id for member in team_members]
-    
-    # Total hours by team
-    total_hours = db.session.query(db.func.sum(WorkLog.hours_worked)).filter(
-        WorkLog.volunteer_id.in_(member_ids)
-    ).scalar() or 0
+def team_stats_section(team, memberships, users=None):
+    member_ids = [m.user_id for m in memberships]
     
-    # Pending approvals
-    pending_logs = WorkLog.query.filter(
-        WorkLog.volunteer_id.in_(member_ids),
-        WorkLog.status == 'pending'
-    ).count()
+    total_hours = db.session.execute(HOURS_BY_VOLUNTEERS, {'volunteer_ids': member_ids}).scalar()
+    pending_logs = pending_count('work_log', team.id)
+    total_hours = (total_hours or 0) + sum(hours for hours, count in archived_totals(member_ids).values())
     
-    # Team projects
-    team_projects = Project.query.filter_by(team_id=team_id).count()
+    # Team projects and active projects
+    team_projects, active_projects = db.session.query(
+        db.func.count(Project.id),
+        db.func.count(db.case((Project.status.in_(['approved', 'in_progress']), 1)))
+    ).filter(Project.team_id == team.id).one()
     
-    # Active projects
-    active_projects = Project.query.filter(
-        Project.team_id == team_id,
-        Project.status.in_(['approved', 'in_progress'])
-    ).count()
-    
-    return jsonify({
-        'total_hours': float(total_hours),
+    return {
+        'total_hours': float(total_hours or 0),
         'pending_approvals': pending_logs,
         'total_projects': team_projects,
         'active_projects': active_projects,
-        'member_count': len(team_members)
-    })
+        'member_count': len(memberships)
+    }
 
-@app.route('/api/teams/<int:team_id>/member-hours/', methods=['GET'])
-@login_required
-def get_team_member_hours(team_id):
-    user = User.query.get(session['user_id'])
-    team = Team.query.get_or_404(team_id)
-    
-    # Check if user is team member or admin
-    is_member = TeamMember.query.filter_by(team_id=team_id, user_id=user.id).first()
-    if user.role != 'admin' and not is_member:
-        return jsonify({'error': 'Access denied'}), 403
+def team_member_hours_section(team, memberships, users=None):
+    member_ids = [m.user_id for m in memberships]
+    if not member_ids:
+        return []
     
-    # Get team members with their total hours
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
+    member_users = users_by_ids(member_ids)
+    hours = dict(db.session.execute(HOURS_PER_VOLUNTEER, {'volunteer_ids': member_ids}).all())
+    for volunteer_id, (archived_hours, count) in archived_totals(member_ids).items():
+        hours[volunteer_id] = (hours.get(volunteer_id) or 0) + archived_hours
     
     member_hours = []
-    for member in team_members:
-        volunteer = User.query.get(member.user_id)
-        total_hours = db.session.query(db.func.sum(WorkLog.hours_worked)).filter(
-            WorkLog.volunteer_id == member.user_id
-        ).scalar() or 0
-        
-        member_hours.append({
-            'user_id': volunteer.id,
-            'username': volunteer.username,
-            'full_name': volunteer.full_name,
-            'total_hours': float(total_hours),
+    for member in memberships:
+        volunteer = member_users[member.user_id]
+        row = {
+            'total_hours': float(hours.get(member.user_id) or 0),
             'role': member.role
-        })
+        }
+        if users is not None:
+            attach_user(row, volunteer, ('full_name',), users, prefix='user')
+        else:
+            row.update({
+                'user_id': volunteer.id,
+                'username': volunteer.username,
+                'full_name': volunteer.full_name
+            })
+        member_hours.append(row)
     
     # Sort by total hours descending
     member_hours.sort(key=lambda x: x['total_hours'], reverse=True)
     
-    return jsonify({
-        'member_hours': member_hours
-    })
+    return member_hours
+
+# Sections available through the composite team detail endpoint. Each one takes
+# the team, its memberships and an optional users map for normalized responses.
+TEAM_DETAIL_SECTIONS = {
+    'members': team_members_section,
+    'projects': team_projects_section,
+    'work_logs': team_work_logs_section,
+    'documents': team_documents_section,
+    'stats': team_stats_section,
+    'member_hours': team_member_hours_section
+}
+
+# Tables the sections read, for the response cache
+TEAM_DETAIL_TABLES = ('team', 'team_member', 'user', 'project', 'work_log', 'archived_work_log', 'work_log_archive_rollup',
+                      'document', 'document_team_access', 'pending_approval_count')
+
+@app.route('/api/teams/<int:team_id>/detail/', methods=['GET'])
+@login_required
+@cached_response(TEAM_DETAIL_TABLES, team_scope)
+def get_team_detail(team_id):
+    """Get several team sections in one response, e.g. ?sections=members,stats"""
+    user = User.query.get(session['user_id'])
+    
+    sections = request.args.get('sections', '').strip()
+    if sections:
+        sections = [name.strip() for name in sections.split(',') if name.strip()]
+        unknown = [name for name in sections if name not in TEAM_DETAIL_SECTIONS]
+        if unknown:
+            return jsonify({'error': f'Unknown sections: {", ".join(unknown)}'}), 400
+    else:
+        sections = list(TEAM_DETAIL_SECTIONS)
+    
+    team, memberships, error = get_team_context(team_id, user)
+    if error:
+        return error
+    
+    users = {} if wants_normalized() else None
+    response = {
+        'team': {
+            'id': team.id,
+            'name': team.name,
+            'description': team.description,
+            'created_by_id': team.created_by_id,
+            'member_count': len(memberships),
+            'created_at': team.created_at.isoformat()
+        }
+    }
+    for name in sections:
+        response[name] = TEAM_DETAIL_SECTIONS[name](team, memberships, users)
+    
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
+
+def team_section_response(team_id, key, section, allowed_fields=None, **kwargs):
+    """Serve a single team section as its own endpoint.
+    
+    Sections listed with allowed_fields also accept a ?fields= selection.
+    Any other keyword arguments are passed through to the section.
+    """
+    user = User.query.get(session['user_id'])
+    if allowed_fields:
+        kwargs['only'], error = requested_fields(allowed_fields)
+        if error:
+            return error
+    
+    team, memberships, error = get_team_context(team_id, user)
+    if error:
+        return error
+    
+    users = {} if wants_normalized() else None
+    response = {key: section(team, memberships, users, **kwargs)}
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
+
+@app.route('/api/teams/<int:team_id>/projects/', methods=['GET'])
+@login_required
+@cached_response(('project', 'team', 'team_member', 'user'), team_scope)
+def get_team_projects(team_id):
+    return team_section_response(team_id, 'projects', team_projects_section, TEAM_PROJECT_FIELDS)
+
+@app.route('/api/teams/<int:team_id>/work-logs/', methods=['GET'])
+@login_required
+def get_team_work_logs(team_id):
+    filters, error = work_log_filters()
+    if error:
+        return error
+    
+    if wants_count():
+        team, memberships, error = get_team_context(team_id, User.query.get(session['user_id']))
+        if error:
+            return error
+        return jsonify({'count': count_work_logs(filters, [m.user_id for m in memberships])})
+    
+    return team_section_response(team_id, 'work_logs', team_work_logs_section, WORK_LOG_ROW_FIELDS, filters=filters)
+
+@app.route('/api/teams/<int:team_id>/documents/', methods=['GET'])
+@login_required
+@cached_response(('document', 'document_team_access', 'project', 'team', 'team_member', 'user'), team_scope)
+def get_team_documents(team_id):
+    return team_section_response(team_id, 'documents', team_documents_section)
+
+@app.route('/api/teams/<int:team_id>/stats/', methods=['GET'])
+@login_required
+@cached_response(('project', 'team', 'team_member', 'work_log', 'work_log_archive_rollup', 'pending_approval_count'), team_scope)
+@single_flight(team_scope)
+def get_team_stats(team_id):
+    user = User.query.get(session['user_id'])
+    team, memberships, error = get_team_context(team_id, user)
+    if error:
+        return error
+    
+    return jsonify(team_stats_section(team, memberships))
+
+@app.route('/api/teams/<int:team_id>/member-hours/', methods=['GET'])
+@login_required
+@cached_response(('team', 'team_member', 'user', 'work_log', 'work_log_archive_rollup'), team_scope)
+@single_flight(team_scope)
+def get_team_member_hours(team_id):
+    return team_section_response(team_id, 'member_hours', team_member_hours_section)
 
 # Admin Team Management Routes
 @app.route('/api/admin/teams/create/', methods=['POST'])
 @admin_required
+@idempotent
 def admin_create_team():
     data = request.get_json()
     
@@ -1145,6 +2899,62 @@ def admin_create_team():
     
     return jsonify({'success': True, 'team_id': team.id})
 
+def team_deletion_impact(team_id):
+    """Rows that deleting the team would remove, and projects and open events blocking it, in one query"""
+    team_events = db.select(Event.id).where(Event.team_id == team_id)
+    members, shares, projects, open_events, closed_events, attendees = db.session.execute(db.select(
+        db.select(db.func.count(TeamMember.id)).where(TeamMember.team_id == team_id).scalar_subquery(),
+        db.select(db.func.count(DocumentTeamAccess.id)).where(DocumentTeamAccess.team_id == team_id).scalar_subquery(),
+        db.select(db.func.count(Project.id)).where(Project.team_id == team_id).scalar_subquery(),
+        db.select(db.func.count(Event.id)).where(Event.team_id == team_id, Event.status == 'open').scalar_subquery(),
+        db.select(db.func.count(Event.id)).where(Event.team_id == team_id, Event.status != 'open').scalar_subquery(),
+        db.select(db.func.count(EventAttendee.id)).where(EventAttendee.event_id.in_(team_events)).scalar_subquery()
+    )).one()
+    return {'members': members, 'document_shares': shares, 'events': closed_events, 'event_attendees': attendees,
+            'blocking_projects': projects, 'blocking_events': open_events}
+
+def team_deletion_blocker(impact):
+    """Why the team cannot be deleted yet, or None"""
+    if impact['blocking_projects'] > 0:
+        return f"Cannot delete team with {impact['blocking_projects']} associated projects"
+    if impact['blocking_events'] > 0:
+        return f"Cannot delete team with {impact['blocking_events']} open events; close them first"
+    return None
+
+def team_dry_run_response(team, impact):
+    return jsonify({
+        'dry_run': True,
+        'team_id': team.id,
+        'team_name': team.name,
+        'deletable': team_deletion_blocker(impact) is None,
+        'impact': impact
+    })
+
+def delete_team_records(team):
+    """Delete a team with its memberships, document shares and closed events (caller commits).
+    
+    Work logs created when those events closed are kept.
+    """
+    # Delete team members first
+    record_tombstones_from('team_members', db.select(TeamMember.id, TeamMember.user_id, TeamMember.team_id).where(
+        TeamMember.team_id == team.id
+    ))
+    db.session.execute(db.delete(TeamMember).where(TeamMember.team_id == team.id))
+    
+    # Delete team documents access; the documents' sync rows lose this team
+    shared_ids = db.select(DocumentTeamAccess.document_id).where(DocumentTeamAccess.team_id == team.id)
+    db.session.execute(db.update(Document).where(Document.id.in_(shared_ids)).values(updated_at=datetime.utcnow()))
+    db.session.execute(db.delete(DocumentTeamAccess).where(DocumentTeamAccess.team_id == team.id))
+    
+    # Delete the team's (closed) events and their rosters
+    team_events = db.select(Event.id).where(Event.team_id == team.id)
+    db.session.execute(db.delete(EventAttendee).where(EventAttendee.event_id.in_(team_events)))
+    db.session.execute(db.delete(Event).where(Event.team_id == team.id))
+    
+    # Delete the team and its approval counters
+    db.session.execute(db.delete(PendingApprovalCount).where(PendingApprovalCount.team_id == team.id))
+    db.session.execute(db.delete(Team).where(Team.id == team.id))
+
 @app.route('/api/admin/teams/<int:team_id>/delete/', methods=['DELETE'])
 @admin_required
 def admin_delete_team(team_id):
@@ -1152,23 +2962,19 @@ def admin_delete_team(team_id):
     
     try:
         # Check if team has associated projects
-        team_projects = Project.query.filter_by(team_id=team_id).count()
-        if team_projects > 0:
-            return jsonify({'error': f'Cannot delete team with {team_projects} associated projects'}), 400
+        impact = team_deletion_impact(team_id)
+        if request.args.get('dry_run') in ('1', 'true'):
+            return team_dry_run_response(team, impact)
         
-        # Delete team members first
-        TeamMember.query.filter_by(team_id=team_id).delete()
+        blocker = team_deletion_blocker(impact)
+        if blocker:
+            return jsonify({'error': blocker}), 400
         
-        # Delete team documents access
-        team_docs = Document.query.join(DocumentTeamAccess).filter(DocumentTeamAccess.team_id == team_id).all()
-        for doc in team_docs:
-            DocumentTeamAccess.query.filter_by(document_id=doc.id, team_id=team_id).delete()
-        
-        # Delete the team
-        db.session.delete(team)
+        team_name = team.name
+        delete_team_records(team)
         db.session.commit()
         
-        return jsonify({'success': True, 'message': f'Team "{team.name}" deleted successfully'})
+        return jsonify({'success': True, 'message': f'Team "{team_name}" deleted successfully'})
         
     except Exception as e:
         db.session.rollback()
@@ -1189,23 +2995,19 @@ def delete_team(team_id):
     
     try:
         # Check if team has associated projects
-        team_projects = Project.query.filter_by(team_id=team_id).count()
-        if team_projects > 0:
-            return jsonify({'error': f'Cannot delete team with {team_projects} associated projects'}), 400
-        
-        # Delete team members first
-        TeamMember.query.filter_by(team_id=team_id).delete()
+        impact = team_deletion_impact(team_id)
+        if request.args.get('dry_run') in ('1', 'true'):
+            return team_dry_run_response(team, impact)
         
-        # Delete team documents access
-        team_docs = Document.query.join(DocumentTeamAccess).filter(DocumentTeamAccess.team_id == team_id).all()
-        for doc in team_docs:
-            DocumentTeamAccess.query.filter_by(document_id=doc.id, team_id=team_id).delete()
+        blocker = team_deletion_blocker(impact)
+        if blocker:
+            return jsonify({'error': blocker}), 400
         
-        # Delete the team
-        db.session.delete(team)
+        team_name = team.name
+        delete_team_records(team)
         db.session.commit()
         
-        return jsonify({'success': True, 'message': f'Team "{team.name}" deleted successfully'})
+        return jsonify({'success': True, 'message': f'Team "{team_name}" deleted successfully'})
         
     except Exception as e:
         db.session.rollback()
@@ -1248,6 +3050,7 @@ def complete_project(project_id):
 # Document Routes
 @app.route('/api/volunteers/documents/', methods=['GET'])
 @login_required
+@cached_response(('document', 'document_team_access', 'project', 'team', 'team_member', 'user'))
 def get_documents():
     user = get_current_user()
     if not user:
@@ -1255,7 +3058,7 @@ def get_documents():
     
     if user.role == 'volunteer':
         # Get user's team memberships
-        user_teams = TeamMember.query.filter_by(user_id=user.id).all()
+        user_teams = user_memberships(user.id)
         user_team_ids = [tm.team_id for tm in user_teams]
         
         # Get all documents
@@ -1284,7 +3087,7 @@ def get_documents():
                     documents.append(doc)
             elif doc_uploader and doc_uploader.role == 'volunteer' and user_team_ids:
                 # Volunteer documents - only visible to team members
-                uploader_teams = TeamMember.query.filter_by(user_id=doc.uploaded_by_id).all()
+                uploader_teams = user_memberships(doc.uploaded_by_id)
                 uploader_team_ids = [tm.team_id for tm in uploader_teams]
                 
                 # Check if uploader and current user share any teams
@@ -1297,6 +3100,9 @@ def get_documents():
         # Admins see all documents
         documents = Document.query.order_by(Document.created_at.desc()).all()
     
+    users = {} if wants_normalized() else None
+    teams = {} if users is not None else None
+    
     doc_list = []
     for doc in documents:
         # Get team access info for display
@@ -1305,33 +3111,28 @@ def get_documents():
             for access in doc.team_access:
                 team = Team.query.get(access.team_id)
                 if team:
-                    team_access.append({
-                        'team_id': team.id,
-                        'team_name': team.name
-                    })
+                    team_access.append(attach_team({}, team, teams))
         
         doc_data = {
             'id': doc.id,
             'title': doc.title,
             'document_type': doc.document_type,
             'drive_link': doc.drive_link,
-            'uploaded_by': doc.uploaded_by_user.username,
-            'uploaded_by_details': {
-                'full_name': doc.uploaded_by_user.full_name,
-                'college_name': doc.uploaded_by_user.college_name,
-                'course': doc.uploaded_by_user.course
-            },
             'created_at': doc.created_at.isoformat(),
             'team_access': team_access,
             'is_global': len(team_access) == 0  # No team restrictions = global access
         }
+        attach_user(doc_data, doc.uploaded_by_user, ('full_name', 'college_name', 'course'), users, prefix='uploaded_by')
         
         doc_list.append(doc_data)
     
+    if users is not None:
+        return jsonify({'documents': doc_list, 'users': users, 'teams': teams})
     return jsonify({'documents': doc_list})
 
 @app.route('/api/volunteers/documents/upload/', methods=['POST'])
 @login_required
+@idempotent
 def upload_document():
     user = get_current_user()
     if not user:
@@ -1361,7 +3162,7 @@ def upload_document():
                 return jsonify({'error': 'One or more invalid team IDs provided'}), 400
         else:
             # Volunteers can only share with teams they're members of
-            user_team_ids = [membership.team_id for membership in TeamMember.query.filter_by(user_id=user.id).all()]
+            user_team_ids = [m.team_id for m in user_memberships(user.id)]
             invalid_teams = [team_id for team_id in team_ids if team_id not in user_team_ids]
             if invalid_teams:
                 return jsonify({'error': 'You can only share documents with teams you are a member of'}), 403
@@ -1417,6 +3218,8 @@ def delete_document(document_id):
         # Store document info for response
         document_title = document.title
         
+        record_document_tombstones([document_id])
+        
         # Delete team access records first (cascade should handle this, but being explicit)
         DocumentTeamAccess.query.filter_by(document_id=document_id).delete()
         
@@ -1438,145 +3241,124 @@ def delete_document(document_id):
 @admin_required
 def get_team_pending_approvals(team_id):
     """Get pending work log approvals for a specific team"""
+    only, error = requested_fields(WORK_LOG_ROW_FIELDS)
+    if error:
+        return error
+    
     team = Team.query.get_or_404(team_id)
     
     # Get team members
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
+    team_members = team_memberships(team_id)
     member_ids = [member.user_id for member in team_members]
     
     if not member_ids:
         return jsonify({'work_logs': [], 'team_name': team.name})
     
     # Get pending work logs from team members
-    pending_logs = WorkLog.query.filter(
+    pending_logs = load_fields(WorkLog.query.filter(
         WorkLog.volunteer_id.in_(member_ids),
         WorkLog.status == 'pending'
-    ).order_by(WorkLog.date.desc()).all()
+    ), WORK_LOG_FIELDS, only).order_by(WorkLog.date.desc()).all()
     
-    work_logs = []
-    for log in pending_logs:
-        work_logs.append({
-            'id': log.id,
-            'date': log.date.isoformat(),
-            'hours_worked': log.hours_worked,
-            'description': log.description,
-            'status': log.status,
-            'volunteer': log.volunteer.username,
-            'volunteer_details': {
-                'full_name': log.volunteer.full_name,
-                'college_name': log.volunteer.college_name,
-                'course': log.volunteer.course,
-                'year_of_study': log.volunteer.year_of_study,
-                'phone': log.volunteer.phone,
-                'email': log.volunteer.email
-            }
-        })
+    users = {} if wants_normalized() else None
+    work_logs = [work_log_row(log, users, only=only) for log in pending_logs]
     
-    return jsonify({
+    response = {
         'work_logs': work_logs,
         'team_name': team.name,
         'team_id': team_id,
         'pending_count': len(work_logs)
-    })
+    }
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
 
 @app.route('/api/admin/teams/<int:team_id>/work-logs/', methods=['GET'])
 @admin_required
 def get_team_all_work_logs(team_id):
     """Get all work logs for a specific team"""
+    only, error = requested_fields(WORK_LOG_ROW_FIELDS)
+    if error:
+        return error
+    filters, error = work_log_filters()
+    if error:
+        return error
+    
     team = Team.query.get_or_404(team_id)
     
     # Get team members
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
+    team_members = team_memberships(team_id)
     member_ids = [member.user_id for member in team_members]
     
+    if wants_count():
+        count = count_work_logs(filters, member_ids) if member_ids else 0
+        return jsonify({'count': count, 'team_name': team.name, 'team_id': team_id})
+    
     if not member_ids:
         return jsonify({'work_logs': [], 'team_name': team.name})
     
     # Get all work logs from team members
-    all_logs = WorkLog.query.filter(
-        WorkLog.volunteer_id.in_(member_ids)
-    ).order_by(WorkLog.date.desc()).all()
-    
-    work_logs = []
-    for log in all_logs:
-        work_logs.append({
-            'id': log.id,
-            'date': log.date.isoformat(),
-            'hours_worked': log.hours_worked,
-            'description': log.description,
-            'status': log.status,
-            'volunteer': log.volunteer.username,
-            'volunteer_details': {
-                'full_name': log.volunteer.full_name,
-                'college_name': log.volunteer.college_name,
-                'course': log.volunteer.course,
-                'year_of_study': log.volunteer.year_of_study,
-                'phone': log.volunteer.phone,
-                'email': log.volunteer.email
-            }
-        })
+    all_logs = fetch_work_logs(filters, member_ids, only)
     
-    # Debug info
-    total_work_logs = WorkLog.query.count()
+    users = {} if wants_normalized() else None
+    work_logs = [work_log_row(log, users, only=only) for log in all_logs]
     
-    return jsonify({
+    response = {
         'work_logs': work_logs,
         'team_name': team.name,
         'team_id': team_id,
         'total_count': len(work_logs),
-        'member_count': len(member_ids),
-        'member_ids': member_ids,  # For debugging
-        'debug': {
-            'total_work_logs_in_db': total_work_logs,
-            'team_member_usernames': [User.query.get(uid).username for uid in member_ids if User.query.get(uid)]
-        }
-    })
+        'member_count': len(member_ids)
+    }
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
 
 @app.route('/api/admin/teams/<int:team_id>/projects/', methods=['GET'])
 @admin_required
 def get_team_admin_projects(team_id):
     """Get projects for a specific team (admin view)"""
+    only, error = requested_fields(ADMIN_TEAM_PROJECT_FIELDS)
+    if error:
+        return error
+    
     team = Team.query.get_or_404(team_id)
     
     # Get team members
-    team_members = TeamMember.query.filter_by(team_id=team_id).all()
+    team_members = team_memberships(team_id)
     member_ids = [member.user_id for member in team_members]
     
     # Get projects that are either assigned to the team OR created by team members
-    projects = Project.query.filter(
+    projects = load_fields(Project.query.filter(
         (Project.team_id == team_id) | 
         (Project.volunteer_id.in_(member_ids))
-    ).order_by(Project.created_at.desc()).all()
+    ), PROJECT_FIELDS, only).order_by(Project.created_at.desc()).all()
     
+    users = {} if wants_normalized() else None
     project_list = []
     for project in projects:
-        project_list.append({
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'status': project.status,
-            'volunteer': project.volunteer.username,
-            'volunteer_details': {
-                'full_name': project.volunteer.full_name,
-                'college_name': project.volunteer.college_name,
-                'course': project.volunteer.course
-            },
-            'created_at': project.created_at.isoformat(),
-            'is_team_project': project.is_team_project,
-            'start_date': project.start_date.isoformat() if project.start_date else None,
-            'end_date': project.end_date.isoformat() if project.end_date else None
-        })
+        row = serialize_fields(project, PROJECT_FIELDS, ADMIN_TEAM_PROJECT_FIELDS, only)
+        if only is None or 'volunteer' in only:
+            attach_user(row, project.volunteer, ('full_name', 'college_name', 'course'), users)
+        project_list.append(row)
     
-    return jsonify({
+    response = {
         'projects': project_list,
         'team_name': team.name,
         'team_id': team_id
-    })
+    }
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
 
 @app.route('/api/admin/unassigned/work-logs/', methods=['GET'])
 @admin_required
 def get_unassigned_work_logs():
     """Get work logs from volunteers not in any team"""
+    only, error = requested_fields(WORK_LOG_ROW_FIELDS)
+    if error:
+        return error
+    
     # Get all users who are not in any team
     assigned_user_ids = db.session.query(TeamMember.user_id).distinct().all()
     assigned_user_ids = [uid[0] for uid in assigned_user_ids]
@@ -1592,34 +3374,22 @@ def get_unassigned_work_logs():
         return jsonify({'work_logs': [], 'volunteer_count': 0})
     
     # Get work logs from unassigned volunteers
-    work_logs = WorkLog.query.filter(
+    # Status is always loaded for the pending count
+    work_logs = load_fields(WorkLog.query.filter(
         WorkLog.volunteer_id.in_(unassigned_user_ids)
-    ).order_by(WorkLog.date.desc()).all()
-    
-    log_list = []
-    for log in work_logs:
-        log_list.append({
-            'id': log.id,
-            'date': log.date.isoformat(),
-            'hours_worked': log.hours_worked,
-            'description': log.description,
-            'status': log.status,
-            'volunteer': log.volunteer.username,
-            'volunteer_details': {
-                'full_name': log.volunteer.full_name,
-                'college_name': log.volunteer.college_name,
-                'course': log.volunteer.course,
-                'year_of_study': log.volunteer.year_of_study,
-                'phone': log.volunteer.phone,
-                'email': log.volunteer.email
-            }
-        })
+    ), WORK_LOG_FIELDS, only and only | {'status'}).order_by(WorkLog.date.desc()).all()
     
-    return jsonify({
+    users = {} if wants_normalized() else None
+    log_list = [work_log_row(log, users, only=only) for log in work_logs]
+    
+    response = {
         'work_logs': log_list,
         'volunteer_count': len(unassigned_users),
-        'pending_count': len([log for log in log_list if log['status'] == 'pending'])
-    })
+        'pending_count': len([log for log in work_logs if log.status == 'pending'])
+    }
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
 
 @app.route('/api/admin/check/', methods=['GET'])
 @login_required
@@ -1640,6 +3410,10 @@ def check_admin_status():
 @admin_required
 def get_unassigned_projects():
     """Get projects from volunteers not in any team"""
+    only, error = requested_fields(TEAM_PROJECT_FIELDS)
+    if error:
+        return error
+    
     # Get all users who are not in any team
     assigned_user_ids = db.session.query(TeamMember.user_id).distinct().all()
     assigned_user_ids = [uid[0] for uid in assigned_user_ids]
@@ -1655,37 +3429,32 @@ def get_unassigned_projects():
         return jsonify({'projects': [], 'volunteer_count': 0})
     
     # Get projects from unassigned volunteers (excluding team projects)
-    projects = Project.query.filter(
+    # Status is always loaded for the pending count
+    projects = load_fields(Project.query.filter(
         Project.volunteer_id.in_(unassigned_user_ids),
         Project.team_id.is_(None)
-    ).order_by(Project.created_at.desc()).all()
+    ), PROJECT_FIELDS, only and only | {'status'}).order_by(Project.created_at.desc()).all()
     
+    users = {} if wants_normalized() else None
     project_list = []
     for project in projects:
-        project_list.append({
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'status': project.status,
-            'volunteer': project.volunteer.username,
-            'volunteer_details': {
-                'full_name': project.volunteer.full_name,
-                'college_name': project.volunteer.college_name,
-                'course': project.volunteer.course
-            },
-            'created_at': project.created_at.isoformat(),
-            'start_date': project.start_date.isoformat() if project.start_date else None,
-            'end_date': project.end_date.isoformat() if project.end_date else None
-        })
+        row = serialize_fields(project, PROJECT_FIELDS, TEAM_PROJECT_FIELDS, only)
+        if only is None or 'volunteer' in only:
+            attach_user(row, project.volunteer, ('full_name', 'college_name', 'course'), users)
+        project_list.append(row)
     
-    return jsonify({
+    response = {
         'projects': project_list,
         'volunteer_count': len(unassigned_users),
-        'pending_count': len([p for p in project_list if p['status'] == 'submitted'])
-    })
+        'pending_count': len([p for p in projects if p.status == 'submitted'])
+    }
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
 
 @app.route('/api/admin/unassigned/volunteers/', methods=['GET'])
 @admin_required
+@single_flight()
 def get_unassigned_volunteers():
     """Get all volunteers not assigned to any team with their details"""
     # Get all users who are not in any team
@@ -1697,11 +3466,14 @@ def get_unassigned_volunteers():
         ~User.id.in_(assigned_user_ids)
     ).order_by(User.created_at.desc()).all()
     
+    archived = archived_totals([user.id for user in unassigned_users])
+    
     volunteer_list = []
     for user in unassigned_users:
         # Get user's work logs count and total hours
-        work_logs = WorkLog.query.filter_by(volunteer_id=user.id).all()
-        total_hours = sum(log.hours_worked for log in work_logs)
+        work_logs = db.session.execute(WORK_LOGS_BY_VOLUNTEER, {'volunteer_id': user.id}).scalars().all()
+        archived_hours, archived_count = archived.get(user.id, (0, 0))
+        total_hours = sum(log.hours_worked for log in work_logs) + archived_hours
         pending_logs = len([log for log in work_logs if log.status == 'pending'])
         
         # Get user's projects count
@@ -1720,7 +3492,7 @@ def get_unassigned_volunteers():
             'created_at': user.created_at.isoformat(),
             'stats': {
                 'total_hours': total_hours,
-                'work_logs_count': len(work_logs),
+                'work_logs_count': len(work_logs) + archived_count,
                 'pending_logs': pending_logs,
                 'projects_count': len(projects),
                 'pending_projects': pending_projects
@@ -1734,6 +3506,7 @@ def get_unassigned_volunteers():
 
 @app.route('/api/admin/teams/<int:team_id>/batch-approve/', methods=['POST'])
 @admin_required
+@idempotent
 def batch_approve_team_logs(team_id):
     """Batch approve work logs for a specific team"""
     data = request.get_json()
@@ -1751,7 +3524,7 @@ def batch_approve_team_logs(team_id):
         team = Team.query.get_or_404(team_id)
         
         # Get team member IDs for validation
-        team_members = TeamMember.query.filter_by(team_id=team_id).all()
+        team_members = team_memberships(team_id)
         member_ids = [member.user_id for member in team_members]
         
         # Update work logs (only those belonging to team members)
@@ -1767,6 +3540,7 @@ def batch_approve_team_logs(team_id):
         for log in updated_logs:
             log.status = action
             log.approved_by_id = session['user_id']
+            publish_event(f'work_log.{action}', user_id=log.volunteer_id, team_id=team_id, log_id=log.id, status=action)
         
         db.session.commit()
         
@@ -1781,64 +3555,2817 @@ def batch_approve_team_logs(team_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to update work logs. Please try again.'}), 500
 
-# Initialize database
-def init_db():
-    with app.app_context():
-        db.create_all()
+# Event Stream Routes
+STREAM_MAX_SECONDS = 300  # Streams end after this long; EventSource reconnects with Last-Event-ID
+STREAM_KEEPALIVE_SECONDS = 15
+STREAM_REPLAY_LIMIT = 500  # Further behind than this, the client is told to resync instead
+# Open streams per worker. Each holds a thread under gthread workers, so by
+# default they may take half of them; the rest keep serving the API.
+STREAM_MAX_PER_WORKER = int(os.environ.get('STREAM_MAX_PER_WORKER', 0)) or max(1, WORKER_CONCURRENCY // 2)
+STREAM_BUSY_RETRY_MS = 30000
+STREAM_EVENT_RETENTION = timedelta(days=1)
+
+def publish_event(event_type, user_id=None, team_id=None, **data):
+    """Queue a stream event in the current transaction.
+    
+    The event row is committed together with the change it describes, so
+    subscribers never hear about writes that were rolled back.
+    """
+    db.session.add(StreamEvent(
+        event_type=event_type,
+        user_id=user_id,
+        team_id=team_id,
+        payload=json.dumps(data)
+    ))
+    db.session.info['stream_events'] = True
+
+class EventBroker:
+    """Fans committed stream events out to this worker's SSE subscribers.
+    
+    One poller thread per worker reads new stream_event rows and hands them
+    to local subscriber queues. Every gunicorn worker and instance sharing the
+    database sees the same rows, which gives cross-worker fan-out without an
+    external message broker. Commits in this worker wake the poller early.
+    """
+    
+    GAP_WINDOW = 100  # Re-read this many IDs back to catch late commits of lower IDs
+    
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.last_id = None
+        self.delivered = deque(maxlen=self.GAP_WINDOW * 2)
+        self.last_prune = time.monotonic()
+    
+    def subscribe(self):
+        subscription = queue.Queue(maxsize=1000)
+        with self.lock:
+            self.subscribers.add(subscription)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='event-broker', daemon=True)
+                self.thread.start()
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+    
+    def run(self):
+        with app.app_context():
+            while True:
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"❌ Event broker error: {e}")
+                finally:
+                    db.session.remove()
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+    
+    def poll(self):
+        if self.last_id is None:
+            # Start from the current end of the stream
+            self.last_id = db.session.query(db.func.max(StreamEvent.id)).scalar() or 0
+            self.delivered.extend(row.id for row in db.session.query(StreamEvent.id).filter(
+                StreamEvent.id > self.last_id - self.GAP_WINDOW
+            ))
         
-        # Create Akshar Paaul NGO admin account if it doesn't exist
-        admin = User.query.filter_by(username='AksharPaaulNGO').first()
-        if not admin:
-            admin = User(
-                username='AksharPaaulNGO',
-                email='admin@aksharpaaul.org',
-                password_hash=generate_password_hash('admin123'),
-                role='admin',
-                full_name='Akshar Paaul Administrator'
-            )
-            db.session.add(admin)
-            print("Akshar Paaul NGO admin account created: AksharPaaulNGO/admin123")
+        rows = StreamEvent.query.filter(
+            StreamEvent.id > self.last_id - self.GAP_WINDOW
+        ).order_by(StreamEvent.id).limit(500).all()
         
-        db.session.commit()
+        events = []
+        for row in rows:
+            if row.id in self.delivered:
+                continue
+            self.delivered.append(row.id)
+            self.last_id = max(self.last_id, row.id)
+            events.append(stream_event_dict(row))
+        
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for event in events:
+            for subscription in subscribers:
+                try:
+                    subscription.put_nowait(event)
+                except queue.Full:
+                    pass  # Slow client; it catches up from Last-Event-ID on reconnect
+        
+        # Old events are only needed for reconnect replay
+        if time.monotonic() - self.last_prune > 600:
+            self.last_prune = time.monotonic()
+            StreamEvent.query.filter(StreamEvent.created_at < datetime.utcnow() - STREAM_EVENT_RETENTION).delete()
+            db.session.commit()
 
-# Serve React App - MUST BE LAST
-@app.route('/')
-def serve():
-    if app.static_folder and os.path.exists(os.path.join(app.static_folder, 'index.html')):
-        return send_from_directory(app.static_folder, 'index.html')
-    else:
-        return jsonify({'message': 'API is running. Frontend not built yet.'}), 200
+event_broker = EventBroker()
 
-@app.route('/<path:path>')
-def static_proxy(path):
-    print(f"Static proxy called with path: {path}")
-    print(f"Static folder: {app.static_folder}")
-    
-    # Skip API routes
-    if path.startswith('api/'):
-        return jsonify({'error': 'API endpoint not found'}), 404
-    
-    # Try to serve static file first
-    if app.static_folder:
-        try:
-            file_path = os.path.join(app.static_folder, path)
-            print(f"Checking file: {file_path}")
-            if os.path.exists(file_path) and os.path.isfile(file_path):
-                return send_from_directory(app.static_folder, path)
-        except Exception as e:
-            print(f"Error serving static file: {e}")
+@db.event.listens_for(db.session, 'after_commit')
+def wake_event_broker(db_session):
+    if db_session.info.pop('stream_events', False):
+        event_broker.wakeup.set()
+
+def stream_event_dict(row):
+    return {
+        'id': row.id,
+        'type': row.event_type,
+        'user_id': row.user_id,
+        'team_id': row.team_id,
+        'data': json.loads(row.payload),
+        'created_at': row.created_at.isoformat()
+    }
+
+def event_scope(user):
+    """Users and teams whose events a user may receive (None means everything).
     
-    # Fallback to index.html for React Router
-    if app.static_folder:
-        try:
-            index_path = os.path.join(app.static_folder, 'index.html')
-            print(f"Fallback to index.html: {index_path}")
-            if os.path.exists(index_path):
-                return send_from_directory(app.static_folder, 'index.html')
-        except Exception as e:
-            print(f"Error serving index.html: {e}")
+    Volunteers get events about themselves; team leaders also get events about
+    their teams and the members of those teams.
+    """
+    if user.role == 'admin':
+        return None
     
-    return jsonify({'error': 'Frontend not found', 'path': path, 'static_folder': app.static_folder}), 404
+    led = led_team_ids(user.id)
+    user_ids = {user.id}
+    if led:
+        user_ids.update(row.user_id for row in db.session.query(TeamMember.user_id).filter(
+            TeamMember.team_id.in_(led)
+        ).all())
+    return user_ids, led
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+open_streams = {'count': 0, 'lock': threading.Lock()}
+
+def release_stream():
+    with open_streams['lock']:
+        open_streams['count'] -= 1
+
+@app.route('/api/events/stream/', methods=['GET'])
+@login_required
+def stream_events():
+    """Server-sent event stream of work log and project status changes.
+    
+    A client more than STREAM_REPLAY_LIMIT events behind gets a single
+    `resync` event instead of the replay and should reload what it shows.
+    When the worker already holds STREAM_MAX_PER_WORKER streams, the response
+    only tells EventSource to reconnect after STREAM_BUSY_RETRY_MS.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Authentication required'}), 401
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or 0)
+    except ValueError:
+        return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+    
+    with open_streams['lock']:
+        busy = open_streams['count'] >= STREAM_MAX_PER_WORKER
+        if not busy:
+            open_streams['count'] += 1
+    if busy:
+        return Response(f'retry: {STREAM_BUSY_RETRY_MS}\nevent: busy\ndata: {{}}\n\n', mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache'})
+    try:
+        response = event_stream_response(user, last_event_id)
+    except Exception:
+        release_stream()
+        raise
+    response.call_on_close(release_stream)
+    return response
+
+def event_stream_response(user, last_event_id):
+    scope = event_scope(user)
+    
+    def visible(event):
+        if scope is None:
+            return True
+        user_ids, team_ids = scope
+        return event['user_id'] in user_ids or event['team_id'] in team_ids
+    
+    # Subscribe before replaying so nothing committed in between is lost
+    subscription = event_broker.subscribe()
+    backlog = []
+    resync = None
+    if last_event_id:
+        rows = StreamEvent.query.filter(StreamEvent.id > last_event_id).order_by(StreamEvent.id).limit(
+            STREAM_REPLAY_LIMIT + 1
+        ).all()
+        if len(rows) > STREAM_REPLAY_LIMIT:
+            # Too far behind to replay; skip to the newest event and have the client reload
+            last_event_id = db.session.query(db.func.max(StreamEvent.id)).scalar()
+            resync = {'id': last_event_id, 'type': 'resync'}
+        else:
+            backlog = [stream_event_dict(row) for row in rows]
+    
+    def generate():
+        sent = set()
+        try:
+            yield 'retry: 3000\n\n'
+            if resync:
+                yield format_sse(resync)
+            for event in backlog:
+                sent.add(event['id'])
+                if visible(event):
+                    yield format_sse(event)
+            
+            deadline = time.monotonic() + STREAM_MAX_SECONDS
+            while time.monotonic() < deadline:
+                try:
+                    event = subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if event['id'] in sent or event['id'] <= last_event_id:
+                    continue
+                sent.add(event['id'])
+                if visible(event):
+                    yield format_sse(event)
+        finally:
+            event_broker.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+# Cache Invalidation Bus
+CACHE_BUS_ORIGIN = f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}'
+CACHE_INVALIDATION_RETENTION = timedelta(hours=1)
+
+@db.event.listens_for(db.session, 'before_commit')
+def publish_cache_tags(db_session):
+    """Write this transaction's cache tags to the outbox so they commit with it"""
+    if not RESPONSE_CACHE_ENABLED:
+        return
+    # before_commit runs ahead of the commit's own flush; flush now so its tags are included
+    db_session.flush()
+    conn = db_session.connection()
+    tags = conn.info.get('cache_tags')
+    if tags:
+        conn.execute(CacheInvalidation.__table__.insert().values(
+            origin=CACHE_BUS_ORIGIN, tags=json.dumps(sorted(tags)), created_at=datetime.utcnow()
+        ))
+
+class CacheInvalidationBus:
+    """Applies invalidations committed by other workers and nodes to this worker's cache.
+    
+    Works like EventBroker: one poller thread reads new cache_invalidation
+    rows by ID. IDs are sequence numbers; an ID that stays missing for
+    GAP_TIMEOUT seconds (rolled back, pruned, or missed while this worker
+    was stalled) means an invalidation may have been lost, so the whole
+    local cache is flushed.
+    """
+    
+    GAP_WINDOW = 100  # Re-read this many IDs back to catch late commits of lower IDs
+    GAP_TIMEOUT = 10
+    
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.thread = None
+        self.last_id = None
+        self.seen = deque(maxlen=self.GAP_WINDOW * 2)
+        self.missing = {}  # id -> monotonic time first noticed
+        self.last_prune = time.monotonic()
+        self.stats = {'applied': 0, 'gap_flushes': 0}
+    
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='cache-bus', daemon=True)
+                self.thread.start()
+    
+    def run(self):
+        with app.app_context():
+            while True:
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"❌ Cache bus error: {e}")
+                finally:
+                    db.session.remove()
+                time.sleep(self.poll_interval)
+    
+    def poll(self):
+        table = CacheInvalidation.__table__
+        if self.last_id is None:
+            # Start from the current end; this worker's cache is empty anyway
+            self.last_id = db.session.execute(db.select(db.func.max(table.c.id))).scalar() or 0
+            self.seen.extend(db.session.execute(
+                db.select(table.c.id).where(table.c.id > self.last_id - self.GAP_WINDOW)
+            ).scalars())
+        
+        while True:
+            rows = db.session.execute(db.select(table.c.id, table.c.origin, table.c.tags).where(
+                table.c.id > self.last_id - self.GAP_WINDOW
+            ).order_by(table.c.id).limit(500)).all()
+            fresh = [row for row in rows if row.id not in self.seen]
+            
+            for row in fresh:
+                self.seen.append(row.id)
+                self.missing.pop(row.id, None)
+                # Our own writes were applied locally at commit time
+                if row.origin != CACHE_BUS_ORIGIN:
+                    response_cache.invalidate(json.loads(row.tags))
+                    self.stats['applied'] += 1
+                if row.id > self.last_id:
+                    now = time.monotonic()
+                    for gap in range(self.last_id + 1, row.id):
+                        if gap not in self.seen:
+                            self.missing.setdefault(gap, now)
+                    self.last_id = row.id
+            
+            if len(rows) < 500 or not fresh:
+                break
+        
+        now = time.monotonic()
+        lost = [gap for gap, noticed in self.missing.items()
+                if now - noticed > self.GAP_TIMEOUT or gap <= self.last_id - self.GAP_WINDOW]
+        if lost:
+            for gap in lost:
+                del self.missing[gap]
+            response_cache.clear()
+            self.stats['gap_flushes'] += 1
+            print(f"⚠️ Cache bus missed {len(lost)} invalidations; flushed the response cache")
+        
+        if now - self.last_prune > 600:
+            self.last_prune = now
+            db.session.execute(table.delete().where(table.c.created_at < datetime.utcnow() - CACHE_INVALIDATION_RETENTION))
+            db.session.commit()
+
+cache_bus = CacheInvalidationBus()
+
+# Delta Sync Routes
+SYNC_OVERLAP_SECONDS = 5  # Rows this close to the token are re-sent to cover in-flight transactions
+SYNC_EPOCH = datetime(1970, 1, 1)
+
+def record_tombstones(entity, rows):
+    """Remember deleted rows for the sync feed. rows are (id, user_id, team_id) tuples."""
+    db.session.add_all([
+        SyncTombstone(entity=entity, entity_id=entity_id, user_id=user_id, team_id=team_id)
+        for entity_id, user_id, team_id in rows
+    ])
+
+def record_tombstones_from(entity, select):
+    """Set-based record_tombstones: select yields (id, user_id, team_id) rows"""
+    db.session.execute(db.insert(SyncTombstone).from_select(
+        ['entity', 'entity_id', 'user_id', 'team_id', 'deleted_at'],
+        db.select(db.literal(entity), *select.subquery().c, db.literal(datetime.utcnow()))
+    ))
+
+def record_document_tombstones(document_ids):
+    """Tombstones for documents about to be deleted, one per audience: the
+    uploader, each team it is shared with, and the uploader's teams for
+    volunteer documents. Admin documents shared with no team go to everyone.
+    document_ids is a list or select of IDs; call before deleting the shares."""
+    admin_ids = db.select(User.id).where(User.role == 'admin')
+    unshared_admin_document = db.and_(Document.uploaded_by_id.in_(admin_ids), ~Document.team_access.any())
+    record_tombstones_from('documents', db.select(
+        Document.id, db.case((unshared_admin_document, db.null()), else_=Document.uploaded_by_id), db.null()
+    ).where(Document.id.in_(document_ids)))
+    record_tombstones_from('documents', db.select(
+        Document.id, Document.uploaded_by_id, DocumentTeamAccess.team_id
+    ).join(DocumentTeamAccess, DocumentTeamAccess.document_id == Document.id).where(Document.id.in_(document_ids)))
+    record_tombstones_from('documents', db.select(
+        Document.id, Document.uploaded_by_id, TeamMember.team_id
+    ).join(TeamMember, TeamMember.user_id == Document.uploaded_by_id).where(
+        Document.id.in_(document_ids), ~Document.uploaded_by_id.in_(admin_ids)
+    ))
+
+@db.event.listens_for(db.session, 'before_flush')
+def touch_shared_documents(db_session, flush_context, instances):
+    """A document's team shares are part of its sync row, so adding or
+    removing one moves Document.updated_at forward"""
+    document_ids = {obj.document_id for obj in list(db_session.new) + list(db_session.deleted)
+                    if isinstance(obj, DocumentTeamAccess) and obj.document_id is not None}
+    if document_ids:
+        db_session.connection().execute(
+            db.update(Document).where(Document.id.in_(document_ids)).values(updated_at=datetime.utcnow())
+        )
+
+def encode_sync_token(moment):
+    return str(int((moment - SYNC_EPOCH).total_seconds() * 1000000))
+
+def decode_sync_token(token):
+    try:
+        return SYNC_EPOCH + timedelta(microseconds=int(token))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def visible_documents_filter(user, team_ids):
+    """SQL version of the volunteer document visibility rules in get_documents"""
+    admin_ids = db.session.query(User.id).filter(User.role == 'admin')
+    co_member_ids = db.session.query(TeamMember.user_id).filter(TeamMember.team_id.in_(team_ids))
+    
+    return db.or_(
+        # User's own documents
+        Document.uploaded_by_id == user.id,
+        # Global admin documents and admin documents shared with user's teams
+        db.and_(Document.uploaded_by_id.in_(admin_ids), ~Document.team_access.any()),
+        db.and_(
+            Document.uploaded_by_id.in_(admin_ids),
+            Document.team_access.any(DocumentTeamAccess.team_id.in_(team_ids))
+        ),
+        # Volunteer documents from members of the user's teams
+        db.and_(~Document.uploaded_by_id.in_(admin_ids), Document.uploaded_by_id.in_(co_member_ids))
+    )
+
+@app.route('/api/sync/', methods=['GET'])
+@login_required
+def sync_changes():
+    """Get rows the user can see that changed since ?since=<token>.
+    
+    Without a token every visible row is returned. Clients keep the returned
+    token for the next call and upsert rows by ID; consecutive responses
+    overlap slightly, so a row may be sent twice.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    since = None
+    if request.args.get('since'):
+        since = decode_sync_token(request.args['since'])
+        if since is None:
+            return jsonify({'error': 'Invalid sync token'}), 400
+        since -= timedelta(seconds=SYNC_OVERLAP_SECONDS)
+    
+    # Taken before reading so changes committed meanwhile are picked up next time
+    next_token = encode_sync_token(datetime.utcnow())
+    
+    work_logs = WorkLog.query
+    projects = Project.query
+    documents = Document.query
+    memberships = TeamMember.query
+    updates = ProjectUpdate.query
+    tombstones = SyncTombstone.query
+    
+    if user.role != 'admin':
+        team_ids = db.session.query(TeamMember.team_id).filter(TeamMember.user_id == user.id)
+        project_filter = (Project.volunteer_id == user.id) | Project.team_id.in_(team_ids)
+        
+        work_logs = work_logs.filter(WorkLog.volunteer_id == user.id)
+        projects = projects.filter(project_filter)
+        documents = documents.filter(visible_documents_filter(user, team_ids))
+        memberships = memberships.filter(TeamMember.team_id.in_(team_ids))
+        updates = updates.filter(ProjectUpdate.project_id.in_(db.session.query(Project.id).filter(project_filter)))
+        tombstones = tombstones.filter(
+            (SyncTombstone.user_id == user.id) |
+            SyncTombstone.team_id.in_(team_ids) |
+            (SyncTombstone.user_id.is_(None) & SyncTombstone.team_id.is_(None))
+        )
+    
+    if since is not None:
+        work_logs = work_logs.filter(WorkLog.updated_at > since)
+        projects = projects.filter(Project.updated_at > since)
+        documents = documents.filter(Document.updated_at > since)
+        memberships = memberships.filter(TeamMember.updated_at > since)
+        updates = updates.filter(ProjectUpdate.updated_at > since)
+        tombstones = tombstones.filter(SyncTombstone.deleted_at > since)
+    
+    users = {}
+    
+    work_log_list = []
+    for log in work_logs.order_by(WorkLog.updated_at).all():
+        row = work_log_row(log, users)
+        row['updated_at'] = log.updated_at.isoformat()
+        work_log_list.append(row)
+    
+    project_list = []
+    for project in projects.order_by(Project.updated_at).all():
+        row = serialize_fields(project, PROJECT_FIELDS, list(PROJECT_FIELDS))
+        row['team_id'] = project.team_id
+        row['updated_at'] = project.updated_at.isoformat()
+        project_list.append(attach_user(row, project.volunteer, ('full_name', 'college_name'), users))
+    
+    documents = documents.order_by(Document.updated_at).all()
+    document_teams = {}
+    if documents:
+        access_rows = db.session.query(DocumentTeamAccess.document_id, DocumentTeamAccess.team_id).filter(
+            DocumentTeamAccess.document_id.in_([doc.id for doc in documents])
+        ).all()
+        for document_id, team_id in access_rows:
+            document_teams.setdefault(document_id, []).append(team_id)
+    
+    document_list = []
+    for doc in documents:
+        document_list.append(attach_user({
+            'id': doc.id,
+            'title': doc.title,
+            'document_type': doc.document_type,
+            'drive_link': doc.drive_link,
+            'project_id': doc.project_id,
+            'team_ids': document_teams.get(doc.id, []),
+            'created_at': doc.created_at.isoformat(),
+            'updated_at': doc.updated_at.isoformat()
+        }, doc.uploaded_by_user, ('full_name', 'college_name', 'course'), users, prefix='uploaded_by'))
+    
+    membership_list = []
+    for membership in memberships.order_by(TeamMember.updated_at).all():
+        membership_list.append({
+            'id': membership.id,
+            'team_id': membership.team_id,
+            'user_id': membership.user_id,
+            'role': membership.role,
+            'joined_at': membership.joined_at.isoformat(),
+            'updated_at': membership.updated_at.isoformat()
+        })
+    
+    update_list = []
+    for update in updates.order_by(ProjectUpdate.updated_at).all():
+        update_list.append({
+            'id': update.id,
+            'project_id': update.project_id,
+            'title': update.title,
+            'description': update.description,
+            'created_by_id': update.created_by_id,
+            'created_at': update.created_at.isoformat(),
+            'updated_at': update.updated_at.isoformat()
+        })
+    
+    deleted = {}
+    for tombstone in tombstones.order_by(SyncTombstone.deleted_at).all():
+        deleted.setdefault(tombstone.entity, []).append(tombstone.entity_id)
+    
+    return jsonify({
+        'token': next_token,
+        'full': since is None,
+        'work_logs': work_log_list,
+        'projects': project_list,
+        'documents': document_list,
+        'team_members': membership_list,
+        'project_updates': update_list,
+        'deleted': deleted,
+        'users': users
+    })
+
+# Background Jobs
+JOB_HANDLERS = {}
+JOB_STALE_AFTER = timedelta(minutes=10)  # Running jobs without a heartbeat this long are requeued
+JOB_REQUEUE_INTERVAL = 60  # Seconds between the worker's sweeps for stale jobs
+JOB_HEARTBEAT_INTERVAL = 30  # Seconds between heartbeats of a running job, whether or not it reports
+EXPORT_FOLDER = os.path.join(app.config['UPLOAD_FOLDER'], 'exports')
+
+class JobCancelled(Exception):
+    pass
+
+def job_handler(job_type):
+    """Register a function as the handler for a background job type.
+    
+    Handlers receive the job's params and a report(progress, message)
+    callback, and return a JSON-serializable result. report() commits the
+    session and raises JobCancelled once an admin has asked the job to stop.
+    """
+    def register(f):
+        JOB_HANDLERS[job_type] = f
+        return f
+    return register
+
+def job_dict(job):
+    return {
+        'id': job.id,
+        'job_type': job.job_type,
+        'status': job.status,
+        'params': json.loads(job.params),
+        'progress': job.progress,
+        'progress_message': job.progress_message,
+        'error': job.error,
+        'cancel_requested': job.cancel_requested,
+        'has_result': job.result is not None,
+        'created_by_id': job.created_by_id,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+def claim_next_job():
+    """Atomically move the oldest queued job to running; returns (job ID, claim token) or None"""
+    while True:
+        candidate = db.session.query(BackgroundJob.id).filter_by(status='queued').order_by(BackgroundJob.id).first()
+        if not candidate:
+            db.session.rollback()
+            return None
+        
+        now = datetime.utcnow()
+        claim = f'{CACHE_BUS_ORIGIN}:{secrets.token_hex(4)}'
+        claimed = BackgroundJob.query.filter_by(id=candidate.id, status='queued').update(
+            {'status': 'running', 'started_at': now, 'heartbeat_at': now, 'claimed_by': claim},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if claimed:
+            return candidate.id, claim
+        # Another worker claimed it first; try the next one
+
+def requeue_stale_jobs():
+    """Put jobs whose worker died back in the queue"""
+    stale = BackgroundJob.query.filter(
+        BackgroundJob.status == 'running',
+        BackgroundJob.heartbeat_at < datetime.utcnow() - JOB_STALE_AFTER
+    ).update({'status': 'queued', 'progress_message': 'Requeued after worker stopped'}, synchronize_session=False)
+    db.session.commit()
+    return stale
+
+def job_heartbeat(job_id, claim, stop):
+    """Keep a claimed job's heartbeat fresh until stop is set or the claim is lost"""
+    with app.app_context():
+        try:
+            while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+                beat = BackgroundJob.query.filter_by(id=job_id, status='running', claimed_by=claim).update(
+                    {'heartbeat_at': datetime.utcnow()}, synchronize_session=False
+                )
+                db.session.commit()
+                if not beat:
+                    return
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Heartbeat for job {job_id} stopped: {e}")
+        finally:
+            db.session.remove()
+
+def execute_job(job_id, claim):
+    """Run one claimed job in its own app context and record the outcome.
+    
+    A heartbeat thread keeps the job from looking stale while a handler runs
+    without reporting. Every write is guarded by the claim token, so a job
+    that was requeued anyway cannot be overwritten by its first run.
+    """
+    with app.app_context():
+        job = BackgroundJob.query.get(job_id)
+        handler = JOB_HANDLERS.get(job.job_type)
+        owned = BackgroundJob.query.filter_by(id=job_id, status='running', claimed_by=claim)
+        
+        def report(progress, message=None):
+            updates = {'progress': max(0, min(100, int(progress))), 'heartbeat_at': datetime.utcnow()}
+            if message:
+                updates['progress_message'] = message[:200]
+            held = owned.update(updates, synchronize_session=False)
+            db.session.commit()
+            cancelled = db.session.query(BackgroundJob.cancel_requested).filter_by(id=job_id).scalar()
+            if cancelled or not held:
+                raise JobCancelled()
+        
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=job_heartbeat, args=(job_id, claim, stop),
+                                     name=f'job-{job_id}-heartbeat', daemon=True)
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise ValueError(f'Unknown job type: {job.job_type}')
+            result = handler(json.loads(job.params), report)
+            status, updates = 'succeeded', {'result': json.dumps(result), 'progress': 100}
+        except JobCancelled:
+            db.session.rollback()
+            status, updates = 'cancelled', {}
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Job {job_id} failed: {e}")
+            status, updates = 'failed', {'error': str(e)}
+        finally:
+            stop.set()
+            heartbeat.join()
+            db.session.expire_all()
+        
+        updates.update({'status': status, 'finished_at': datetime.utcnow()})
+        if owned.update(updates, synchronize_session=False):
+            publish_event(f'job.{status}', user_id=job.created_by_id, job_id=job_id, job_type=job.job_type)
+        else:
+            print(f"⚠️ Job {job_id} was requeued while this worker ran it; discarding its {status} outcome")
+        db.session.commit()
+        db.session.remove()
+
+def run_job_worker(threads=2, poll_interval=2.0, once=False):
+    """Claim queued jobs and run them on a thread pool until stopped.
+    
+    With once=True the worker exits when the queue is empty (useful for cron).
+    Jobs left running by a worker that died are requeued at start and every
+    JOB_REQUEUE_INTERVAL seconds, so one live worker recovers them.
+    """
+    with app.app_context():
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job') as pool:
+            active = set()
+            last_requeue = None
+            while True:
+                if last_requeue is None or time.monotonic() - last_requeue >= JOB_REQUEUE_INTERVAL:
+                    last_requeue = time.monotonic()
+                    requeued = requeue_stale_jobs()
+                    if requeued:
+                        print(f"Requeued {requeued} stale jobs")
+                
+                active = {future for future in active if not future.done()}
+                while len(active) < threads:
+                    claimed = claim_next_job()
+                    if claimed is None:
+                        break
+                    print(f"▶️ Running job {claimed[0]}")
+                    active.add(pool.submit(execute_job, *claimed))
+                
+                if once and not active:
+                    return
+                time.sleep(poll_interval)
+
+@app.cli.command('jobs-worker')
+@click.option('--threads', default=2, show_default=True, help='Jobs run concurrently.')
+@click.option('--once', is_flag=True, help='Exit when the queue is empty.')
+def jobs_worker_command(threads, once):
+    """Run the background job worker: flask --app app jobs-worker"""
+    run_job_worker(threads=threads, once=once)
+
+@job_handler('export_work_logs')
+def export_work_logs_job(params, report):
+    """Write work logs (optionally filtered by team/status) to a CSV file"""
+    filters = {'team_id': params.get('team_id') or None, 'status': params.get('status') or None}
+    total = db.session.execute(EXPORT_WORK_LOG_COUNT, filters).scalar()
+    os.makedirs(EXPORT_FOLDER, exist_ok=True)
+    filename = f"work_logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(4)}.csv"
+    path = os.path.join(EXPORT_FOLDER, filename)
+    
+    try:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'date', 'hours_worked', 'status', 'description', 'username', 'full_name', 'college_name', 'course'])
+            
+            # Keyset batches so progress reports (which commit) never interrupt a cursor
+            count, last_id = 0, 0
+            while True:
+                batch = db.session.execute(
+                    EXPORT_WORK_LOG_BATCH, dict(filters, after_id=last_id, batch_size=500)
+                ).all()
+                if not batch:
+                    break
+                for log, volunteer in batch:
+                    writer.writerow([log.id, log.date.isoformat(), log.hours_worked, log.status, log.description,
+                                     volunteer.username, volunteer.full_name, volunteer.college_name, volunteer.course])
+                count += len(batch)
+                last_id = batch[-1][0].id
+                db.session.expunge_all()
+                report(count * 100 // max(total, 1), f'{count}/{total} rows')
+    except Exception:
+        os.remove(path)
+        raise
+    
+    return {'file': filename, 'rows': total}
+
+@job_handler('team_report')
+def team_report_job(params, report):
+    """Hours, approvals and project counts for every team (or the given team_ids)"""
+    if params.get('team_ids'):
+        teams = db.session.execute(TEAMS_BY_IDS, {'team_ids': list(params['team_ids'])}).scalars().all()
+    else:
+        teams = db.session.execute(TEAMS_BY_NAME).scalars().all()
+    
+    rows = []
+    for index, team in enumerate(teams, start=1):
+        member_ids = [m.user_id for m in team_memberships(team.id)]
+        hours = dict(db.session.execute(HOURS_BY_STATUS, {'volunteer_ids': member_ids}).all())
+        hours['approved'] = (hours.get('approved') or 0) + sum(
+            archived_hours for archived_hours, count in archived_totals(member_ids).values()
+        )
+        projects = dict(db.session.execute(PROJECT_COUNTS_BY_STATUS, {'team_id': team.id}).all())
+        
+        rows.append({
+            'team_id': team.id,
+            'team_name': team.name,
+            'member_count': len(member_ids),
+            'approved_hours': float(hours.get('approved') or 0),
+            'pending_hours': float(hours.get('pending') or 0),
+            'total_hours': float(sum(value or 0 for value in hours.values())),
+            'projects': projects
+        })
+        report(index * 100 // len(teams), f'{index}/{len(teams)} teams')
+    
+    return {'generated_at': datetime.utcnow().isoformat(), 'teams': rows}
+
+@job_handler('import_volunteers')
+def import_volunteers_job(params, report):
+    """Create volunteer accounts from params['users'], optionally adding them to params['team_id'].
+    
+    Rows whose username or email already exist are skipped. Each batch of 100
+    is committed, so a cancelled import keeps the batches already done.
+    """
+    rows = params.get('users', [])
+    team_id = params.get('team_id')
+    created, skipped = [], []
+    
+    for start in range(0, len(rows), 100):
+        batch = rows[start:start + 100]
+        batch_users = []
+        usernames = [row.get('username') for row in batch]
+        emails = [row.get('email') for row in batch]
+        taken = db.session.query(User.username, User.email).filter(
+            User.username.in_(usernames) | User.email.in_(emails)
+        ).all()
+        taken_usernames = {username for username, _ in taken}
+        taken_emails = {email for _, email in taken}
+        
+        for row in batch:
+            if not row.get('username') or not row.get('email') or \
+                    row['username'] in taken_usernames or row['email'] in taken_emails:
+                skipped.append(row.get('username') or row.get('email'))
+                continue
+            
+            user = User(
+                username=row['username'],
+                email=row['email'],
+                # Imported volunteers without a password sign in with Google
+                password_hash=generate_password_hash(row['password']) if row.get('password') else None,
+                role='volunteer',
+                full_name=row.get('full_name', ''),
+                phone=row.get('phone', ''),
+                college_name=row.get('college_name', ''),
+                course=row.get('course', ''),
+                year_of_study=row.get('year_of_study', '')
+            )
+            db.session.add(user)
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            batch_users.append(user)
+        
+        db.session.flush()  # Get user IDs
+        if team_id:
+            db.session.add_all([TeamMember(team_id=team_id, user_id=user.id, role='member') for user in batch_users])
+        db.session.commit()
+        created.extend(user.username for user in batch_users)
+        report((start + len(batch)) * 100 // len(rows), f'{start + len(batch)}/{len(rows)} rows')
+    
+    return {'created': created, 'skipped': skipped}
+
+@job_handler('delete_team')
+def delete_team_job(params, report):
+    team = Team.query.get(params['team_id'])
+    if not team:
+        raise ValueError('Team not found')
+    
+    blocker = team_deletion_blocker(team_deletion_impact(team.id))
+    if blocker:
+        raise ValueError(blocker)
+    
+    report(10, 'Deleting team')
+    name = team.name
+    delete_team_records(team)
+    db.session.commit()
+    return {'team_id': params['team_id'], 'team_name': name}
+
+@app.route('/api/admin/jobs/', methods=['GET'])
+@admin_required
+def list_jobs():
+    """Recent background jobs, newest first (?status= to filter)"""
+    jobs = BackgroundJob.query
+    if request.args.get('status'):
+        jobs = jobs.filter_by(status=request.args['status'])
+    jobs = jobs.order_by(BackgroundJob.id.desc()).limit(100).all()
+    
+    return jsonify({'jobs': [job_dict(job) for job in jobs]})
+
+@app.route('/api/admin/jobs/create/', methods=['POST'])
+@admin_required
+@idempotent
+def create_job():
+    data = request.get_json() or {}
+    job_type = data.get('job_type')
+    
+    if job_type not in JOB_HANDLERS:
+        return jsonify({'error': f'Unknown job type. Available: {", ".join(sorted(JOB_HANDLERS))}'}), 400
+    
+    job = BackgroundJob(
+        job_type=job_type,
+        params=json.dumps(data.get('params', {})),
+        created_by_id=session['user_id']
+    )
+    db.session.add(job)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'job': job_dict(job)}), 202
+
+@app.route('/api/admin/jobs/<int:job_id>/', methods=['GET'])
+@admin_required
+def get_job(job_id):
+    job = BackgroundJob.query.get_or_404(job_id)
+    return jsonify({'job': job_dict(job)})
+
+@app.route('/api/admin/jobs/<int:job_id>/cancel/', methods=['POST'])
+@admin_required
+def cancel_job(job_id):
+    job = BackgroundJob.query.get_or_404(job_id)
+    
+    if job.status == 'queued':
+        job.status = 'cancelled'
+        job.finished_at = datetime.utcnow()
+    elif job.status == 'running':
+        # The handler stops at its next progress report
+        job.cancel_requested = True
+    else:
+        return jsonify({'error': f'Job already {job.status}'}), 400
+    
+    db.session.commit()
+    return jsonify({'success': True, 'job': job_dict(job)})
+
+@app.route('/api/admin/jobs/<int:job_id>/result/', methods=['GET'])
+@admin_required
+def get_job_result(job_id):
+    """The job's result, or the exported file for export jobs"""
+    job = BackgroundJob.query.get_or_404(job_id)
+    
+    if job.status != 'succeeded':
+        return jsonify({'error': f'Job is {job.status}', 'job': job_dict(job)}), 409
+    
+    result = json.loads(job.result)
+    if isinstance(result, dict) and result.get('file') and request.args.get('download'):
+        return send_from_directory(os.path.abspath(EXPORT_FOLDER), result['file'], as_attachment=True)
+    return jsonify({'job': job_dict(job), 'result': result})
+
+# Work log aggregates
+WORK_LOG_CHANGE_HANDLERS = []
+BUCKET_PERIODS = ('day', 'week', 'month')
+
+def on_work_log_change(f):
+    """Register f(connection, changes) to keep an aggregate in step with work logs.
+    
+    changes is a list of (old, new) tuples of (volunteer_id, date, status,
+    hours) as of this flush; old is None for inserts and new is None for
+    deletes. Handlers run inside the flushing transaction.
+    """
+    WORK_LOG_CHANGE_HANDLERS.append(f)
+    return f
+
+def committed_value(obj, attr):
+    history = db.inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+def work_log_state(log, committed=False):
+    value = (lambda attr: committed_value(log, attr)) if committed else (lambda attr: getattr(log, attr))
+    return (value('volunteer_id'), value('date'), value('status') or 'pending', value('hours_worked'))
+
+@db.event.listens_for(db.session, 'before_flush')
+def collect_work_log_changes(db_session, flush_context, instances):
+    if not WORK_LOG_CHANGE_HANDLERS:
+        return
+    
+    changes = []
+    for obj in db_session.new:
+        if isinstance(obj, WorkLog):
+            changes.append((None, work_log_state(obj)))
+    for obj in db_session.dirty:
+        if isinstance(obj, WorkLog) and db_session.is_modified(obj):
+            old, new = work_log_state(obj, committed=True), work_log_state(obj)
+            if old != new:
+                changes.append((old, new))
+    for obj in db_session.deleted:
+        if isinstance(obj, WorkLog):
+            changes.append((work_log_state(obj, committed=True), None))
+    
+    if changes:
+        connection = db_session.connection()
+        for handler in WORK_LOG_CHANGE_HANDLERS:
+            handler(connection, changes)
+
+def dialect_insert(connection):
+    """The dialect's insert() supporting ON CONFLICT, or None if it has none"""
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if connection.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def insert_ignoring_conflicts(connection, table, rows, index_elements):
+    """INSERT ... ON CONFLICT DO NOTHING; returns the number of rows inserted"""
+    if not rows:
+        return 0
+    insert = dialect_insert(connection)
+    if insert:
+        return connection.execute(
+            insert(table).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+        ).rowcount
+    
+    existing = {tuple(row) for row in connection.execute(
+        db.select(*[table.c[name] for name in index_elements]).where(
+            db.tuple_(*[table.c[name] for name in index_elements]).in_(
+                [tuple(row[name] for name in index_elements) for row in rows]
+            )
+        )
+    )}
+    rows = [row for row in rows if tuple(row[name] for name in index_elements) not in existing]
+    if rows:
+        connection.execute(table.insert(), rows)
+    return len(rows)
+
+def upsert_increment(connection, table, keys, increments):
+    """Add increments to the row identified by keys, creating it if missing"""
+    insert = dialect_insert(connection)
+    if insert:
+        stmt = insert(table).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + stmt.excluded[name] for name in increments}
+        )
+        connection.execute(stmt)
+        return
+    
+    where = db.and_(*[table.c[name] == value for name, value in keys.items()])
+    updated = connection.execute(table.update().where(where).values(
+        **{name: table.c[name] + value for name, value in increments.items()}
+    ))
+    if updated.rowcount == 0:
+        connection.execute(table.insert().values(**keys, **increments))
+
+def bucket_start(day, period):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+@on_work_log_change
+def update_hour_buckets(connection, changes):
+    deltas = {}
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            volunteer_id, day, status, hours = state
+            for period in BUCKET_PERIODS:
+                key = (period, bucket_start(day, period), volunteer_id, status)
+                total_hours, count = deltas.get(key, (0.0, 0))
+                deltas[key] = (total_hours + sign * float(hours or 0), count + sign)
+    
+    for (period, start, volunteer_id, status), (hours, count) in deltas.items():
+        if hours == 0 and count == 0:
+            continue
+        upsert_increment(connection, HourBucket.__table__, {
+            'period': period,
+            'bucket_start': start,
+            'volunteer_id': volunteer_id,
+            'status': status
+        }, {'hours': hours, 'log_count': count})
+
+def rebuild_hour_buckets():
+    """Recompute every hour bucket from work_log and the archive"""
+    daily = []
+    for model in (WorkLog, ArchivedWorkLog):
+        daily += db.session.query(
+            model.volunteer_id, model.date, model.status,
+            db.func.sum(model.hours_worked), db.func.count(model.id)
+        ).group_by(model.volunteer_id, model.date, model.status).all()
+    
+    buckets = {}
+    for volunteer_id, day, status, hours, count in daily:
+        for period in BUCKET_PERIODS:
+            key = (period, bucket_start(day, period), volunteer_id, status or 'pending')
+            total_hours, total_count = buckets.get(key, (0.0, 0))
+            buckets[key] = (total_hours + float(hours or 0), total_count + count)
+    
+    HourBucket.query.delete()
+    rows = [
+        {'period': period, 'bucket_start': start, 'volunteer_id': volunteer_id, 'status': status,
+         'hours': hours, 'log_count': count}
+        for (period, start, volunteer_id, status), (hours, count) in buckets.items()
+    ]
+    for offset in range(0, len(rows), 1000):
+        db.session.execute(HourBucket.__table__.insert(), rows[offset:offset + 1000])
+    db.session.commit()
+    return len(rows)
+
+@app.cli.command('rebuild-hour-buckets')
+def rebuild_hour_buckets_command():
+    """Rebuild the reporting hour buckets from work log history"""
+    print(f"Rebuilt {rebuild_hour_buckets()} hour buckets")
+
+@job_handler('rebuild_hour_buckets')
+def rebuild_hour_buckets_job(params, report):
+    return {'buckets': rebuild_hour_buckets()}
+
+# Reporting Routes
+REPORT_GROUPS = ('team', 'volunteer', 'college', 'status')
+
+@app.route('/api/admin/reports/hours/', methods=['GET'])
+@admin_required
+@single_flight()
+def hours_report():
+    """Hours per day/week/month bucket grouped by team, volunteer, college or status.
+    
+    Query parameters: period (day|week|month), group_by, start/end (YYYY-MM-DD),
+    and optional status, team_id and volunteer_id filters.
+    """
+    period = request.args.get('period', 'week')
+    group_by = request.args.get('group_by', 'team')
+    if period not in BUCKET_PERIODS:
+        return jsonify({'error': f'period must be one of {", ".join(BUCKET_PERIODS)}'}), 400
+    if group_by not in REPORT_GROUPS:
+        return jsonify({'error': f'group_by must be one of {", ".join(REPORT_GROUPS)}'}), 400
+    
+    try:
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else date.today()
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') \
+            else end - timedelta(days=365)
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    
+    if group_by == 'team':
+        key, label = Team.id, Team.name
+    elif group_by == 'volunteer':
+        key, label = User.id, User.username
+    elif group_by == 'college':
+        key = label = db.func.coalesce(User.college_name, '')
+    else:
+        key = label = HourBucket.status
+    
+    query = db.session.query(
+        key, label, HourBucket.bucket_start,
+        db.func.sum(HourBucket.hours), db.func.sum(HourBucket.log_count)
+    ).filter(
+        HourBucket.period == period,
+        HourBucket.bucket_start >= bucket_start(start, period),
+        HourBucket.bucket_start <= end
+    )
+    if group_by in ('volunteer', 'college'):
+        query = query.join(User, User.id == HourBucket.volunteer_id)
+    if group_by == 'team' or request.args.get('team_id'):
+        query = query.join(TeamMember, TeamMember.user_id == HourBucket.volunteer_id)
+    if group_by == 'team':
+        query = query.join(Team, Team.id == TeamMember.team_id)
+    
+    if request.args.get('team_id'):
+        query = query.filter(TeamMember.team_id == request.args.get('team_id', type=int))
+    if request.args.get('volunteer_id'):
+        query = query.filter(HourBucket.volunteer_id == request.args.get('volunteer_id', type=int))
+    if request.args.get('status'):
+        query = query.filter(HourBucket.status == request.args['status'])
+    
+    series = {}
+    rows = query.group_by(key, label, HourBucket.bucket_start).having(
+        db.func.sum(HourBucket.log_count) != 0
+    ).order_by(HourBucket.bucket_start).all()
+    for group_key, group_label, start_day, hours, count in rows:
+        entry = series.setdefault(group_key, {'key': group_key, 'label': group_label, 'total_hours': 0.0, 'points': []})
+        entry['points'].append({'bucket': start_day.isoformat(), 'hours': float(hours or 0), 'log_count': int(count or 0)})
+        entry['total_hours'] += float(hours or 0)
+    
+    return jsonify({
+        'period': period,
+        'group_by': group_by,
+        'start': bucket_start(start, period).isoformat(),
+        'end': end.isoformat(),
+        'series': sorted(series.values(), key=lambda entry: entry['total_hours'], reverse=True)
+    })
+
+# Leaderboards
+LEADERBOARD_PERIODS = ('all', 'year', 'month')
+
+def leaderboard_start(day, period):
+    if period == 'year':
+        return day.replace(month=1, day=1)
+    if period == 'month':
+        return day.replace(day=1)
+    return date.min
+
+@on_work_log_change
+def update_leaderboard_scores(connection, changes):
+    deltas = {}
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None or state[2] != 'approved':
+                continue
+            volunteer_id, day, status, hours = state
+            for period in LEADERBOARD_PERIODS:
+                key = (period, leaderboard_start(day, period), volunteer_id)
+                total_hours, count = deltas.get(key, (0.0, 0))
+                deltas[key] = (total_hours + sign * float(hours or 0), count + sign)
+    
+    for (period, start, volunteer_id), (hours, count) in deltas.items():
+        if hours == 0 and count == 0:
+            continue
+        upsert_increment(connection, LeaderboardScore.__table__, {
+            'period': period,
+            'period_start': start,
+            'volunteer_id': volunteer_id
+        }, {'hours': hours, 'log_count': count})
+
+def rebuild_leaderboards():
+    """Recompute every leaderboard score from approved work logs, archived ones included"""
+    daily = []
+    for model in (WorkLog, ArchivedWorkLog):
+        daily += db.session.query(
+            model.volunteer_id, model.date, db.func.sum(model.hours_worked), db.func.count(model.id)
+        ).filter(model.status == 'approved').group_by(model.volunteer_id, model.date).all()
+    
+    scores = {}
+    for volunteer_id, day, hours, count in daily:
+        for period in LEADERBOARD_PERIODS:
+            key = (period, leaderboard_start(day, period), volunteer_id)
+            total_hours, total_count = scores.get(key, (0.0, 0))
+            scores[key] = (total_hours + float(hours or 0), total_count + count)
+    
+    LeaderboardScore.query.delete()
+    rows = [
+        {'period': period, 'period_start': start, 'volunteer_id': volunteer_id, 'hours': hours, 'log_count': count}
+        for (period, start, volunteer_id), (hours, count) in scores.items()
+    ]
+    for offset in range(0, len(rows), 1000):
+        db.session.execute(LeaderboardScore.__table__.insert(), rows[offset:offset + 1000])
+    db.session.commit()
+    return len(rows)
+
+@app.cli.command('rebuild-leaderboards')
+def rebuild_leaderboards_command():
+    """Rebuild leaderboard scores from approved work logs"""
+    print(f"Rebuilt {rebuild_leaderboards()} leaderboard scores")
+
+@job_handler('rebuild_leaderboards')
+def rebuild_leaderboards_job(params, report):
+    return {'scores': rebuild_leaderboards()}
+
+def leaderboard_window():
+    """Read ?period= and ?date= into (period, period_start, error)"""
+    period = request.args.get('period', 'all')
+    if period not in LEADERBOARD_PERIODS:
+        return None, None, f'period must be one of {", ".join(LEADERBOARD_PERIODS)}'
+    try:
+        day = datetime.strptime(request.args['date'], '%Y-%m-%d').date() if request.args.get('date') else date.today()
+    except ValueError:
+        return None, None, 'date must be YYYY-MM-DD'
+    return period, leaderboard_start(day, period), None
+
+def leaderboard_scores(period, start, college=None):
+    query = LeaderboardScore.query.filter(
+        LeaderboardScore.period == period,
+        LeaderboardScore.period_start == start,
+        LeaderboardScore.log_count > 0
+    )
+    if college is not None:
+        query = query.join(User, User.id == LeaderboardScore.volunteer_id).filter(User.college_name == college)
+    return query
+
+def leaderboard_rank(period, start, user_id, college=None):
+    """1-based rank of a volunteer (ties share a rank), or None if they have no approved hours"""
+    score = leaderboard_scores(period, start, college).filter(LeaderboardScore.volunteer_id == user_id).first()
+    if not score:
+        return None
+    ahead = leaderboard_scores(period, start, college).filter(LeaderboardScore.hours > score.hours).count()
+    return {'rank': ahead + 1, 'hours': float(score.hours), 'log_count': score.log_count}
+
+# Leaderboard Routes
+@app.route('/api/leaderboard/', methods=['GET'])
+@login_required
+@cached_response(('leaderboard_score', 'user'))
+def get_leaderboard():
+    """Top volunteers by approved hours; ?period=all|year|month, ?date=, ?college=, ?limit="""
+    period, start, error = leaderboard_window()
+    if error:
+        return jsonify({'error': error}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    college = request.args.get('college')
+    
+    scores = leaderboard_scores(period, start, college).order_by(
+        LeaderboardScore.hours.desc(), LeaderboardScore.volunteer_id
+    ).limit(limit).all()
+    users = users_by_ids([s.volunteer_id for s in scores])
+    
+    leaders = []
+    for position, score in enumerate(scores, 1):
+        user = users.get(score.volunteer_id)
+        leaders.append({
+            'rank': leaders[-1]['rank'] if leaders and leaders[-1]['hours'] == float(score.hours) else position,
+            'volunteer_id': score.volunteer_id,
+            'username': user.username if user else None,
+            'full_name': user.full_name if user else None,
+            'college_name': user.college_name if user else None,
+            'hours': float(score.hours),
+            'log_count': score.log_count
+        })
+    
+    return jsonify({
+        'period': period,
+        'period_start': None if period == 'all' else start.isoformat(),
+        'college': college,
+        'leaders': leaders,
+        'my_rank': leaderboard_rank(period, start, session['user_id'], college)
+    })
+
+@app.route('/api/leaderboard/teams/', methods=['GET'])
+@login_required
+@cached_response(('leaderboard_score', 'team', 'team_member'), role_scope)
+@single_flight()
+def get_team_leaderboard():
+    """Top teams by their members' approved hours"""
+    period, start, error = leaderboard_window()
+    if error:
+        return jsonify({'error': error}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    
+    total = db.func.sum(LeaderboardScore.hours)
+    rows = db.session.query(Team.id, Team.name, total, db.func.count(LeaderboardScore.id)).join(
+        TeamMember, TeamMember.team_id == Team.id
+    ).join(
+        LeaderboardScore, LeaderboardScore.volunteer_id == TeamMember.user_id
+    ).filter(
+        LeaderboardScore.period == period,
+        LeaderboardScore.period_start == start,
+        LeaderboardScore.log_count > 0
+    ).group_by(Team.id, Team.name).order_by(total.desc(), Team.id).limit(limit).all()
+    
+    return jsonify({
+        'period': period,
+        'period_start': None if period == 'all' else start.isoformat(),
+        'teams': [{
+            'rank': position,
+            'team_id': team_id,
+            'team_name': name,
+            'hours': float(hours or 0),
+            'contributors': contributors
+        } for position, (team_id, name, hours, contributors) in enumerate(rows, 1)]
+    })
+
+@app.route('/api/leaderboard/me/', methods=['GET'])
+@login_required
+def get_my_leaderboard_ranks():
+    """The current user's rank overall and within their college for each window"""
+    user = User.query.get(session['user_id'])
+    today = date.today()
+    ranks = {}
+    for period in LEADERBOARD_PERIODS:
+        start = leaderboard_start(today, period)
+        ranks[period] = {
+            'overall': leaderboard_rank(period, start, user.id),
+            'college': leaderboard_rank(period, start, user.id, user.college_name) if user.college_name else None
+        }
+    return jsonify({'college_name': user.college_name, 'ranks': ranks})
+
+# Work Log Archive
+WORK_LOG_ARCHIVE_DAYS = int(os.environ.get('WORK_LOG_ARCHIVE_DAYS', 3 * 365))
+ARCHIVE_COLUMNS = ('id', 'volunteer_id', 'date', 'hours_worked', 'description', 'status',
+                   'approved_by_id', 'created_at', 'updated_at')
+
+def work_log_ids_reusable():
+    """True on a SQLite work_log table created without AUTOINCREMENT, which
+    reuses the ids of archived rows once the newest ones leave the table"""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    sql = db.session.execute(db.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'work_log'")).scalar()
+    return sql is not None and 'AUTOINCREMENT' not in sql.upper()
+
+def migrate_work_log_ids():
+    """Rebuild a SQLite work_log table with AUTOINCREMENT, starting its
+    sequence past every archived id. Returns False if nothing needed doing."""
+    if not work_log_ids_reusable():
+        return False
+    db.session.rollback()
+    table = WorkLog.__table__
+    columns = ', '.join(column.name for column in table.columns)
+    create = str(db.schema.CreateTable(table).compile(db.engine)).replace('CREATE TABLE work_log ', 'CREATE TABLE work_log_new ', 1)
+    with db.engine.begin() as conn:
+        conn.execute(db.text(create))
+        conn.execute(db.text(f'INSERT INTO work_log_new ({columns}) SELECT {columns} FROM work_log'))
+        conn.execute(db.text('DROP TABLE work_log'))
+        conn.execute(db.text('ALTER TABLE work_log_new RENAME TO work_log'))
+        for index in table.indexes:
+            index.create(conn)
+        newest = conn.execute(db.select(db.func.max(ArchivedWorkLog.id))).scalar() or 0
+        conn.execute(db.text("DELETE FROM sqlite_sequence WHERE name = 'work_log'"))
+        conn.execute(db.text("INSERT INTO sqlite_sequence (name, seq) SELECT 'work_log', MAX(COALESCE(MAX(id), 0), :newest) "
+                             "FROM work_log"), {'newest': newest})
+    return True
+
+@app.cli.command('migrate-work-log-ids')
+def migrate_work_log_ids_command():
+    """Stop SQLite from reusing archived work log ids (needed before archiving)"""
+    print("Rebuilt work_log with AUTOINCREMENT" if migrate_work_log_ids() else "work_log ids are already never reused")
+
+def archive_work_logs(days=WORK_LOG_ARCHIVE_DAYS, batch_size=1000, report=None):
+    """Move approved logs dated more than `days` ago into archived_work_log.
+    
+    Rows move in batches, each batch in its own transaction: copy, add to the
+    per-volunteer rollups, delete. The statements bypass the ORM on purpose so
+    hour buckets and leaderboards (which already count these hours) are left
+    alone. Logs referenced by a document stay in work_log.
+    """
+    if work_log_ids_reusable():
+        raise RuntimeError('work_log would reuse archived ids; run `flask --app app migrate-work-log-ids` first')
+    
+    cutoff = date.today() - timedelta(days=days)
+    work_log = WorkLog.__table__
+    eligible = db.and_(
+        work_log.c.status == 'approved',
+        work_log.c.date < cutoff,
+        ~db.exists().where(Document.work_log_id == work_log.c.id)
+    )
+    candidates = db.select(work_log.c.id).where(eligible).order_by(work_log.c.id).limit(batch_size)
+    total = db.session.execute(db.select(db.func.count()).where(eligible)).scalar() if report else 0
+    
+    archived = 0
+    while True:
+        ids = db.session.execute(candidates).scalars().all()
+        if not ids:
+            break
+        
+        columns = [work_log.c[name] for name in ARCHIVE_COLUMNS]
+        db.session.execute(ArchivedWorkLog.__table__.insert().from_select(
+            list(ARCHIVE_COLUMNS) + ['archived_at'],
+            db.select(*columns, db.literal(datetime.utcnow())).where(work_log.c.id.in_(ids))
+        ))
+        totals = db.session.execute(db.select(
+            work_log.c.volunteer_id, db.func.sum(work_log.c.hours_worked), db.func.count(work_log.c.id)
+        ).where(work_log.c.id.in_(ids)).group_by(work_log.c.volunteer_id)).all()
+        connection = db.session.connection()
+        for volunteer_id, hours, count in totals:
+            upsert_increment(connection, WorkLogArchiveRollup.__table__, {'volunteer_id': volunteer_id},
+                             {'hours': float(hours or 0), 'log_count': count})
+        db.session.execute(work_log.delete().where(work_log.c.id.in_(ids)))
+        db.session.commit()
+        
+        archived += len(ids)
+        if report:
+            report(archived * 100 // max(total, 1), f'{archived}/{total} work logs')
+    
+    return {'archived': archived, 'cutoff': cutoff.isoformat()}
+
+@app.cli.command('archive-work-logs')
+@click.option('--days', default=WORK_LOG_ARCHIVE_DAYS, show_default=True, help='Archive approved logs older than this.')
+@click.option('--batch-size', default=1000, show_default=True)
+def archive_work_logs_command(days, batch_size):
+    """Move old approved work logs into the archive table"""
+    result = archive_work_logs(days, batch_size)
+    print(f"Archived {result['archived']} work logs dated before {result['cutoff']}")
+
+@job_handler('archive_work_logs')
+def archive_work_logs_job(params, report):
+    return archive_work_logs(int(params.get('days', WORK_LOG_ARCHIVE_DAYS)), report=report)
+
+# Event Routes
+EVENT_INSERT_CHUNK = 500  # Work log rows per multi-row INSERT when an event closes
+
+def event_dict(event, attendee_count=None):
+    return {
+        'id': event.id,
+        'title': event.title,
+        'description': event.description,
+        'location': event.location,
+        'date': event.date.isoformat(),
+        'hours': event.hours,
+        'team_id': event.team_id,
+        'created_by_id': event.created_by_id,
+        'status': event.status,
+        'closed_at': event.closed_at.isoformat() if event.closed_at else None,
+        'attendee_count': attendee_count,
+        'created_at': event.created_at.isoformat()
+    }
+
+def can_manage_event(user, event):
+    """Admins, the event's creator and leaders of its team run an event"""
+    if user.role == 'admin' or event.created_by_id == user.id:
+        return True
+    return bool(team_leadership(event.team_id, user.id))
+
+def visible_events(user, query):
+    """Restrict an Event query to what the user may see: everything for admins,
+    otherwise open-to-all events, events of the user's teams and events the user attends"""
+    if user.role == 'admin':
+        return query
+    team_ids = db.session.query(TeamMember.team_id).filter(TeamMember.user_id == user.id)
+    attending = db.session.query(EventAttendee.event_id).filter(EventAttendee.user_id == user.id)
+    return query.filter(Event.team_id.is_(None) | Event.team_id.in_(team_ids) | Event.id.in_(attending))
+
+def parse_event_hours(value):
+    try:
+        hours = float(value)
+    except (TypeError, ValueError):
+        return None
+    return hours if 0 < hours <= 24 else None
+
+@app.route('/api/events/', methods=['GET'])
+@login_required
+def get_events():
+    """Events visible to the user: all for admins, otherwise open-to-all events,
+    events of the user's teams and events the user attends. Optional ?status=open|closed."""
+    user = User.query.get(session['user_id'])
+    query = visible_events(user, Event.query)
+    if request.args.get('status'):
+        query = query.filter(Event.status == request.args['status'])
+    events = query.order_by(Event.date.desc(), Event.id.desc()).limit(200).all()
+    
+    counts = dict(db.session.query(EventAttendee.event_id, db.func.count(EventAttendee.id)).filter(
+        EventAttendee.event_id.in_([event.id for event in events])
+    ).group_by(EventAttendee.event_id).all()) if events else {}
+    return jsonify({'events': [event_dict(event, counts.get(event.id, 0)) for event in events]})
+
+@app.route('/api/events/create/', methods=['POST'])
+@login_required
+@idempotent
+def create_event():
+    """Create an event. Body: title, date (YYYY-MM-DD), hours, and optional
+    description, location and team_id. Team events need a leader or admin."""
+    user = User.query.get(session['user_id'])
+    data = request.get_json() or {}
+    
+    if not data.get('title'):
+        return jsonify({'error': 'title is required'}), 400
+    try:
+        day = datetime.strptime(data.get('date') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+    hours = parse_event_hours(data.get('hours'))
+    if hours is None:
+        return jsonify({'error': 'hours must be a number between 0 and 24'}), 400
+    
+    team_id = data.get('team_id')
+    if team_id:
+        Team.query.get_or_404(team_id)
+        if user.role != 'admin' and not team_leadership(team_id, user.id):
+            return jsonify({'error': 'Only team leaders or admins can create team events'}), 403
+    elif user.role != 'admin':
+        return jsonify({'error': 'Only admins can create events open to everyone'}), 403
+    
+    event = Event(
+        title=data['title'],
+        description=data.get('description', ''),
+        location=data.get('location', ''),
+        date=day,
+        hours=hours,
+        team_id=team_id or None,
+        created_by_id=user.id
+    )
+    db.session.add(event)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'event_id': event.id})
+
+@app.route('/api/events/<int:event_id>/', methods=['GET'])
+@login_required
+def get_event(event_id):
+    """An event with its attendee roster; 404 unless the user can see the event"""
+    user = User.query.get(session['user_id'])
+    event = visible_events(user, Event.query.filter(Event.id == event_id)).first_or_404()
+    rows = db.session.query(EventAttendee, User.username, User.full_name).join(
+        User, User.id == EventAttendee.user_id
+    ).filter(EventAttendee.event_id == event_id).order_by(User.username).all()
+    
+    attendees = [{
+        'user_id': attendee.user_id,
+        'username': username,
+        'full_name': full_name,
+        'hours': attendee.hours if attendee.hours is not None else event.hours,
+        'checked_in_at': attendee.checked_in_at.isoformat() if attendee.checked_in_at else None
+    } for attendee, username, full_name in rows]
+    return jsonify({'event': event_dict(event, len(attendees)), 'attendees': attendees})
+
+@app.route('/api/events/<int:event_id>/attendees/', methods=['POST'])
+@login_required
+@idempotent
+def update_event_attendees(event_id):
+    """Add or remove many attendees at once.
+    
+    Body: {"action": "add" | "remove", "members": [username, email or id, ...],
+    "hours": <optional override for the added attendees>}.
+    """
+    user = User.query.get(session['user_id'])
+    event = Event.query.get_or_404(event_id)
+    data = request.get_json() or {}
+    action = data.get('action', 'add')
+    identifiers = data.get('members') or []
+    
+    if not can_manage_event(user, event):
+        return jsonify({'error': 'Only the event organiser, team leaders or admins can manage attendees'}), 403
+    if event.status != 'open':
+        return jsonify({'error': 'Event is already closed'}), 409
+    if action not in ('add', 'remove'):
+        return jsonify({'error': 'action must be add or remove'}), 400
+    if not isinstance(identifiers, list) or not identifiers:
+        return jsonify({'error': 'members must be a non-empty list'}), 400
+    if len(identifiers) > 1000:
+        return jsonify({'error': 'At most 1000 members per request'}), 400
+    hours = None
+    if data.get('hours') is not None:
+        hours = parse_event_hours(data['hours'])
+        if hours is None:
+            return jsonify({'error': 'hours must be a number between 0 and 24'}), 400
+    
+    resolved, not_found = resolve_users(identifiers)
+    volunteer_ids = [u.id for u in resolved.values() if u.role == 'volunteer']
+    result = {
+        'not_found': not_found,
+        'not_volunteers': [u.username for u in resolved.values() if u.role != 'volunteer']
+    }
+    
+    if action == 'remove':
+        result['removed'] = db.session.execute(EventAttendee.__table__.delete().where(
+            EventAttendee.event_id == event_id, EventAttendee.user_id.in_(volunteer_ids)
+        )).rowcount if volunteer_ids else 0
+    else:
+        now = datetime.utcnow()
+        result['added'] = insert_ignoring_conflicts(db.session.connection(), EventAttendee.__table__, [
+            {'event_id': event_id, 'user_id': user_id, 'hours': hours, 'checked_in_at': now}
+            for user_id in volunteer_ids
+        ], ['event_id', 'user_id'])
+        result['already_attending'] = len(volunteer_ids) - result['added']
+    
+    db.session.commit()
+    
+    result['success'] = True
+    return jsonify(result)
+
+def close_event(event, closed_by, approve=False):
+    """Log every attendee's hours for a closed event in bulk.
+    
+    Work logs go in through multi-row INSERTs instead of one ORM object per
+    attendee, so the hour-bucket and leaderboard rollups are updated once with
+    the combined changes. Returns the number of work logs created, or None if
+    another request closed the event first.
+    """
+    now = datetime.utcnow()
+    # The conditional UPDATE takes the event's row lock: it waits for a
+    # check-in batch holding it, and later batches see the event closed
+    closed = Event.query.filter_by(id=event.id, status='open').update(
+        {'status': 'closed', 'closed_by_id': closed_by.id, 'closed_at': now}, synchronize_session=False
+    )
+    if not closed:
+        db.session.rollback()
+        return None
+    
+    status = 'approved' if approve else 'pending'
+    rows = [{
+        'volunteer_id': user_id,
+        'date': event.date,
+        'hours_worked': hours if hours is not None else event.hours,
+        'description': f'Attended event: {event.title}',
+        'status': status,
+        'approved_by_id': closed_by.id if approve else None,
+        'created_at': now,
+        'updated_at': now
+    } for user_id, hours in db.session.query(EventAttendee.user_id, EventAttendee.hours).filter(
+        EventAttendee.event_id == event.id
+    ).all()]
+    
+    connection = db.session.connection()
+    for offset in range(0, len(rows), EVENT_INSERT_CHUNK):
+        connection.execute(WorkLog.__table__.insert().values(rows[offset:offset + EVENT_INSERT_CHUNK]))
+    
+    # Core inserts bypass the flush hook, so hand the aggregates every change at once
+    changes = [(None, (row['volunteer_id'], row['date'], status, row['hours_worked'])) for row in rows]
+    if changes:
+        for handler in WORK_LOG_CHANGE_HANDLERS:
+            handler(connection, changes)
+    
+    for row in rows:
+        publish_event(f'work_log.{"approved" if approve else "created"}', user_id=row['volunteer_id'],
+                      team_id=event.team_id, event_id=event.id, date=event.date.isoformat(),
+                      hours_worked=row['hours_worked'], status=status)
+    db.session.commit()
+    return len(rows)
+
+@app.route('/api/events/<int:event_id>/close/', methods=['POST'])
+@login_required
+@idempotent
+def close_event_route(event_id):
+    """Close an event and create every attendee's work log.
+    
+    Body: {"approve": true} creates them already approved (admins only);
+    otherwise they wait in the usual approval queue.
+    """
+    user = User.query.get(session['user_id'])
+    event = Event.query.get_or_404(event_id)
+    approve = bool((request.get_json(silent=True) or {}).get('approve'))
+    
+    if not can_manage_event(user, event):
+        return jsonify({'error': 'Only the event organiser, team leaders or admins can close an event'}), 403
+    if approve and user.role != 'admin':
+        return jsonify({'error': 'Only admins can pre-approve event hours'}), 403
+    
+    # This event's check-ins still queued on this host belong on the roster
+    # first. The drain is bounded; if entries remain (a burst beyond the limit,
+    # or a batch the drainer holds) the client retries rather than closing
+    # without them, since SQLite ignores the FOR UPDATE that orders the two.
+    drain_check_ins(limit=CHECKIN_CLOSE_DRAIN_LIMIT, event_id=event_id)
+    if checkin_queue.pending(event_id):
+        checkin_drainer.wake.set()
+        response = jsonify({'error': 'Check-ins for this event are still being recorded, try again shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    created = close_event(event, user, approve)
+    if created is None:
+        return jsonify({'error': 'Event is already closed'}), 409
+    
+    print(f"📅 Closed event {event_id}: {created} work logs ({'approved' if approve else 'pending'})")
+    return jsonify({'success': True, 'work_logs_created': created, 'status': 'approved' if approve else 'pending'})
+
+# Event Check-in Queue
+# Check-ins arrive in bursts at the start of an event. Each one is appended to
+# a local SQLite write-ahead queue (fsynced before we acknowledge) and a
+# drainer thread group-commits batches into event_attendee. Entries are
+# leased, not removed, until their batch commits, so a crash redelivers them;
+# the unique (event, user) index makes redelivery harmless.
+CHECKIN_QUEUE_DB = os.environ.get(
+    'CHECKIN_QUEUE_DB', os.path.join(app.config['UPLOAD_FOLDER'], 'checkins', 'queue.sqlite3')
+)
+CHECKIN_BATCH_SIZE = 500
+CHECKIN_LEASE_SECONDS = 30  # A claimed batch not acknowledged by then is delivered again
+CHECKIN_DRAIN_INTERVAL = 1.0
+CHECKIN_CLOSE_DRAIN_LIMIT = 2000  # Entries close_event drains inline before giving up with 503
+
+class CheckInQueue:
+    """Durable FIFO of (event_id, user_id, checked_in_at) shared by local workers"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.local = ThreadLocal()
+    
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS checkin (id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER NOT NULL, '
+                'user_id INTEGER NOT NULL, checked_in_at REAL NOT NULL, leased_until REAL NOT NULL DEFAULT 0)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_checkin_event_user ON checkin (event_id, user_id)')
+            self.local.conn = conn
+        return conn
+    
+    def append(self, event_id, user_id):
+        return self.connect().execute(
+            'INSERT INTO checkin (event_id, user_id, checked_in_at) VALUES (?, ?, ?)', (event_id, user_id, time.time())
+        ).lastrowid
+    
+    def claim(self, limit=CHECKIN_BATCH_SIZE, event_id=None):
+        """Lease up to limit entries that are not leased, optionally only one event's;
+        returns (id, event_id, user_id, checked_in_at) rows"""
+        conn = self.connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            if event_id is None:
+                rows = conn.execute(
+                    'SELECT id, event_id, user_id, checked_in_at FROM checkin WHERE leased_until < ? ORDER BY id LIMIT ?',
+                    (now, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    'SELECT id, event_id, user_id, checked_in_at FROM checkin WHERE event_id = ? AND leased_until < ? '
+                    'ORDER BY id LIMIT ?', (event_id, now, limit)
+                ).fetchall()
+            conn.executemany('UPDATE checkin SET leased_until = ? WHERE id = ?',
+                             [(now + CHECKIN_LEASE_SECONDS, row[0]) for row in rows])
+            conn.execute('COMMIT')
+            return rows
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    
+    def ack(self, ids):
+        self.connect().executemany('DELETE FROM checkin WHERE id = ?', [(entry_id,) for entry_id in ids])
+    
+    def contains(self, event_id, user_id):
+        return self.connect().execute(
+            'SELECT 1 FROM checkin WHERE event_id = ? AND user_id = ? LIMIT 1', (event_id, user_id)
+        ).fetchone() is not None
+    
+    def pending(self, event_id):
+        """Entries of one event still queued, leased or not"""
+        return self.connect().execute('SELECT COUNT(*) FROM checkin WHERE event_id = ?', (event_id,)).fetchone()[0]
+    
+    def stats(self):
+        depth, oldest = self.connect().execute('SELECT COUNT(*), MIN(checked_in_at) FROM checkin').fetchone()
+        return {'depth': depth, 'oldest_age': round(time.time() - oldest, 1) if oldest else None}
+
+checkin_queue = CheckInQueue(CHECKIN_QUEUE_DB)
+
+def drain_check_ins(limit=None, event_id=None):
+    """Move queued check-ins (only event_id's, if given) into event_attendee, one commit per batch.
+    
+    The batch's open events are locked FOR UPDATE until it commits, so
+    close_event either waits for the batch and sees its attendees or closes
+    first and the batch drops them. Check-ins for events that are closed or
+    gone are dropped and logged. Returns (attendees added, entries processed).
+    """
+    added = processed = 0
+    while limit is None or processed < limit:
+        batch = CHECKIN_BATCH_SIZE if limit is None else min(CHECKIN_BATCH_SIZE, limit - processed)
+        rows = checkin_queue.claim(batch, event_id)
+        if not rows:
+            break
+        
+        first_seen = {}
+        for _, event_id, user_id, checked_in_at in rows:
+            key = (event_id, user_id)
+            first_seen[key] = min(first_seen.get(key, checked_in_at), checked_in_at)
+        
+        try:
+            open_events = {event_id for (event_id,) in db.session.query(Event.id).filter(
+                Event.id.in_({event_id for event_id, _ in first_seen}), Event.status == 'open'
+            ).order_by(Event.id).with_for_update().all()}
+            added += insert_ignoring_conflicts(db.session.connection(), EventAttendee.__table__, [
+                {'event_id': event_id, 'user_id': user_id, 'hours': None,
+                 'checked_in_at': datetime.utcfromtimestamp(checked_in_at)}
+                for (event_id, user_id), checked_in_at in first_seen.items() if event_id in open_events
+            ], ['event_id', 'user_id'])
+            db.session.commit()
+        except Exception:
+            # Leases run out and the batch is delivered again
+            db.session.rollback()
+            raise
+        checkin_queue.ack([row[0] for row in rows])
+        
+        dropped = [key for key in first_seen if key[0] not in open_events]
+        if dropped:
+            print(f"⚠️ Dropped {len(dropped)} check-ins for closed events: "
+                  f"{', '.join(f'event {event_id} user {user_id}' for event_id, user_id in dropped[:20])}")
+        processed += len(rows)
+    return added, processed
+
+class CheckInDrainer:
+    """Background thread draining the check-in queue; woken early by local check-ins"""
+    
+    def __init__(self, interval=CHECKIN_DRAIN_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.stats = {'batches': 0, 'added': 0, 'processed': 0, 'errors': 0}
+    
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='checkin-drainer', daemon=True)
+                self.thread.start()
+    
+    def run(self):
+        with app.app_context():
+            while True:
+                self.wake.wait(self.interval)
+                self.wake.clear()
+                # Let a burst accumulate into one group commit
+                time.sleep(0.05)
+                try:
+                    added, processed = drain_check_ins()
+                    if processed:
+                        self.stats['batches'] += 1
+                        self.stats['added'] += added
+                        self.stats['processed'] += processed
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"❌ Check-in drainer error: {e}")
+                finally:
+                    db.session.remove()
+
+checkin_drainer = CheckInDrainer()
+
+@app.route('/api/events/<int:event_id>/check-in/', methods=['POST'])
+@login_required
+@idempotent
+def event_check_in(event_id):
+    """Check the current volunteer in to an open event.
+    
+    Returns 202 once the check-in is durably queued; it reaches the roster
+    within a second or so. Repeated check-ins are harmless.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'Authentication required'}), 401
+    if user.role != 'volunteer':
+        return jsonify({'error': 'Only volunteers can check in'}), 403
+    
+    event = visible_events(user, Event.query.filter(Event.id == event_id)).first_or_404()
+    if event.status != 'open':
+        return jsonify({'error': 'Event is already closed'}), 409
+    
+    checkin_queue.append(event_id, user.id)
+    checkin_drainer.start()
+    checkin_drainer.wake.set()
+    return jsonify({'success': True, 'status': 'queued'}), 202
+
+@app.route('/api/events/<int:event_id>/check-in/', methods=['GET'])
+@login_required
+def get_event_check_in(event_id):
+    """Whether the current user is on the roster ('checked_in'), still queued, or neither"""
+    user_id = session['user_id']
+    if EventAttendee.query.filter_by(event_id=event_id, user_id=user_id).first():
+        return jsonify({'status': 'checked_in'})
+    if checkin_queue.contains(event_id, user_id):
+        checkin_drainer.start()
+        return jsonify({'status': 'queued'})
+    return jsonify({'status': 'not_checked_in'})
+
+@app.route('/api/admin/events/check-ins/', methods=['GET'])
+@admin_required
+def get_check_in_queue_stats():
+    """Depth of this host's check-in queue and the drainer's counters"""
+    checkin_drainer.start()
+    return jsonify({'queue': checkin_queue.stats(), 'drainer': checkin_drainer.stats})
+
+@app.cli.command('drain-check-ins')
+def drain_check_ins_command():
+    """Move every queued event check-in into the database"""
+    added, processed = drain_check_ins()
+    print(f"Processed {processed} queued check-ins, {added} new attendees")
+
+# Approval Queue
+# Pending work logs and submitted projects form one review inbox. Partial
+# indexes cover only the rows awaiting review, and pending_approval_count keeps
+# per-team and total counts current as statuses and memberships change.
+APPROVAL_KINDS = {
+    'work_log': (WorkLog, 'pending'),
+    'project': (Project, 'submitted'),
+}
+APPROVAL_CLAIM_TTL = timedelta(minutes=15)
+
+def adjust_pending_counts(connection, kind, total, team_deltas):
+    """Add total to a kind's overall counter and each {team_id: delta} to the team counters"""
+    totals = {0: total}
+    for team_id, delta in team_deltas.items():
+        if team_id:
+            totals[team_id] = totals.get(team_id, 0) + delta
+    for team_id, delta in totals.items():
+        if delta:
+            upsert_increment(connection, PendingApprovalCount.__table__, {'kind': kind, 'team_id': team_id}, {'count': delta})
+
+def recount_pending_work_logs(connection, team_ids):
+    """Recount the pending work logs of teams whose membership changed"""
+    team_ids = {team_id for team_id in team_ids if team_id}
+    if not team_ids:
+        return
+    counts = dict(connection.execute(
+        db.select(TeamMember.team_id, db.func.count(WorkLog.id)).join(
+            WorkLog, WorkLog.volunteer_id == TeamMember.user_id
+        ).where(TeamMember.team_id.in_(team_ids), WorkLog.status == 'pending').group_by(TeamMember.team_id)
+    ).all())
+    table = PendingApprovalCount.__table__
+    connection.execute(table.delete().where(table.c.kind == 'work_log', table.c.team_id.in_(team_ids)))
+    connection.execute(table.insert(), [
+        {'kind': 'work_log', 'team_id': team_id, 'count': counts.get(team_id, 0)} for team_id in team_ids
+    ])
+
+@on_work_log_change
+def update_pending_work_log_counts(connection, changes):
+    deltas = {}
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is not None and state[2] == 'pending':
+                deltas[state[0]] = deltas.get(state[0], 0) + sign
+    deltas = {volunteer_id: delta for volunteer_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    
+    # A log counts towards every team its volunteer belongs to
+    team_deltas = {}
+    for team_id, user_id in connection.execute(
+        db.select(TeamMember.team_id, TeamMember.user_id).where(TeamMember.user_id.in_(deltas))
+    ).all():
+        team_deltas[team_id] = team_deltas.get(team_id, 0) + deltas[user_id]
+    adjust_pending_counts(connection, 'work_log', sum(deltas.values()), team_deltas)
+
+@db.event.listens_for(db.session, 'before_flush')
+def collect_project_approval_changes(db_session, flush_context, instances):
+    deltas = {}
+    
+    def count(team_id, status, sign):
+        if status == 'submitted':
+            deltas[team_id] = deltas.get(team_id, 0) + sign
+    
+    for obj in db_session.new:
+        if isinstance(obj, Project):
+            count(obj.team_id, obj.status, 1)
+    for obj in db_session.dirty:
+        if isinstance(obj, Project) and db_session.is_modified(obj):
+            count(committed_value(obj, 'team_id'), committed_value(obj, 'status'), -1)
+            count(obj.team_id, obj.status, 1)
+    for obj in db_session.deleted:
+        if isinstance(obj, Project):
+            count(committed_value(obj, 'team_id'), committed_value(obj, 'status'), -1)
+    
+    if any(deltas.values()):
+        adjust_pending_counts(db_session.connection(), 'project', sum(deltas.values()), deltas)
+
+@db.event.listens_for(db.session, 'after_flush')
+def recount_changed_teams(db_session, flush_context):
+    # The session still lists the flushed objects as new/dirty/deleted here
+    team_ids = set()
+    for obj in list(db_session.new) + list(db_session.deleted):
+        if isinstance(obj, TeamMember):
+            team_ids.add(obj.team_id)
+    for obj in db_session.dirty:
+        if isinstance(obj, TeamMember) and db_session.is_modified(obj):
+            team_ids.update((committed_value(obj, 'team_id'), obj.team_id))
+    if team_ids:
+        recount_pending_work_logs(db_session.connection(), team_ids)
+
+def pending_count(kind, team_id=None):
+    """Items of a kind awaiting review, for one team or across all of them"""
+    return db.session.query(PendingApprovalCount.count).filter_by(kind=kind, team_id=team_id or 0).scalar() or 0
+
+def rebuild_pending_counts():
+    """Recount every approval counter from the work_log and project tables"""
+    rows = []
+    work_logs_by_team = db.session.query(TeamMember.team_id, db.func.count(WorkLog.id)).join(
+        WorkLog, WorkLog.volunteer_id == TeamMember.user_id
+    ).filter(WorkLog.status == 'pending').group_by(TeamMember.team_id).all()
+    projects_by_team = db.session.query(Project.team_id, db.func.count(Project.id)).filter(
+        Project.status == 'submitted', Project.team_id.isnot(None)
+    ).group_by(Project.team_id).all()
+    
+    for kind, by_team in (('work_log', work_logs_by_team), ('project', projects_by_team)):
+        model, status = APPROVAL_KINDS[kind]
+        rows.append({'kind': kind, 'team_id': 0, 'count': model.query.filter(model.status == status).count()})
+        rows.extend({'kind': kind, 'team_id': team_id, 'count': count} for team_id, count in by_team)
+    
+    PendingApprovalCount.query.delete()
+    db.session.execute(PendingApprovalCount.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+@app.cli.command('rebuild-pending-counts')
+def rebuild_pending_counts_command():
+    """Rebuild the per-team pending approval counters"""
+    print(f"Rebuilt {rebuild_pending_counts()} pending approval counters")
+
+@job_handler('rebuild_pending_counts')
+def rebuild_pending_counts_job(params, report):
+    return {'counters': rebuild_pending_counts()}
+
+def approval_cursor(item):
+    return f'{encode_sync_token(item.created_at)}.{item.id}'
+
+def approval_kind():
+    kind = request.args.get('kind') or (request.get_json(silent=True) or {}).get('kind') or 'work_log'
+    return kind if kind in APPROVAL_KINDS else None
+
+def approval_items_query(kind, team_id=None):
+    """Items awaiting review, oldest first, matching the partial index"""
+    model, status = APPROVAL_KINDS[kind]
+    # Rendered inline: planners only match a partial index against a literal
+    query = model.query.filter(model.status == db.literal(status, literal_execute=True))
+    if team_id and kind == 'work_log':
+        query = query.filter(WorkLog.volunteer_id.in_(
+            db.session.query(TeamMember.user_id).filter(TeamMember.team_id == team_id)
+        ))
+    elif team_id:
+        query = query.filter(Project.team_id == team_id)
+    return query.order_by(model.created_at, model.id)
+
+def approval_rows(kind, items, claims):
+    users = {} if wants_normalized() else None
+    rows = []
+    for item in items:
+        if kind == 'work_log':
+            row = work_log_row(item, users)
+        else:
+            row = serialize_fields(item, PROJECT_FIELDS, PROJECT_LIST_FIELDS)
+            attach_user(row, item.volunteer, ('full_name', 'college_name', 'course'), users)
+            if item.team:
+                attach_team(row, item.team)
+        row['submitted_at'] = item.created_at.isoformat()
+        claim = claims.get(item.id)
+        row['claimed_by_id'] = claim.reviewer_id if claim else None
+        row['claim_expires_at'] = claim.expires_at.isoformat() if claim else None
+        rows.append(row)
+    return rows, users
+
+def live_claims(kind, item_ids):
+    return {claim.item_id: claim for claim in ApprovalClaim.query.filter(
+        ApprovalClaim.kind == kind,
+        ApprovalClaim.item_id.in_(item_ids),
+        ApprovalClaim.expires_at > datetime.utcnow()
+    ).all()} if item_ids else {}
+
+# Approval Queue Routes
+@app.route('/api/admin/approvals/', methods=['GET'])
+@admin_required
+def get_approval_queue():
+    """Review inbox across all teams, oldest first.
+    
+    Query parameters: kind (work_log|project), team_id, limit (max 100),
+    after (the previous page's next_cursor) and mine=1 for the items the
+    current reviewer has claimed.
+    """
+    kind = approval_kind()
+    if kind is None:
+        return jsonify({'error': f'kind must be one of {", ".join(APPROVAL_KINDS)}'}), 400
+    model = APPROVAL_KINDS[kind][0]
+    limit = max(1, min(request.args.get('limit', 50, type=int), 100))
+    
+    query = approval_items_query(kind, request.args.get('team_id', type=int))
+    if request.args.get('after'):
+        token, _, last_id = request.args['after'].partition('.')
+        moment = decode_sync_token(token)
+        if moment is None or not last_id.isdigit():
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(db.or_(
+            model.created_at > moment,
+            db.and_(model.created_at == moment, model.id > int(last_id))
+        ))
+    if request.args.get('mine'):
+        query = query.filter(model.id.in_(db.session.query(ApprovalClaim.item_id).filter(
+            ApprovalClaim.kind == kind,
+            ApprovalClaim.reviewer_id == session['user_id'],
+            ApprovalClaim.expires_at > datetime.utcnow()
+        )))
+    
+    items = query.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    rows, users = approval_rows(kind, items, live_claims(kind, [item.id for item in items]))
+    
+    response = {
+        'kind': kind,
+        'items': rows,
+        'next_cursor': approval_cursor(items[-1]) if has_more else None,
+        'pending_count': pending_count(kind, request.args.get('team_id', type=int))
+    }
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
+
+@app.route('/api/admin/approvals/counts/', methods=['GET'])
+@admin_required
+def get_approval_counts():
+    """Badge counts: items awaiting review per kind, in total and per team"""
+    counts = {kind: {'total': 0, 'teams': {}} for kind in APPROVAL_KINDS}
+    for row in PendingApprovalCount.query.filter(PendingApprovalCount.count != 0).all():
+        if row.kind not in counts:
+            continue
+        if row.team_id == 0:
+            counts[row.kind]['total'] = row.count
+        else:
+            counts[row.kind]['teams'][str(row.team_id)] = row.count
+    return jsonify(counts)
+
+@app.route('/api/admin/approvals/claim/', methods=['POST'])
+@admin_required
+def claim_approvals():
+    """Claim the next N unclaimed items for the current reviewer.
+    
+    Body: {"kind": "work_log" | "project", "count": N (max 50), "team_id": optional}.
+    Claims last APPROVAL_CLAIM_TTL; other reviewers' inboxes show them as taken
+    and claim past them.
+    """
+    data = request.get_json(silent=True) or {}
+    kind = approval_kind()
+    if kind is None:
+        return jsonify({'error': f'kind must be one of {", ".join(APPROVAL_KINDS)}'}), 400
+    model = APPROVAL_KINDS[kind][0]
+    try:
+        count = max(1, min(int(data.get('count', 10)), 50))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'count must be a number'}), 400
+    
+    now = datetime.utcnow()
+    db.session.execute(ApprovalClaim.__table__.delete().where(ApprovalClaim.expires_at <= now))
+    
+    candidates = approval_items_query(kind, data.get('team_id')).filter(
+        ~model.id.in_(db.session.query(ApprovalClaim.item_id).filter(ApprovalClaim.kind == kind))
+    ).with_entities(model.id).limit(count).all()
+    # A concurrent reviewer may win some of these; the unique index decides
+    insert_ignoring_conflicts(db.session.connection(), ApprovalClaim.__table__, [
+        {'kind': kind, 'item_id': item_id, 'reviewer_id': session['user_id'],
+         'claimed_at': now, 'expires_at': now + APPROVAL_CLAIM_TTL}
+        for (item_id,) in candidates
+    ], ['kind', 'item_id'])
+    db.session.commit()
+    
+    claims = {claim.item_id: claim for claim in ApprovalClaim.query.filter_by(
+        kind=kind, reviewer_id=session['user_id'], claimed_at=now
+    ).all()}
+    items = model.query.filter(model.id.in_(claims)).order_by(model.created_at, model.id).all() if claims else []
+    rows, users = approval_rows(kind, items, claims)
+    
+    response = {'kind': kind, 'items': rows, 'claimed': len(rows)}
+    if users is not None:
+        response['users'] = users
+    return jsonify(response)
+
+@app.route('/api/admin/approvals/release/', methods=['POST'])
+@admin_required
+def release_approvals():
+    """Give back claimed items. Body: {"kind": ..., "ids": [...]}; without ids releases all of yours."""
+    data = request.get_json(silent=True) or {}
+    kind = approval_kind()
+    if kind is None:
+        return jsonify({'error': f'kind must be one of {", ".join(APPROVAL_KINDS)}'}), 400
+    
+    query = ApprovalClaim.query.filter_by(kind=kind, reviewer_id=session['user_id'])
+    if data.get('ids'):
+        query = query.filter(ApprovalClaim.item_id.in_(data['ids']))
+    released = query.delete(synchronize_session=False)
+    db.session.commit()
+    return jsonify({'success': True, 'released': released})
+
+# Cache Admin Routes
+@app.route('/api/admin/cache/stats/', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Response cache hit/miss counters, overall and per endpoint, plus request coalescing counts"""
+    lookups = response_cache.metrics['hits'] + response_cache.metrics['misses']
+    return jsonify({
+        'enabled': RESPONSE_CACHE_ENABLED,
+        'shared_backend': bool(response_cache.backend),
+        'entries': len(response_cache.local),
+        'hit_ratio': round(response_cache.metrics['hits'] / lookups, 4) if lookups else None,
+        'metrics': response_cache.metrics,
+        'endpoints': response_cache.endpoint_metrics,
+        'single_flight': request_flights.stats,
+        'bus': dict(cache_bus.stats, last_sequence=cache_bus.last_id)
+    })
+
+@app.route('/api/admin/cache/clear/', methods=['POST'])
+@admin_required
+def clear_cache():
+    response_cache.clear()
+    return jsonify({'success': True, 'message': 'Response cache cleared'})
+
+# Analytics Snapshot
+# A columnar copy of work logs (hot and archived) joined with volunteer
+# attributes and team memberships, written to one file and memory-mapped by
+# every worker. Columns are written from stdlib arrays and read back as numpy
+# views: int32 indexes/codes, int32 days and months, float32 hours, int8 status codes.
+ANALYTICS_SNAPSHOT_PATH = os.environ.get(
+    'ANALYTICS_SNAPSHOT_PATH', os.path.join(app.config['UPLOAD_FOLDER'], 'analytics', 'work_logs.snapshot')
+)
+ANALYTICS_SNAPSHOT_MAX_AGE = int(os.environ.get('ANALYTICS_SNAPSHOT_MAX_AGE', 300))
+ANALYTICS_BUILD_LOCK_SECONDS = 600  # A build lock older than this was left by a dead worker
+SNAPSHOT_MAGIC = b'VMSSNAP1'
+SNAPSHOT_EPOCH = date(1970, 1, 1).toordinal()
+ANALYTICS_DIMENSIONS = ('college', 'course', 'year_of_study', 'team', 'volunteer', 'month', 'status')
+
+def encode_categories(values):
+    """Map values to dense int codes; returns (codes, labels)"""
+    labels = []
+    index = {}
+    codes = []
+    for value in values:
+        value = value or ''
+        if value not in index:
+            index[value] = len(labels)
+            labels.append(value)
+        codes.append(index[value])
+    return codes, labels
+
+def build_analytics_snapshot(path=ANALYTICS_SNAPSHOT_PATH):
+    """Write a fresh snapshot file and atomically replace the old one"""
+    started = time.perf_counter()
+    
+    volunteers = db.session.query(User.id, User.college_name, User.course, User.year_of_study).order_by(User.id).all()
+    position = {row.id: i for i, row in enumerate(volunteers)}
+    colleges, college_labels = encode_categories(row.college_name for row in volunteers)
+    courses, course_labels = encode_categories(row.course for row in volunteers)
+    years, year_labels = encode_categories(row.year_of_study for row in volunteers)
+    
+    # Team memberships as CSR: team codes of volunteer i are team_codes[offsets[i]:offsets[i + 1]]
+    teams = db.session.query(Team.id, Team.name).order_by(Team.id).all()
+    team_code = {row.id: i for i, row in enumerate(teams)}
+    memberships = {}
+    for user_id, team_id in db.session.query(TeamMember.user_id, TeamMember.team_id):
+        if user_id in position:
+            memberships.setdefault(position[user_id], []).append(team_code[team_id])
+    offsets = array('i', [0])
+    team_codes = array('i')
+    for i in range(len(volunteers)):
+        team_codes.extend(memberships.get(i, ()))
+        offsets.append(len(team_codes))
+    
+    columns = {name: array(typecode) for name, typecode in
+               (('volunteer', 'i'), ('day', 'i'), ('month', 'i'), ('hours', 'f'), ('status', 'b'))}
+    status_index = {status: i for i, status in enumerate(WORK_LOG_STATUSES)}
+    for model in (WorkLog, ArchivedWorkLog):
+        rows = db.session.query(model.volunteer_id, model.date, model.hours_worked, model.status).execution_options(
+            yield_per=5000
+        )
+        for volunteer_id, day, hours, status in rows:
+            columns['volunteer'].append(position[volunteer_id])
+            columns['day'].append(day.toordinal() - SNAPSHOT_EPOCH)
+            columns['month'].append(day.year * 12 + day.month - 1)
+            columns['hours'].append(hours or 0)
+            columns['status'].append(status_index.get(status or 'pending', 0))
+    
+    columns.update({
+        'volunteer_id': array('i', [row.id for row in volunteers]),
+        'college': array('i', colleges),
+        'course': array('i', courses),
+        'year_of_study': array('i', years),
+        'team_offsets': offsets,
+        'team_codes': team_codes,
+    })
+    
+    layout = {}
+    offset = 0
+    for name, values in columns.items():
+        size = len(values) * values.itemsize
+        layout[name] = {'typecode': values.typecode, 'offset': offset, 'length': len(values)}
+        offset += size + (-size % 8)  # Keep every column 8-byte aligned
+    header = json.dumps({
+        'built_at': datetime.utcnow().isoformat(),
+        'rows': len(columns['volunteer']),
+        'columns': layout,
+        'labels': {
+            'college': college_labels,
+            'course': course_labels,
+            'year_of_study': year_labels,
+            'team': [row.name for row in teams],
+            'status': list(WORK_LOG_STATUSES)
+        }
+    }).encode()
+    header += b' ' * (-(len(header) + 12) % 8)
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC + struct.pack('<I', len(header)) + header)
+        for name, values in columns.items():
+            data = values.tobytes()
+            f.write(data + b'\0' * (-len(data) % 8))
+    os.replace(temp_path, path)
+    
+    return {'rows': len(columns['volunteer']), 'volunteers': len(volunteers),
+            'build_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+class AnalyticsSnapshot:
+    """Read-only view of a snapshot file; columns are zero-copy numpy views of the mmap"""
+    
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.stat = os.fstat(self.file.fileno())
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header_length = struct.unpack_from('<I', self.map, len(SNAPSHOT_MAGIC))[0]
+        start = len(SNAPSHOT_MAGIC) + 4
+        self.header = json.loads(self.map[start:start + header_length])
+        self.base = start + header_length
+    
+    def column(self, name):
+        spec = self.header['columns'][name]
+        return np.frombuffer(self.map, dtype=np.dtype(spec['typecode']), count=spec['length'],
+                             offset=self.base + spec['offset'])
+    
+    def age(self):
+        return time.time() - self.stat.st_mtime
+
+class AnalyticsRefresher:
+    """Background thread rebuilding the snapshot once it is older than ANALYTICS_SNAPSHOT_MAX_AGE.
+    
+    Requests never build the snapshot; they map the newest file and wake this
+    thread. A lock file next to the snapshot keeps the workers on one host
+    from building it at the same time.
+    """
+    
+    def __init__(self, interval=60):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.force = False
+        self.thread = None
+        self.stats = {'builds': 0, 'errors': 0, 'last_build_ms': None}
+    
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='analytics-refresher', daemon=True)
+                self.thread.start()
+    
+    def request(self, force=False):
+        self.force = self.force or force
+        self.start()
+        self.wake.set()
+    
+    def run(self):
+        with app.app_context():
+            while True:
+                self.wake.wait(self.interval)
+                self.wake.clear()
+                force, self.force = self.force, False
+                try:
+                    age = analytics_snapshot_age()
+                    if force or age is None or age > ANALYTICS_SNAPSHOT_MAX_AGE:
+                        result = self.build()
+                        if result:
+                            self.stats['builds'] += 1
+                            self.stats['last_build_ms'] = result['build_ms']
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"❌ Analytics snapshot refresh failed: {e}")
+                finally:
+                    db.session.remove()
+    
+    def build(self):
+        """Build the snapshot unless another worker holds the lock file; returns the build result or None"""
+        lock_path = f'{ANALYTICS_SNAPSHOT_PATH}.lock'
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock_path).st_mtime < ANALYTICS_BUILD_LOCK_SECONDS:
+                    return None
+                # Left behind by a worker that died mid-build
+                os.remove(lock_path)
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError:
+                return None
+        try:
+            return build_analytics_snapshot()
+        finally:
+            os.close(fd)
+            os.remove(lock_path)
+
+analytics_refresher = AnalyticsRefresher()
+analytics_lock = threading.Lock()
+analytics_snapshot = None
+
+def analytics_snapshot_age():
+    try:
+        return time.time() - os.stat(ANALYTICS_SNAPSHOT_PATH).st_mtime
+    except FileNotFoundError:
+        return None
+
+def current_analytics_snapshot(refresh=False):
+    """Map the newest snapshot, or None before the first one is built.
+    
+    A missing or stale snapshot, or refresh=True, wakes the refresher; the
+    request carries on with the file already there.
+    """
+    global analytics_snapshot
+    with analytics_lock:
+        try:
+            stat = os.stat(ANALYTICS_SNAPSHOT_PATH)
+        except FileNotFoundError:
+            stat = None
+        
+        if refresh or stat is None or time.time() - stat.st_mtime > ANALYTICS_SNAPSHOT_MAX_AGE:
+            analytics_refresher.request(force=refresh)
+        if stat is None:
+            return None
+        
+        current = analytics_snapshot
+        if current is None or (current.stat.st_ino, current.stat.st_mtime) != (stat.st_ino, stat.st_mtime):
+            # Old maps are left for the garbage collector; requests may still be reading them
+            analytics_snapshot = AnalyticsSnapshot(ANALYTICS_SNAPSHOT_PATH)
+        return analytics_snapshot
+
+def group_codes(columns):
+    """Number the distinct rows of equal-length int columns.
+    
+    Returns (one array per column holding the distinct rows, group number of
+    each input row). The columns are packed into one int64 key; small key
+    spaces are grouped by bincount in linear time, larger ones by sorting.
+    """
+    lows, spans = [], []
+    space = 1
+    for column in columns:
+        low = int(column.min())
+        lows.append(low)
+        spans.append(int(column.max()) - low + 1)
+        space *= spans[-1]
+    if space >= 2 ** 62:
+        distinct, inverse = np.unique(np.stack([column.astype(np.int64) for column in columns], axis=1),
+                                      axis=0, return_inverse=True)
+        return [distinct[:, i] for i in range(len(columns))], inverse.reshape(-1)
+    
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    for column, low, span in zip(columns, lows, spans):
+        key *= span
+        key += column
+        key -= low
+    if space <= 4 * len(key) + 1024:
+        distinct = np.flatnonzero(np.bincount(key, minlength=space))
+        lookup = np.empty(space, dtype=np.int64)
+        lookup[distinct] = np.arange(len(distinct))
+        inverse = lookup[key]
+    else:
+        distinct, inverse = np.unique(key, return_inverse=True)
+        inverse = inverse.reshape(-1)
+    
+    rows = []
+    for low, span in zip(reversed(lows), reversed(spans)):
+        rows.append(distinct % span + low)
+        distinct = distinct // span
+    return rows[::-1], inverse
+
+def group_analytics(snapshot, dims, statuses=None, start_day=None, end_day=None):
+    """Sum hours and count logs per combination of dims.
+    
+    Logs are folded per (volunteer, month, status) with bincount over the
+    mapped columns; volunteer attributes and team memberships are then looked
+    up for those partial sums by fancy indexing, and the result folded again.
+    """
+    volunteer, day, month, hours, status = (snapshot.column(name) for name in ('volunteer', 'day', 'month', 'hours', 'status'))
+    keep = np.ones(len(volunteer), dtype=bool)
+    if start_day is not None:
+        keep &= day >= start_day
+    if end_day is not None:
+        keep &= day <= end_day
+    if statuses is not None:
+        keep &= np.isin(status, list(statuses))
+    if not keep.any():
+        return []
+    
+    partial_columns = [volunteer[keep]]
+    if 'month' in dims:
+        partial_columns.append(month[keep])
+    if 'status' in dims:
+        partial_columns.append(status[keep])
+    partial, inverse = group_codes(partial_columns)
+    partial_hours = np.bincount(inverse, weights=hours[keep], minlength=len(partial[0]))
+    partial_counts = np.bincount(inverse, minlength=len(partial[0]))
+    
+    v = partial[0]
+    codes = {'volunteer': v}
+    for name in ('college', 'course', 'year_of_study'):
+        codes[name] = snapshot.column(name)[v]
+    if 'month' in dims:
+        codes['month'] = partial[1]
+    if 'status' in dims:
+        codes['status'] = partial[-1]
+    
+    if 'team' in dims:
+        # One row per (partial sum, team); volunteers without a team keep one row with team -1
+        offsets = snapshot.column('team_offsets')
+        starts, ends = offsets[v], offsets[v + 1]
+        repeats = np.maximum(ends - starts, 1)
+        row = np.repeat(np.arange(len(v)), repeats)
+        within = np.arange(len(row)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        team_codes = np.append(snapshot.column('team_codes'), -1)
+        codes = {name: column[row] for name, column in codes.items()}
+        codes['team'] = team_codes[np.where(np.repeat(ends > starts, repeats), starts[row] + within, len(team_codes) - 1)]
+        partial_hours, partial_counts = partial_hours[row], partial_counts[row]
+    
+    groups, inverse = group_codes([codes[name] for name in dims])
+    group_hours = np.bincount(inverse, weights=partial_hours, minlength=len(groups[0]))
+    group_counts = np.bincount(inverse, weights=partial_counts, minlength=len(groups[0]))
+    
+    labels = snapshot.header['labels']
+    volunteer_ids = snapshot.column('volunteer_id')
+    
+    def label(name, code):
+        if name == 'volunteer':
+            return int(volunteer_ids[code])
+        if name == 'month':
+            return f'{code // 12:04d}-{code % 12 + 1:02d}'
+        if name == 'status':
+            return labels['status'][code]
+        if name == 'team':
+            return labels['team'][code] if code >= 0 else None
+        return labels[name][code] or None
+    
+    return [dict({name: label(name, int(code)) for name, code in zip(dims, key)},
+                 hours=round(float(h), 2), log_count=int(count))
+            for key, h, count in zip(zip(*groups), group_hours, group_counts)]
+
+@app.cli.command('build-analytics-snapshot')
+def build_analytics_snapshot_command():
+    """Rebuild the memory-mapped work log analytics snapshot"""
+    result = build_analytics_snapshot()
+    print(f"Wrote {result['rows']} work logs to {ANALYTICS_SNAPSHOT_PATH} in {result['build_ms']} ms")
+
+@job_handler('build_analytics_snapshot')
+def build_analytics_snapshot_job(params, report):
+    return build_analytics_snapshot()
+
+# Analytics Routes
+@app.route('/api/admin/analytics/work-logs/', methods=['GET'])
+@admin_required
+def work_log_analytics():
+    """Group-by over the analytics snapshot.
+    
+    Query parameters: group_by (comma separated from ANALYTICS_DIMENSIONS),
+    status, start/end (YYYY-MM-DD) and refresh=1 to rebuild the snapshot in
+    the background. Answers 503 until the first snapshot has been built.
+    """
+    dims = tuple(name.strip() for name in request.args.get('group_by', 'college').split(',') if name.strip())
+    unknown = sorted(set(dims) - set(ANALYTICS_DIMENSIONS))
+    if not dims or unknown:
+        return jsonify({'error': f'group_by must be a comma separated list of {", ".join(ANALYTICS_DIMENSIONS)}'}), 400
+    
+    statuses = None
+    if request.args.get('status'):
+        names = [name.strip() for name in request.args['status'].split(',')]
+        if set(names) - set(WORK_LOG_STATUSES):
+            return jsonify({'error': f'status must be one of {", ".join(WORK_LOG_STATUSES)}'}), 400
+        statuses = {WORK_LOG_STATUSES.index(name) for name in names}
+    
+    try:
+        start_day = datetime.strptime(request.args['start'], '%Y-%m-%d').date().toordinal() - SNAPSHOT_EPOCH \
+            if request.args.get('start') else None
+        end_day = datetime.strptime(request.args['end'], '%Y-%m-%d').date().toordinal() - SNAPSHOT_EPOCH \
+            if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    
+    snapshot = current_analytics_snapshot(refresh=request.args.get('refresh') == '1')
+    if snapshot is None:
+        response = jsonify({'error': 'Analytics snapshot is being built, please retry shortly', 'retry_after': 5})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    started = time.perf_counter()
+    groups = group_analytics(snapshot, dims, statuses, start_day, end_day)
+    groups.sort(key=lambda row: row['hours'], reverse=True)
+    
+    return jsonify({
+        'group_by': list(dims),
+        'groups': groups,
+        'snapshot': {
+            'built_at': snapshot.header['built_at'],
+            'rows': snapshot.header['rows'],
+            'age_seconds': round(snapshot.age(), 1)
+        },
+        'query_ms': round((time.perf_counter() - started) * 1000, 3)
+    })
+
+# Initialize database
+SCHEMA_LOCK_KEY = 0x766d7300  # Postgres advisory lock held while a worker upgrades the schema
+
+@contextmanager
+def schema_lock():
+    """Serialize schema changes across every worker starting at once.
+    
+    Postgres takes a session advisory lock; SQLite, which only runs on one
+    host, locks a file next to the database.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.connect() as conn:
+            conn.execute(db.text('SELECT pg_advisory_lock(:key)'), {'key': SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(db.text('SELECT pg_advisory_unlock(:key)'), {'key': SCHEMA_LOCK_KEY})
+                conn.commit()
+        return
+    
+    database = db.engine.url.database
+    if fcntl is None or not database or database == ':memory:':
+        yield
+        return
+    with open(f'{database}.schema-lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def duplicate_groups(conn, table, index):
+    return conn.execute(
+        db.select(db.func.count()).select_from(
+            db.select(*index.columns).group_by(*index.columns).having(db.func.count() > 1).subquery()
+        )
+    ).scalar()
+
+def dedupe_unique_indexes():
+    """Drop duplicate rows and build the unique indexes marked info['dedupe'].
+    
+    Each duplicate group keeps one row: one matching info['dedupe_prefer']
+    (column, value) if any, otherwise the oldest. Indexes already in place
+    are skipped, so running it again changes nothing. Returns rows removed.
+    """
+    removed = 0
+    with schema_lock(), db.engine.begin() as conn:
+        inspector = db.inspect(conn)
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if not (index.unique and index.info.get('dedupe')) or index.name in existing_indexes:
+                    continue
+                
+                order = [table.c.id]
+                if index.info.get('dedupe_prefer'):
+                    column, value = index.info['dedupe_prefer']
+                    order.insert(0, db.case((table.c[column] == value, 0), else_=1))
+                ranked = db.select(
+                    table.c.id, db.func.row_number().over(partition_by=list(index.columns), order_by=order).label('rank')
+                ).subquery()
+                duplicates = db.select(ranked.c.id).where(ranked.c.rank > 1)
+                count = conn.execute(table.delete().where(table.c.id.in_(duplicates))).rowcount
+                if count:
+                    print(f"Removed {count} duplicate {table.name} rows")
+                removed += count
+                index.create(conn)
+                print(f"Created index {index.name}")
+    return removed
+
+@app.cli.command('dedupe-unique-indexes')
+def dedupe_unique_indexes_command():
+    """Remove duplicate memberships and attendees, then add their unique indexes"""
+    print(f"Removed {dedupe_unique_indexes()} duplicate rows")
+
+def upgrade_schema():
+    """Add columns and indexes introduced after a table was first created.
+    
+    db.create_all() only creates missing tables, so existing deployments pick
+    up new (nullable) columns here. Columns declaring info['backfill_from']
+    are filled from that column once they are added. Unique indexes over
+    tables that hold duplicates are left to `flask dedupe-unique-indexes`;
+    startup never deletes rows. Call under schema_lock().
+    """
+    inspector = db.inspect(db.engine)
+    quote = db.engine.dialect.identifier_preparer.quote
+    
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(db.text(f'ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}'))
+                if column.info.get('backfill_from'):
+                    conn.execute(db.text(
+                        f'UPDATE {quote(table.name)} SET {quote(column.name)} = {quote(column.info["backfill_from"])}'
+                    ))
+                print(f"Added column {table.name}.{column.name}")
+            
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                if index.unique and index.info.get('dedupe') and duplicate_groups(conn, table, index):
+                    print(f"⚠️ {table.name} has duplicate rows; run `flask --app app dedupe-unique-indexes` "
+                          f"to build {index.name}")
+                    continue
+                index.create(conn, checkfirst=True)
+
+def init_db():
+    with app.app_context(), schema_lock():
+        db.create_all()
+        upgrade_schema()
+        
+        # Create Akshar Paaul NGO admin account if it doesn't exist
+        admin = User.query.filter_by(username='AksharPaaulNGO').first()
+        if not admin:
+            admin = User(
+                username='AksharPaaulNGO',
+                email='admin@aksharpaaul.org',
+                password_hash=generate_password_hash('admin123'),
+                role='admin',
+                full_name='Akshar Paaul Administrator'
+            )
+            db.session.add(admin)
+            print("Akshar Paaul NGO admin account created: AksharPaaulNGO/admin123")
+        
+        db.session.commit()
+        
+        # Team badges, hour reports and leaderboards read precomputed rows; fill them on first start
+        if not PendingApprovalCount.query.first():
+            rebuild_pending_counts()
+        if not HourBucket.query.first():
+            rebuild_hour_buckets()
+        if not LeaderboardScore.query.first():
+            rebuild_leaderboards()
+
+# Serve React App - MUST BE LAST
+@app.route('/')
+def serve():
+    if app.static_folder and os.path.exists(os.path.join(app.static_folder, 'index.html')):
+        return send_from_directory(app.static_folder, 'index.html')
+    else:
+        return jsonify({'message': 'API is running. Frontend not built yet.'}), 200
+
+@app.route('/<path:path>')
+def static_proxy(path):
+    print(f"Static proxy called with path: {path}")
+    print(f"Static folder: {app.static_folder}")
+    
+    # Skip API routes
+    if path.startswith('api/'):
+        return jsonify({'error': 'API endpoint not found'}), 404
+    
+    # Try to serve static file first
+    if app.static_folder:
+        try:
+            file_path = os.path.join(app.static_folder, path)
+            print(f"Checking file: {file_path}")
+            if os.path.exists(file_path) and os.path.isfile(file_path):
+                return send_from_directory(app.static_folder, path)
+        except Exception as e:
+            print(f"Error serving static file: {e}")
+    
+    # Fallback to index.html for React Router
+    if app.static_folder:
+        try:
+            index_path = os.path.join(app.static_folder, 'index.html')
+            print(f"Fallback to index.html: {index_path}")
+            if os.path.exists(index_path):
+                return send_from_directory(app.static_folder, 'index.html')
+        except Exception as e:
+            print(f"Error serving index.html: {e}")
+    
+    return jsonify({'error': 'Frontend not found', 'path': path, 'static_folder': app.static_folder}), 404
 
 # Error handlers
 @app.errorhandler(404)
@@ -1865,10 +6392,20 @@ try:
 except Exception as e:
     print(f"❌ Database initialization error: {e}")
 
+# Single-container deployments can run the job worker inside the web process
+if int(os.environ.get('JOB_WORKER_THREADS', '0')) > 0:
+    threading.Thread(
+        target=run_job_worker,
+        kwargs={'threads': int(os.environ['JOB_WORKER_THREADS'])},
+        name='job-worker',
+        daemon=True
+    ).start()
+
 if __name__ == '__main__':
     app.run(debug=True)# General document upload route (for all users)
 @app.route('/api/documents/upload/', methods=['POST'])
 @login_required
+@idempotent
 def upload_document_general():
     user = get_current_user()
     if not user:
@@ -1898,7 +6435,7 @@ def upload_document_general():
                 return jsonify({'error': 'One or more invalid team IDs provided'}), 400
         else:
             # Users can only share with teams they're members of
-            user_team_ids = [membership.team_id for membership in TeamMember.query.filter_by(user_id=user.id).all()]
+            user_team_ids = [m.team_id for m in user_memberships(user.id)]
             invalid_teams = [team_id for team_id in team_ids if team_id not in user_team_ids]
             if invalid_teams:
                 return jsonify({'error': 'You can only share documents with teams you are a member of'}), 403
@@ -1913,7 +6450,7 @@ def upload_document_general():
         )
         
         db.session.add(document)
-        db.session.commit()
+        db.session.flush()  # Get document ID
         
         # Add team access if specified
         if team_ids:
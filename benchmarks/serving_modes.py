@@ -0,0 +1,158 @@
+"""Compare the threaded and gevent serving modes under concurrent load.
+
+Starts gunicorn once per mode with the same app and database, signs in, and
+keeps `--concurrency` connections busy with read endpoints for `--duration`
+seconds, then prints throughput and latency percentiles per mode.
+
+    python benchmarks/serving_modes.py --concurrency 200 --duration 20
+
+Point DATABASE_URL at the Postgres instance you deploy against: the gevent
+mode pays off while requests wait on the network, which a local SQLite file
+does not show. Rate limiting and the response cache are switched off for the
+servers under test so every request reaches the database.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    'gthread': ['--worker-class', 'gthread', '--threads', '8'],
+    'gevent': ['--worker-class', 'gevent', '--worker-connections', '1000'],
+}
+
+DEFAULT_PATHS = [
+    '/api/teams/',
+    '/api/projects/',
+    '/api/volunteers/work-logs/',
+    '/api/leaderboard/',
+    '/api/admin/reports/hours/',
+    '/api/admin/approvals/counts/',
+]
+
+
+def start_server(mode, port, workers):
+    env = dict(os.environ, RATE_LIMIT_ENABLED='false', RESPONSE_CACHE_ENABLED='false')
+    command = [
+        sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers), '--log-level', 'warning', *MODES[mode], 'app:app'
+    ]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/admin/check/')
+            conn.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{mode} server did not start on port {port}')
+
+
+def login(port, username, password):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/api/auth/login/', json.dumps({'username': username, 'password': password}),
+                 {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f'Login failed with HTTP {response.status}')
+    return response.getheader('Set-Cookie').split(';', 1)[0]
+
+
+def run_load(port, cookie, paths, concurrency, duration):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local, failed, i = [], 0, offset
+        while time.time() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers={'Cookie': cookie})
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'rps': len(latencies) / elapsed,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', default='gthread,gevent')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--port', type=int, default=18000)
+    parser.add_argument('--username', default='AksharPaaulNGO')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--path', action='append', dest='paths', help='Endpoint to request (repeatable)')
+    args = parser.parse_args()
+
+    results = {}
+    for n, mode in enumerate(args.modes.split(',')):
+        port = args.port + n
+        server = start_server(mode, port, args.workers)
+        try:
+            cookie = login(port, args.username, args.password)
+            run_load(port, cookie, args.paths or DEFAULT_PATHS, min(args.concurrency, 10), 2)  # Warm up
+            results[mode] = run_load(port, cookie, args.paths or DEFAULT_PATHS, args.concurrency, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    print(f"{'mode':<10}{'requests':>10}{'errors':>8}{'req/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10.1f}{r['mean_ms']:>10.1f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
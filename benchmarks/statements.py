@@ -0,0 +1,92 @@
+"""Time the named statements against the Model.query calls they replaced.
+
+Each pair runs the same query shape against a scratch SQLite database;
+the difference is the Python-side cost of building a Query on every call.
+
+    python benchmarks/statements.py --calls 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=5000)
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--members', type=int, default=25)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='vms-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ.setdefault('RATE_LIMIT_DB', os.path.join(workdir, 'ratelimit.sqlite3'))
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    import app as vms
+
+    with vms.app.app_context():
+        db = vms.db
+        users = [vms.User(username=f'bench{n}', email=f'bench{n}@example.org', password_hash='x', role='volunteer')
+                 for n in range(args.teams * args.members)]
+        db.session.add_all(users)
+        db.session.flush()
+        for t in range(args.teams):
+            team = vms.Team(name=f'Team {t}', created_by_id=users[0].id)
+            db.session.add(team)
+            db.session.flush()
+            for n, user in enumerate(users[t * args.members:(t + 1) * args.members]):
+                db.session.add(vms.TeamMember(team_id=team.id, user_id=user.id, role='leader' if n == 0 else 'member'))
+                db.session.add(vms.WorkLog(volunteer_id=user.id, date=vms.date(2024, 1, 1), hours_worked=2,
+                                           description='bench', status='approved'))
+        db.session.commit()
+
+        team_id = vms.Team.query.first().id
+        member_ids = [m.user_id for m in vms.team_memberships(team_id)]
+        user_id = member_ids[1]
+
+        pairs = [
+            ('memberships by team',
+             lambda: vms.TeamMember.query.filter_by(team_id=team_id).all(),
+             lambda: vms.team_memberships(team_id)),
+            ('memberships by user',
+             lambda: vms.TeamMember.query.filter_by(user_id=user_id).all(),
+             lambda: vms.user_memberships(user_id)),
+            ('membership lookup',
+             lambda: vms.TeamMember.query.filter_by(team_id=team_id, user_id=user_id).first(),
+             lambda: vms.membership(team_id, user_id)),
+            ('led teams',
+             lambda: {row.team_id for row in vms.TeamMember.query.filter_by(user_id=user_id, role='leader').all()},
+             lambda: vms.led_team_ids(user_id)),
+            ('users by ids',
+             lambda: {u.id: u for u in vms.User.query.filter(vms.User.id.in_(member_ids)).all()},
+             lambda: vms.users_by_ids(member_ids)),
+            ('hours per volunteer',
+             lambda: dict(db.session.query(vms.WorkLog.volunteer_id, db.func.sum(vms.WorkLog.hours_worked)).filter(
+                 vms.WorkLog.volunteer_id.in_(member_ids)).group_by(vms.WorkLog.volunteer_id).all()),
+             lambda: dict(db.session.execute(vms.HOURS_PER_VOLUNTEER, {'volunteer_ids': member_ids}).all())),
+        ]
+
+        def timed(fn):
+            for _ in range(200):
+                fn()
+            db.session.expunge_all()
+            started = time.process_time()
+            for _ in range(args.calls):
+                fn()
+            return (time.process_time() - started) / args.calls * 1e6
+
+        print(f"{'query shape':<22}{'Model.query us':>16}{'named us':>12}{'saved us':>12}")
+        total_saved = 0
+        for name, before, after in pairs:
+            old, new = timed(before), timed(after)
+            total_saved += old - new
+            print(f"{name:<22}{old:>16.1f}{new:>12.1f}{old - new:>12.1f}")
+        print(f"CPU saved for one call of each shape: {total_saved:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
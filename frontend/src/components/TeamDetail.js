@@ -28,16 +28,12 @@ const TeamDetail = ({ team, onClose }) => {
 
   const fetchTeamData = async () => {
     try {
-      // Fetch team members, documents, and work logs
-      const [membersRes, docsRes, workLogsRes] = await Promise.all([
-        axios.get(`/api/teams/${team.id}/members/`),
-        axios.get(`/api/teams/${team.id}/documents/`),
-        axios.get(`/api/teams/${team.id}/work-logs/`)
-      ]);
+      // Fetch team members, documents, and work logs in one request
+      const response = await axios.get(`/api/teams/${team.id}/detail/?sections=members,documents,work_logs`);
 
-      setTeamMembers(membersRes.data.members);
-      setTeamDocuments(docsRes.data.documents);
-      setTeamWorkLogs(workLogsRes.data.work_logs || []);
+      setTeamMembers(response.data.members);
+      setTeamDocuments(response.data.documents);
+      setTeamWorkLogs(response.data.work_logs || []);
     } catch (error) {
       console.error('Error fetching team data:', error);
     }
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix='vms-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORKDIR, 'test.db')
+os.environ['RATE_LIMIT_DB'] = os.path.join(WORKDIR, 'ratelimit.sqlite3')
+os.environ['CHECKIN_QUEUE_DB'] = os.path.join(WORKDIR, 'checkins.sqlite3')
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+os.chdir(WORKDIR)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as vms  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    with vms.app.app_context():
+        vms.db.drop_all()
+        vms.db.create_all()
+        vms.db.session.add(vms.User(username='admin', email='admin@example.org', role='admin',
+                                    password_hash=vms.generate_password_hash('pw', method='pbkdf2:sha256:1')))
+        for name in ('v1', 'v2'):
+            vms.db.session.add(vms.User(username=name, email=f'{name}@example.org', role='volunteer',
+                                        full_name=name.upper(),
+                                        password_hash=vms.generate_password_hash('pw', method='pbkdf2:sha256:1')))
+        vms.db.session.commit()
+    vms.response_cache.clear()
+    yield vms.app
+
+
+@pytest.fixture
+def login(app):
+    def login(username):
+        client = app.test_client()
+        response = client.post('/api/auth/login/', json={'username': username, 'password': 'pw'})
+        assert response.status_code == 200, response.data
+        return client
+    return login
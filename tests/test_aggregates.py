@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import app as vms
+
+
+def aggregates():
+    buckets = {(b.period, b.bucket_start, b.volunteer_id, b.status): (round(b.hours, 6), b.log_count)
+               for b in vms.HourBucket.query.all() if b.log_count}
+    scores = {(s.period, s.period_start, s.volunteer_id): (round(s.hours, 6), s.log_count)
+              for s in vms.LeaderboardScore.query.all() if s.log_count}
+    return buckets, scores
+
+
+def rebuilt():
+    vms.rebuild_hour_buckets()
+    vms.rebuild_leaderboards()
+    return aggregates()
+
+
+def test_work_log_lifecycle_keeps_aggregates_in_step(app, login):
+    volunteer, admin = login('v1'), login('admin')
+    old_day, today = date.today() - timedelta(days=400), date.today()
+    log_ids = [volunteer.post('/api/volunteers/work-logs/create/', json={
+        'date': day.isoformat(), 'hours_worked': hours, 'description': 'Sorting donations'
+    }).get_json()['log_id'] for day, hours in ((old_day, 3), (today, 2), (today, 1.5))]
+
+    with app.app_context():
+        v1 = vms.User.query.filter_by(username='v1').first().id
+        buckets, scores = aggregates()
+        assert buckets[('month', today.replace(day=1), v1, 'pending')] == (3.5, 2)
+        assert scores == {}
+
+    for log_id, status in zip(log_ids, ('approved', 'approved', 'rejected')):
+        response = admin.post(f'/api/volunteers/work-logs/{log_id}/approve/', json={'status': status})
+        assert response.status_code == 200, response.data
+
+    with app.app_context():
+        buckets, scores = aggregates()
+        assert buckets[('day', today, v1, 'approved')] == (2, 1)
+        assert buckets[('day', today, v1, 'rejected')] == (1.5, 1)
+        assert ('day', today, v1, 'pending') not in buckets
+        assert scores[('all', date.min, v1)] == (5, 2)
+        assert scores[('month', today.replace(day=1), v1)] == (2, 1)
+        assert (buckets, scores) == rebuilt()
+
+        assert vms.archive_work_logs(days=365)['archived'] == 1
+        assert aggregates() == (buckets, scores) == rebuilt()
+
+
+def test_init_db_backfills_empty_aggregates(app):
+    with app.app_context():
+        v1 = vms.User.query.filter_by(username='v1').first().id
+        vms.db.session.add(vms.WorkLog(volunteer_id=v1, date=date(2026, 2, 3), hours_worked=4,
+                                       description='Tutoring', status='approved'))
+        vms.db.session.commit()
+        expected = aggregates()
+        vms.HourBucket.query.delete()
+        vms.LeaderboardScore.query.delete()
+        vms.db.session.commit()
+
+    vms.init_db()
+    with app.app_context():
+        assert aggregates() == expected
+        assert expected[1][('all', date.min, v1)] == (4, 1)
@@ -0,0 +1,59 @@
+import os
+import time
+from collections import defaultdict
+from datetime import date
+
+import app as vms
+
+
+def add_logs(app):
+    with app.app_context():
+        v1, v2 = (vms.User.query.filter_by(username=name).first() for name in ('v1', 'v2'))
+        team = vms.Team(name='Drive crew', created_by_id=v1.id)
+        vms.db.session.add(team)
+        vms.db.session.flush()
+        vms.db.session.add(vms.TeamMember(team_id=team.id, user_id=v1.id, role='leader'))
+        for volunteer, day, hours, status in ((v1, date(2026, 1, 5), 2, 'approved'), (v1, date(2026, 2, 1), 1.5, 'pending'),
+                                              (v2, date(2026, 1, 9), 3, 'approved'), (v2, date(2026, 1, 10), 0.25, 'rejected')):
+            vms.db.session.add(vms.WorkLog(volunteer_id=volunteer.id, date=day, hours_worked=hours,
+                                           description='sorting', status=status))
+        vms.db.session.commit()
+
+
+def test_group_by_matches_the_work_log_table(app):
+    add_logs(app)
+    with app.app_context():
+        vms.build_analytics_snapshot()
+        snapshot = vms.AnalyticsSnapshot(vms.ANALYTICS_SNAPSHOT_PATH)
+
+        expected = defaultdict(float)
+        for log in vms.WorkLog.query.all():
+            expected[log.volunteer_id] += log.hours_worked
+        assert {row['volunteer']: row['hours'] for row in vms.group_analytics(snapshot, ('volunteer',))} == expected
+
+        rows = vms.group_analytics(snapshot, ('team', 'status'), statuses={vms.WORK_LOG_STATUSES.index('approved')})
+        assert sorted(rows, key=lambda row: row['hours']) == [
+            {'team': 'Drive crew', 'status': 'approved', 'hours': 2.0, 'log_count': 1},
+            {'team': None, 'status': 'approved', 'hours': 3.0, 'log_count': 1},
+        ]
+        assert vms.group_analytics(snapshot, ('month',), start_day=date(2026, 2, 1).toordinal() - vms.SNAPSHOT_EPOCH) == [
+            {'month': '2026-02', 'hours': 1.5, 'log_count': 1}
+        ]
+
+
+def test_missing_snapshot_is_built_in_the_background(app, login):
+    add_logs(app)
+    if os.path.exists(vms.ANALYTICS_SNAPSHOT_PATH):
+        os.remove(vms.ANALYTICS_SNAPSHOT_PATH)
+    admin = login('admin')
+
+    response = admin.get('/api/admin/analytics/work-logs/?group_by=status')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+
+    deadline = time.monotonic() + 10
+    while response.status_code == 503 and time.monotonic() < deadline:
+        time.sleep(0.1)
+        response = admin.get('/api/admin/analytics/work-logs/?group_by=status')
+    assert response.status_code == 200
+    assert response.get_json()['snapshot']['rows'] == 4
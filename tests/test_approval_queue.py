@@ -0,0 +1,61 @@
+import app as vms
+
+
+def counts(admin):
+    return admin.get('/api/admin/approvals/counts/').get_json()['work_log']
+
+
+def assert_counters_rebuild_to(app, admin, expected):
+    assert counts(admin) == expected
+    with app.app_context():
+        vms.rebuild_pending_counts()
+    assert counts(admin) == expected
+
+
+def test_team_counters_follow_membership_changes(app, login):
+    leader, volunteer, admin = login('v1'), login('v2'), login('admin')
+    first = leader.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    second = leader.post('/api/teams/create/', json={'name': 'Book crew'}).get_json()['team_id']
+    for day in ('2026-02-01', '2026-02-02'):
+        volunteer.post('/api/volunteers/work-logs/create/', json={'date': day, 'hours_worked': 2,
+                                                                  'description': 'Sorting donations'})
+    assert_counters_rebuild_to(app, admin, {'total': 2, 'teams': {}})
+
+    assert volunteer.post(f'/api/teams/{first}/join/').status_code == 200
+    assert_counters_rebuild_to(app, admin, {'total': 2, 'teams': {str(first): 2}})
+
+    moved = leader.post(f'/api/teams/{first}/members/bulk/', json={'action': 'move', 'members': ['v2'],
+                                                                   'to_team_id': second}).get_json()
+    assert moved['moved'] == 1
+    assert_counters_rebuild_to(app, admin, {'total': 2, 'teams': {str(second): 2}})
+
+    with app.app_context():
+        v2 = vms.User.query.filter_by(username='v2').first().id
+    assert leader.post(f'/api/teams/{second}/remove-member/', json={'member_id': v2}).status_code == 200
+    assert_counters_rebuild_to(app, admin, {'total': 2, 'teams': {}})
+
+    added = leader.post(f'/api/teams/{first}/members/bulk/', json={'action': 'add', 'members': ['v2']}).get_json()
+    assert added['added'] == 1
+    assert_counters_rebuild_to(app, admin, {'total': 2, 'teams': {str(first): 2}})
+
+
+def test_claims_leave_counters_alone_until_the_review(app, login):
+    volunteer, admin = login('v2'), login('admin')
+    for day in ('2026-02-01', '2026-02-02', '2026-02-03'):
+        volunteer.post('/api/volunteers/work-logs/create/', json={'date': day, 'hours_worked': 2,
+                                                                  'description': 'Sorting donations'})
+
+    claimed = admin.post('/api/admin/approvals/claim/?kind=work_log', json={'count': 2}).get_json()
+    assert claimed['claimed'] == 2
+    assert counts(admin)['total'] == 3
+    # Claimed items are skipped by the next claim
+    assert admin.post('/api/admin/approvals/claim/?kind=work_log', json={'count': 10}).get_json()['claimed'] == 1
+
+    for item in claimed['items']:
+        response = admin.post(f"/api/volunteers/work-logs/{item['id']}/approve/", json={'status': 'approved'})
+        assert response.status_code == 200
+    assert_counters_rebuild_to(app, admin, {'total': 1, 'teams': {}})
+
+    assert admin.post('/api/admin/approvals/release/?kind=work_log', json={}).get_json()['success']
+    queue = admin.get('/api/admin/approvals/?kind=work_log').get_json()
+    assert queue['pending_count'] == len(queue['items']) == 1
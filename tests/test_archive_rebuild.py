@@ -0,0 +1,105 @@
+from datetime import date
+
+import pytest
+
+import app as vms
+
+
+def totals():
+    buckets = {(b.period, b.bucket_start, b.volunteer_id, b.status): (b.hours, b.log_count)
+               for b in vms.HourBucket.query.all() if b.log_count}
+    scores = {(s.period, s.period_start, s.volunteer_id): (s.hours, s.log_count)
+              for s in vms.LeaderboardScore.query.all() if s.log_count}
+    return buckets, scores
+
+
+def test_rebuilds_count_archived_work_logs(app):
+    with app.app_context():
+        volunteer = vms.User.query.filter_by(username='v1').first()
+        for day, hours in ((date(2015, 3, 2), 3), (date(2015, 3, 9), 2), (date.today(), 4)):
+            vms.db.session.add(vms.WorkLog(volunteer_id=volunteer.id, date=day, hours_worked=hours,
+                                           description='sorting', status='approved'))
+        vms.db.session.commit()
+        before = totals()
+
+        assert vms.archive_work_logs(days=365)['archived'] == 2
+        vms.rebuild_hour_buckets()
+        vms.rebuild_leaderboards()
+
+        assert totals() == before
+        assert before[1][('all', date.min, volunteer.id)] == (9, 3)
+
+
+def test_sparse_work_log_listing_loads_no_deferred_columns(app, login):
+    with app.app_context():
+        volunteer_id = vms.User.query.filter_by(username='v1').first().id
+        for n in range(30):
+            vms.db.session.add(vms.WorkLog(volunteer_id=volunteer_id, date=date(2026, 1, 1 + n % 28), hours_worked=1,
+                                           description='sorting', status='approved'))
+        vms.db.session.add(vms.ArchivedWorkLog(id=10_000, volunteer_id=volunteer_id, date=date(2015, 1, 1),
+                                               hours_worked=1, description='old', status='approved'))
+        vms.db.session.commit()
+    client = login('v1')
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = vms.db.engine
+    vms.db.event.listen(engine, 'before_cursor_execute', count)
+    try:
+        for query in ('?fields=id,status&start_date=2025-01-01', '?fields=id,status'):
+            statements.clear()
+            logs = client.get(f'/api/volunteers/work-logs/{query}').get_json()['work_logs']
+            assert not [s for s in statements if 'WHERE work_log.id = ' in s or 'WHERE archived_work_log.id = ' in s]
+            assert all(set(log) == {'id', 'status'} for log in logs)
+        assert len(logs) == 31 and logs[-1]['id'] == 10_000
+    finally:
+        vms.db.event.remove(engine, 'before_cursor_execute', count)
+
+
+def archive_newest_log(volunteer_id):
+    log = vms.WorkLog(volunteer_id=volunteer_id, date=date(2015, 3, 2), hours_worked=1,
+                      description='sorting', status='approved')
+    vms.db.session.add(log)
+    vms.db.session.commit()
+    archived_id = log.id
+    assert vms.archive_work_logs(days=365)['archived'] == 1
+    return archived_id
+
+
+def test_archived_ids_are_not_handed_out_again(app):
+    with app.app_context():
+        volunteer_id = vms.User.query.filter_by(username='v1').first().id
+        archived_id = archive_newest_log(volunteer_id)
+        assert archive_newest_log(volunteer_id) > archived_id
+
+
+def test_legacy_sqlite_table_is_migrated_before_archiving(app):
+    with app.app_context():
+        volunteer_id = vms.User.query.filter_by(username='v1').first().id
+        archived_id = archive_newest_log(volunteer_id)
+
+        # Recreate work_log the way older deployments have it
+        create = str(vms.db.schema.CreateTable(vms.WorkLog.__table__).compile(vms.db.engine))
+        vms.db.session.execute(vms.db.text('DROP TABLE work_log'))
+        vms.db.session.execute(vms.db.text(create.replace(' AUTOINCREMENT', '')))
+        vms.db.session.commit()
+        assert vms.work_log_ids_reusable()
+
+        log = vms.WorkLog(volunteer_id=volunteer_id, date=date(2015, 3, 2), hours_worked=1,
+                          description='sorting', status='approved')
+        vms.db.session.add(log)
+        vms.db.session.commit()
+        assert log.id == 1  # SQLite reuses max(id) + 1
+        with pytest.raises(RuntimeError):
+            vms.archive_work_logs(days=365)
+        vms.db.session.rollback()
+        vms.db.session.delete(log)
+        vms.db.session.commit()
+
+        assert vms.migrate_work_log_ids()
+        assert not vms.work_log_ids_reusable()
+        assert archive_newest_log(volunteer_id) > archived_id
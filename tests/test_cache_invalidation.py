@@ -0,0 +1,33 @@
+import json
+
+import app as vms
+
+
+def outbox_tags():
+    return [set(json.loads(row.tags)) for row in vms.CacheInvalidation.query.order_by(vms.CacheInvalidation.id).all()]
+
+
+def test_approving_a_log_publishes_work_log_tag(app, login):
+    volunteer, admin = login('v1'), login('admin')
+    log_id = volunteer.post('/api/volunteers/work-logs/create/', json={
+        'date': '2026-01-05', 'hours_worked': 2, 'description': 'sorting'
+    }).get_json()['log_id']
+
+    with app.app_context():
+        before = len(outbox_tags())
+    assert admin.post(f'/api/volunteers/work-logs/{log_id}/approve/', json={'status': 'approved'}).status_code == 200
+
+    with app.app_context():
+        published = outbox_tags()[before:]
+    assert any('work_log' in tags for tags in published)
+
+
+def test_creating_a_team_publishes_membership_tag(app, login):
+    volunteer = login('v1')
+    with app.app_context():
+        before = len(outbox_tags())
+    assert volunteer.post('/api/teams/create/', json={'name': 'Drive crew'}).status_code == 200
+
+    with app.app_context():
+        published = outbox_tags()[before:]
+    assert any({'team', 'team_member'} <= tags for tags in published)
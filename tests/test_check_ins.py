@@ -0,0 +1,60 @@
+import app as vms
+
+
+def create_event(client):
+    response = client.post('/api/events/create/', json={'title': 'Beach clean-up', 'date': '2026-03-01', 'hours': 3})
+    assert response.status_code == 200, response.data
+    return response.get_json()['event_id']
+
+
+def test_check_in_queued_before_close_is_dropped_and_logged(app, login, capsys):
+    admin, volunteer = login('admin'), login('v1')
+    event_id = create_event(admin)
+
+    with app.app_context():
+        user_id = vms.User.query.filter_by(username='v1').first().id
+    vms.checkin_queue.append(event_id, user_id)
+    with app.app_context():
+        vms.Event.query.filter_by(id=event_id).update({'status': 'closed'})
+        vms.db.session.commit()
+
+        assert vms.drain_check_ins() == (0, 1)
+        assert vms.EventAttendee.query.filter_by(event_id=event_id).count() == 0
+    assert f'event {event_id} user {user_id}' in capsys.readouterr().out
+    assert volunteer.get(f'/api/events/{event_id}/check-in/').get_json()['status'] == 'not_checked_in'
+
+
+def test_team_event_is_hidden_from_non_members(app, login):
+    leader, outsider = login('v1'), login('v2')
+    team_id = leader.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    response = leader.post('/api/events/create/', json={'title': 'Crew drive', 'date': '2026-03-01',
+                                                        'hours': 2, 'team_id': team_id})
+    event_id = response.get_json()['event_id']
+
+    assert leader.get(f'/api/events/{event_id}/').status_code == 200
+    assert outsider.get(f'/api/events/{event_id}/').status_code == 404
+    assert event_id not in [event['id'] for event in outsider.get('/api/events/').get_json()['events']]
+    assert outsider.post(f'/api/events/{event_id}/check-in/').status_code == 404
+    assert not vms.checkin_queue.pending(event_id)
+
+
+
+def test_close_drains_only_its_own_event(app, login):
+    admin = login('admin')
+    closing, other = create_event(admin), create_event(admin)
+    with app.app_context():
+        vms.drain_check_ins()
+        v1, v2 = (vms.User.query.filter_by(username=name).first().id for name in ('v1', 'v2'))
+    for user_id in (v1, v2):
+        vms.checkin_queue.append(closing, user_id)
+    vms.checkin_queue.append(other, v1)
+
+    with app.app_context():
+        assert vms.drain_check_ins(limit=1, event_id=closing) == (1, 1)
+    assert (vms.checkin_queue.pending(closing), vms.checkin_queue.pending(other)) == (1, 1)
+
+    response = admin.post(f'/api/events/{closing}/close/')
+    assert response.status_code == 200, response.data
+    assert response.get_json()['work_logs_created'] == 2
+    assert vms.checkin_queue.pending(other) == 1
+    vms.checkin_queue.ack([row[0] for row in vms.checkin_queue.claim(event_id=other)])
@@ -0,0 +1,35 @@
+import app as vms
+
+
+def first_chunks(response, count):
+    chunks = iter(response.response)
+    return b''.join(next(chunks) for _ in range(count)).decode()
+
+
+def test_streams_beyond_the_worker_cap_are_told_to_retry(app, login, monkeypatch):
+    monkeypatch.setattr(vms, 'STREAM_MAX_PER_WORKER', 1)
+    admin = login('admin')
+
+    held = admin.get('/api/events/stream/', buffered=False)
+    assert first_chunks(held, 1).startswith('retry: 3000')
+    busy = admin.get('/api/events/stream/')
+    assert f'retry: {vms.STREAM_BUSY_RETRY_MS}' in busy.get_data(as_text=True)
+    assert 'event: busy' in busy.get_data(as_text=True)
+
+    held.close()
+    assert vms.open_streams['count'] == 0
+    again = admin.get('/api/events/stream/', buffered=False)
+    assert first_chunks(again, 1).startswith('retry: 3000')
+    again.close()
+
+
+def test_client_too_far_behind_gets_resync(app, login):
+    with app.app_context():
+        vms.db.session.add_all([vms.StreamEvent(event_type='work_log.created', payload='{}')
+                                for _ in range(vms.STREAM_REPLAY_LIMIT + 2)])
+        vms.db.session.commit()
+        newest = vms.db.session.query(vms.db.func.max(vms.StreamEvent.id)).scalar()
+
+    response = login('admin').get('/api/events/stream/', headers={'Last-Event-ID': '1'}, buffered=False)
+    assert f'id: {newest}\nevent: resync' in first_chunks(response, 2)
+    response.close()
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as vms
+
+LOG = {'date': '2026-03-01', 'hours_worked': 2, 'description': 'Sorting donations'}
+
+
+@pytest.fixture(autouse=True)
+def fresh_replays():
+    vms.idempotency_replays.clear()
+
+
+def work_log_count():
+    with vms.app.app_context():
+        return vms.WorkLog.query.count()
+
+
+def test_retry_replays_the_first_response(app, login):
+    client = login('v1')
+    first = client.post('/api/volunteers/work-logs/create/', json=LOG, headers={'Idempotency-Key': 'log-1'})
+    vms.idempotency_replays.clear()
+    retry = client.post('/api/volunteers/work-logs/create/', json=LOG, headers={'Idempotency-Key': 'log-1'})
+    assert retry.status_code == first.status_code == 200
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    assert work_log_count() == 1
+
+    other = client.post('/api/volunteers/work-logs/create/', json=dict(LOG, hours_worked=3),
+                        headers={'Idempotency-Key': 'log-1'})
+    assert other.status_code == 422
+
+
+def test_crashed_reservation_is_taken_over_after_its_lease(app, login):
+    client = login('v1')
+    with app.app_context():
+        user_id = vms.User.query.filter_by(username='v1').one().id
+        request_hash = vms.hashlib.sha256(
+            b'POST /api/volunteers/work-logs/create/\n' + vms.json.dumps(LOG).encode()
+        ).hexdigest()
+        reservation = vms.IdempotencyKey(user_id=user_id, key='log-2', endpoint='create_work_log',
+                                         request_hash=request_hash,
+                                         locked_until=datetime.utcnow() + timedelta(minutes=1),
+                                         expires_at=datetime.utcnow() + timedelta(hours=1))
+        vms.db.session.add(reservation)
+        vms.db.session.commit()
+
+    def post():
+        return client.post('/api/volunteers/work-logs/create/', data=vms.json.dumps(LOG),
+                           content_type='application/json', headers={'Idempotency-Key': 'log-2'})
+
+    in_progress = post()
+    assert in_progress.status_code == 409
+    assert int(in_progress.headers['Retry-After']) >= 1
+
+    with app.app_context():
+        vms.IdempotencyKey.query.filter_by(key='log-2').update({'locked_until': datetime.utcnow() - timedelta(seconds=1)})
+        vms.db.session.commit()
+    assert post().status_code == 200
+    assert post().headers['Idempotent-Replayed'] == 'true'
+    assert work_log_count() == 1
+
+
+def test_approval_retry_does_not_run_twice(app, login):
+    log_id = login('v1').post('/api/volunteers/work-logs/create/', json=LOG).get_json()['log_id']
+    admin = login('admin')
+    for _ in range(2):
+        response = admin.post(f'/api/volunteers/work-logs/{log_id}/approve/', json={'status': 'approved'},
+                              headers={'Idempotency-Key': 'approve-1'})
+        assert response.status_code == 200
+    assert response.headers['Idempotent-Replayed'] == 'true'
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+import time
+
+import app as vms
+
+
+def test_worker_requeues_jobs_that_go_stale_while_it_runs(app, monkeypatch):
+    monkeypatch.setattr(vms, 'JOB_REQUEUE_INTERVAL', 0)
+
+    def orphan_first_job(params, report):
+        # The other worker running the first job dies: its heartbeat stops
+        vms.BackgroundJob.query.filter_by(id=params['job_id']).update(
+            {'heartbeat_at': datetime.utcnow() - vms.JOB_STALE_AFTER * 2})
+        return {}
+
+    monkeypatch.setitem(vms.JOB_HANDLERS, 'noop', lambda params, report: {})
+    monkeypatch.setitem(vms.JOB_HANDLERS, 'orphan', orphan_first_job)
+
+    with app.app_context():
+        admin_id = vms.User.query.filter_by(username='admin').first().id
+        running = vms.BackgroundJob(job_type='noop', status='running', heartbeat_at=datetime.utcnow(),
+                                    created_by_id=admin_id)
+        vms.db.session.add(running)
+        vms.db.session.flush()
+        vms.db.session.add(vms.BackgroundJob(job_type='orphan', params=f'{{"job_id": {running.id}}}',
+                                             created_by_id=admin_id))
+        vms.db.session.commit()
+        running_id = running.id
+
+    vms.run_job_worker(threads=1, poll_interval=0.01, once=True)
+
+    with app.app_context():
+        assert vms.BackgroundJob.query.get(running_id).status == 'succeeded'
+
+
+def add_job(job_type):
+    with vms.app.app_context():
+        admin_id = vms.User.query.filter_by(username='admin').first().id
+        job = vms.BackgroundJob(job_type=job_type, created_by_id=admin_id)
+        vms.db.session.add(job)
+        vms.db.session.commit()
+        return job.id
+
+
+def test_silent_job_keeps_its_heartbeat(app, monkeypatch):
+    monkeypatch.setattr(vms, 'JOB_REQUEUE_INTERVAL', 0)
+    monkeypatch.setattr(vms, 'JOB_HEARTBEAT_INTERVAL', 0.05)
+    monkeypatch.setattr(vms, 'JOB_STALE_AFTER', timedelta(seconds=0.3))
+    runs = []
+
+    def silent(params, report):
+        runs.append(1)
+        time.sleep(1)
+        return {}
+
+    monkeypatch.setitem(vms.JOB_HANDLERS, 'silent', silent)
+    job_id = add_job('silent')
+    vms.run_job_worker(threads=1, poll_interval=0.05, once=True)
+
+    assert len(runs) == 1
+    with app.app_context():
+        assert vms.BackgroundJob.query.get(job_id).status == 'succeeded'
+
+
+def test_requeued_job_ignores_its_first_run(app, monkeypatch):
+    def taken_over(params, report):
+        # The sweep requeued this run and another worker claimed the job again
+        vms.BackgroundJob.query.filter_by(id=job_id).update({'claimed_by': 'other-worker'})
+        vms.db.session.commit()
+        return {'stale': True}
+
+    monkeypatch.setitem(vms.JOB_HANDLERS, 'taken_over', taken_over)
+    job_id = add_job('taken_over')
+    with app.app_context():
+        claimed = vms.claim_next_job()
+    assert claimed[0] == job_id
+    vms.execute_job(*claimed)
+
+    with app.app_context():
+        job = vms.BackgroundJob.query.get(job_id)
+        assert (job.status, job.claimed_by, job.result) == ('running', 'other-worker', None)
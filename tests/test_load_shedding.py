@@ -0,0 +1,19 @@
+import app as vms
+
+
+def test_worker_sheds_before_its_last_thread_is_taken(app, login, monkeypatch):
+    monkeypatch.setattr(vms, 'WORKER_CONCURRENCY', 8)
+    monkeypatch.setattr(vms, 'SHED_INFLIGHT_LIMIT', 0)
+    volunteer = login('v1')
+    with app.app_context():
+        assert vms.inflight_limit() == 7
+
+    monkeypatch.setitem(vms.inflight, 'count', 4)
+    monkeypatch.setitem(vms.open_streams, 'count', 2)
+    assert volunteer.get('/api/volunteers/work-logs/').status_code == 200
+
+    monkeypatch.setitem(vms.open_streams, 'count', 3)
+    response = volunteer.get('/api/volunteers/work-logs/')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert volunteer.get('/healthz').status_code == 200
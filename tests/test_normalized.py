@@ -0,0 +1,45 @@
+
+def seed(login):
+    v1, v2 = login('v1'), login('v2')
+    team_id = v1.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    for client, day in ((v1, '2026-02-01'), (v1, '2026-02-02'), (v2, '2026-02-03')):
+        client.post('/api/volunteers/work-logs/create/', json={'date': day, 'hours_worked': 2,
+                                                               'description': 'Sorting donations'})
+    for title in ('Book drive', 'Food drive'):
+        v1.post('/api/projects/create/', json={'title': title, 'description': 'Collect', 'is_team_project': True,
+                                               'team_id': team_id})
+    return team_id
+
+
+def test_work_logs_sideload_each_volunteer_once(app, login):
+    seed(login)
+    admin = login('admin')
+    embedded = admin.get('/api/volunteers/work-logs/').get_json()['work_logs']
+    normalized = admin.get('/api/volunteers/work-logs/?format=normalized').get_json()
+
+    users = normalized['users']
+    assert sorted(user['username'] for user in users.values()) == ['v1', 'v2']
+    assert len(normalized['work_logs']) == len(embedded) == 3
+    for row, full in zip(normalized['work_logs'], embedded):
+        assert 'volunteer' not in row and 'volunteer_details' not in row
+        user = users[str(row['volunteer_id'])]
+        assert user['username'] == full['volunteer']
+        assert {key: user[key] for key in full['volunteer_details']} == full['volunteer_details']
+        assert {key: value for key, value in row.items() if key != 'volunteer_id'} == \
+            {key: value for key, value in full.items() if key not in ('volunteer', 'volunteer_details')}
+
+
+def test_projects_sideload_users_and_teams(app, login):
+    team_id = seed(login)
+    admin = login('admin')
+    normalized = admin.get('/api/projects/?format=normalized').get_json()
+
+    assert normalized['teams'] == {str(team_id): {'id': team_id, 'name': 'Drive crew'}}
+    assert list(normalized['users'].values()) == [{'id': normalized['projects'][0]['volunteer_id'], 'username': 'v1'}]
+    for project in normalized['projects']:
+        assert project['team_id'] == team_id
+        assert 'team_name' not in project and 'volunteer' not in project
+
+    embedded = admin.get('/api/projects/').get_json()
+    assert set(embedded) == {'projects'}
+    assert all(project['team_name'] == 'Drive crew' for project in embedded['projects'])
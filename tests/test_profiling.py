@@ -0,0 +1,34 @@
+import app as vms
+
+
+def listeners_attached(app):
+    with app.app_context():
+        return vms.db.event.contains(vms.db.engine, 'before_cursor_execute', vms.before_profiled_query)
+
+
+def test_admins_get_a_profile(app, login):
+    admin = login('admin')
+    plain = admin.get('/api/projects/').get_json()
+    assert admin.get('/api/projects/').headers['X-Cache'] == 'HIT'
+
+    # Profiled requests skip the response cache so the report covers real work
+    response = admin.get('/api/projects/?profile=1')
+    profile = response.get_json().pop('_profile')
+    assert response.headers.get('X-Cache') != 'HIT'
+    assert response.get_json()['projects'] == plain['projects']
+    assert profile['query_count'] == len(profile['queries']) > 0
+    assert any(query.get('plan') for query in profile['queries'])
+    assert profile['functions']
+    assert not listeners_attached(app)
+
+
+def test_profile_is_ignored_for_other_users(app, login):
+    volunteer = login('v1')
+    volunteer.post('/api/volunteers/work-logs/create/', json={'date': '2026-02-01', 'hours_worked': 2,
+                                                               'description': 'Sorting donations'})
+    plain = volunteer.get('/api/volunteers/work-logs/').get_json()
+    profiled = volunteer.get('/api/volunteers/work-logs/?profile=1').get_json()
+    assert '_profile' not in profiled
+    assert profiled == plain
+    assert '_profile' not in app.test_client().get('/api/teams/?profile=1').get_json()
+    assert not listeners_attached(app)
@@ -0,0 +1,36 @@
+import app as vms
+
+
+def workers(tmp_path, count, interval=0):
+    store = vms.RateLimitStore(str(tmp_path / 'ratelimit.sqlite3'))
+    return store, [vms.LocalTokenBuckets(store, interval=interval) for _ in range(count)]
+
+
+def test_workers_share_one_budget(tmp_path):
+    store, (first, second) = workers(tmp_path, 2)
+    bucket = [('user:1', 5, 0.001)]
+    assert [first.take(bucket) for _ in range(5)] == [0] * 5
+    assert first.take(bucket) > 0
+    # A worker meeting the key for the first time starts from the shared level
+    assert second.take(bucket) > 0
+
+
+def test_tokens_are_taken_without_a_write_per_request(tmp_path, monkeypatch):
+    store, (worker,) = workers(tmp_path, 1, interval=60)
+    writes = []
+    transaction = store.transaction
+    monkeypatch.setattr(store, 'transaction', lambda work: writes.append(1) or transaction(work))
+    for _ in range(50):
+        assert worker.take([('user:1', 100, 1.0)]) == 0
+    assert len(writes) <= 1
+
+
+def test_preflights_are_not_charged(app, tmp_path, monkeypatch):
+    store, (worker,) = workers(tmp_path, 1)
+    monkeypatch.setattr(vms, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(vms, 'local_buckets', worker)
+    client = app.test_client()
+    for _ in range(20):
+        assert client.options('/api/auth/login/').status_code != 429
+    responses = [client.post('/api/auth/login/', json={'username': 'v1', 'password': 'bad'}) for _ in range(11)]
+    assert [r.status_code for r in responses].count(429) == 1
@@ -0,0 +1,32 @@
+import app as vms
+
+
+def drop_unique_indexes():
+    with vms.db.engine.begin() as conn:
+        conn.execute(vms.db.text('DROP INDEX unique_team_member'))
+        conn.execute(vms.db.text('DROP INDEX unique_event_attendee'))
+
+
+def test_startup_leaves_duplicates_to_the_dedupe_command(app, login, capsys):
+    leader = login('v1')
+    team_id = leader.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    with app.app_context():
+        v1 = vms.User.query.filter_by(username='v1').first().id
+        drop_unique_indexes()
+        leader_row = vms.TeamMember.query.filter_by(team_id=team_id, user_id=v1).one()
+        # A duplicate membership older than the leader row, as left by the pre-index race
+        leader_row.role = 'member'
+        vms.db.session.add(vms.TeamMember(team_id=team_id, user_id=v1, role='leader'))
+        vms.db.session.commit()
+
+    vms.init_db()
+    assert 'dedupe-unique-indexes' in capsys.readouterr().out
+    with app.app_context():
+        assert vms.TeamMember.query.filter_by(team_id=team_id, user_id=v1).count() == 2
+        assert 'index unique_team_member' in vms.missing_schema_objects()
+
+        assert vms.dedupe_unique_indexes() == 1
+        remaining = vms.TeamMember.query.filter_by(team_id=team_id, user_id=v1).one()
+        assert remaining.role == 'leader'
+        assert vms.missing_schema_objects() == []
+        assert vms.dedupe_unique_indexes() == 0
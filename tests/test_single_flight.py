@@ -0,0 +1,69 @@
+import threading
+
+from flask import jsonify
+
+import app as vms
+
+
+def coalesced_view(started, release):
+    calls = []
+
+    @vms.single_flight(scope=lambda **view_args: 'everyone')
+    def view():
+        calls.append(1)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+        response = jsonify({'calls': len(calls)})
+        response.headers['X-Cache'] = 'MISS'
+        response.set_cookie('session', 'leader')
+        return response, 202
+    return view, calls
+
+
+def call_in_thread(app, view, results):
+    def run():
+        with app.test_request_context('/api/report/?period=week'):
+            results.append(view())
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_waiter_gets_the_leaders_status_and_headers(app):
+    started, release = threading.Event(), threading.Event()
+    view, calls = coalesced_view(started, release)
+    results = []
+    leader = call_in_thread(app, view, results)
+    assert started.wait(5)
+    follower = call_in_thread(app, view, results)
+    while vms.request_flights.stats['coalesced'] == 0:
+        threading.Event().wait(0.01)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    waiter = next(response for response in results if 'Set-Cookie' not in response.headers)
+    assert waiter.status_code == 202
+    assert waiter.headers['X-Cache'] == 'MISS'
+    assert waiter.get_json() == {'calls': 1}
+
+
+def test_waiter_runs_the_view_itself_after_the_wait_limit(app, monkeypatch):
+    monkeypatch.setattr(vms, 'SINGLE_FLIGHT_WAIT', 0.05)
+    started, release = threading.Event(), threading.Event()
+    view, calls = coalesced_view(started, release)
+    results = []
+    leader = call_in_thread(app, view, results)
+    assert started.wait(5)
+    timeouts = vms.request_flights.stats['wait_timeouts']
+
+    with app.test_request_context('/api/report/?period=week'):
+        response = view()
+    release.set()
+    leader.join(5)
+
+    assert len(calls) == 2
+    assert response.status_code == 202
+    assert vms.request_flights.stats['wait_timeouts'] == timeouts + 1
@@ -0,0 +1,62 @@
+import pytest
+
+import app as vms
+
+
+@pytest.fixture
+def statements(app):
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = vms.db.engine
+    vms.db.event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    vms.db.event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def seeded(app, login):
+    v1 = login('v1')
+    team_id = v1.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    v1.post('/api/volunteers/work-logs/create/', json={'date': '2026-02-01', 'hours_worked': 2,
+                                                       'description': 'Sorting donations'})
+    v1.post('/api/projects/create/', json={'title': 'Book drive', 'description': 'Collect books',
+                                           'is_team_project': True, 'team_id': team_id})
+    return team_id
+
+
+def test_work_log_fields_prune_rows_and_columns(seeded, login, statements):
+    admin = login('admin')
+    statements.clear()
+    logs = admin.get('/api/volunteers/work-logs/?fields=id,hours_worked').get_json()['work_logs']
+    assert logs == [{'id': logs[0]['id'], 'hours_worked': 2}]
+    selects = [s for s in statements if 'FROM work_log' in s]
+    assert selects and not [s for s in selects if 'work_log.description' in s]
+
+    logs = admin.get('/api/volunteers/work-logs/?fields=status,volunteer').get_json()['work_logs']
+    assert logs[0]['status'] == 'pending'
+    assert logs[0]['volunteer'] == 'v1'
+    assert 'description' not in logs[0]
+
+
+def test_project_fields_prune_rows_and_columns(seeded, login, statements):
+    admin = login('admin')
+    statements.clear()
+    projects = admin.get('/api/projects/?fields=id,title').get_json()['projects']
+    assert [set(project) for project in projects] == [{'id', 'title'}]
+    assert not [s for s in statements if 'FROM project' in s and 'project.description' in s]
+
+
+@pytest.mark.parametrize('path', [
+    '/api/volunteers/work-logs/',
+    '/api/projects/',
+    '/api/teams/{team_id}/projects/',
+    '/api/teams/{team_id}/work-logs/',
+])
+def test_unknown_fields_are_rejected(seeded, login, path):
+    response = login('v1').get(path.format(team_id=seeded) + '?fields=id,password_hash')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Unknown fields: password_hash'
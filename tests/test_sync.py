@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+import app as vms
+
+
+def upload(client, **fields):
+    response = client.post('/api/volunteers/documents/upload/', json=dict(
+        title='Consent form', drive_link='https://drive.google.com/file/d/x', **fields))
+    assert response.status_code == 200, response.data
+    return response.get_json()['document_id']
+
+
+def test_document_tombstones_reach_only_its_audience(app, login):
+    owner, outsider = login('v1'), login('v2')
+    team_id = owner.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    document_id = upload(owner)
+
+    token = outsider.get('/api/sync/').get_json()['token']
+    owner_token = owner.get('/api/sync/').get_json()['token']
+    assert owner.delete(f'/api/volunteers/documents/{document_id}/delete/').status_code == 200
+
+    assert document_id in owner.get(f'/api/sync/?since={owner_token}').get_json()['deleted']['documents']
+    assert 'documents' not in outsider.get(f'/api/sync/?since={token}').get_json()['deleted']
+
+    with app.app_context():
+        owner_id = vms.User.query.filter_by(username='v1').first().id
+        tombstones = vms.SyncTombstone.query.filter_by(entity='documents', entity_id=document_id).all()
+        assert {(row.user_id, row.team_id) for row in tombstones} == {(owner_id, None), (owner_id, team_id)}
+
+
+def test_sharing_a_document_resends_it(app, login):
+    admin, volunteer = login('admin'), login('v1')
+    team_id = volunteer.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    document_id = upload(admin)
+
+    with app.app_context():
+        # Age the row past the sync overlap so only a fresh updated_at resends it
+        vms.Document.query.filter_by(id=document_id).update(
+            {'updated_at': vms.datetime.utcnow() - timedelta(hours=1)}, synchronize_session=False)
+        vms.db.session.commit()
+    token = vms.encode_sync_token(vms.datetime.utcnow() - timedelta(minutes=1))
+    assert volunteer.get(f'/api/sync/?since={token}').get_json()['documents'] == []
+
+    with app.app_context():
+        vms.db.session.add(vms.DocumentTeamAccess(document_id=document_id, team_id=team_id))
+        vms.db.session.commit()
+
+    documents = volunteer.get(f'/api/sync/?since={token}').get_json()['documents']
+    assert [(doc['id'], doc['team_ids']) for doc in documents] == [(document_id, [team_id])]
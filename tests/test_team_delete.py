@@ -0,0 +1,86 @@
+import app as vms
+
+
+def test_team_events_block_then_go_with_the_team(app, login):
+    leader = login('v1')
+    team_id = leader.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    event_id = leader.post('/api/events/create/', json={'title': 'Crew drive', 'date': '2026-03-01', 'hours': 2,
+                                                        'team_id': team_id}).get_json()['event_id']
+    assert leader.post(f'/api/events/{event_id}/attendees/', json={'members': ['v1', 'v2']}).status_code == 200
+
+    dry_run = leader.delete(f'/api/teams/{team_id}/delete/?dry_run=1').get_json()
+    assert dry_run['deletable'] is False
+    assert dry_run['impact']['blocking_events'] == 1
+    assert leader.delete(f'/api/teams/{team_id}/delete/').status_code == 400
+
+    assert leader.post(f'/api/events/{event_id}/close/').status_code == 200
+    dry_run = leader.delete(f'/api/teams/{team_id}/delete/?dry_run=1').get_json()
+    assert dry_run['deletable'] is True
+    assert (dry_run['impact']['events'], dry_run['impact']['event_attendees']) == (1, 2)
+
+    assert leader.delete(f'/api/teams/{team_id}/delete/').status_code == 200
+    with app.app_context():
+        assert vms.Event.query.filter_by(team_id=team_id).count() == 0
+        assert vms.EventAttendee.query.filter_by(event_id=event_id).count() == 0
+        assert vms.WorkLog.query.filter(vms.WorkLog.description.like('Attended event:%')).count() == 2
+
+
+def row_counts():
+    return {name: model.query.count() for name, model in (
+        ('members', vms.TeamMember), ('document_shares', vms.DocumentTeamAccess), ('documents', vms.Document),
+        ('project_updates', vms.ProjectUpdate), ('projects', vms.Project), ('events', vms.Event),
+        ('event_attendees', vms.EventAttendee))}
+
+
+def removed(before, after):
+    return {name: before[name] - after[name] for name in before if before[name] != after[name]}
+
+
+def test_project_dry_run_matches_the_delete(app, login):
+    owner = login('v1')
+    team_id = owner.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    project_id = owner.post('/api/projects/create/', json={'title': 'Book drive', 'description': 'Collect books',
+                                                           'is_team_project': True, 'team_id': team_id}
+                            ).get_json()['project_id']
+    for title in ('Week 1', 'Week 2'):
+        owner.post(f'/api/projects/{project_id}/updates/create/', json={'title': title, 'description': 'Progress'})
+    document_id = owner.post('/api/volunteers/documents/upload/', json={
+        'title': 'Plan', 'drive_link': 'https://drive.google.com/p', 'project_id': project_id}).get_json()['document_id']
+    with app.app_context():
+        vms.db.session.add(vms.DocumentTeamAccess(document_id=document_id, team_id=team_id))
+        vms.db.session.commit()
+
+    outsider = login('v2').delete(f'/api/projects/{project_id}/delete/?dry_run=1').get_json()
+    assert outsider['deletable'] is False
+    assert login('v2').delete(f'/api/projects/{project_id}/delete/').status_code == 403
+
+    dry_run = owner.delete(f'/api/projects/{project_id}/delete/?dry_run=1').get_json()
+    assert dry_run['deletable'] is True
+    assert dry_run['impact'] == {'project_updates': 2, 'documents': 1, 'document_shares': 1}
+    with app.app_context():
+        before = row_counts()
+    assert owner.delete(f'/api/projects/{project_id}/delete/').status_code == 200
+    with app.app_context():
+        assert removed(before, row_counts()) == dict(dry_run['impact'], projects=1)
+
+
+def test_team_dry_run_matches_the_delete(app, login):
+    leader = login('v1')
+    team_id = leader.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    login('v2').post(f'/api/teams/{team_id}/join/')
+    login('admin').post('/api/volunteers/documents/upload/', json={
+        'title': 'Rota', 'drive_link': 'https://drive.google.com/rota', 'team_ids': [team_id]})
+    event_id = leader.post('/api/events/create/', json={'title': 'Crew drive', 'date': '2026-03-01', 'hours': 2,
+                                                        'team_id': team_id}).get_json()['event_id']
+    leader.post(f'/api/events/{event_id}/attendees/', json={'members': ['v1', 'v2']})
+    leader.post(f'/api/events/{event_id}/close/')
+
+    impact = leader.delete(f'/api/teams/{team_id}/delete/?dry_run=1').get_json()['impact']
+    assert impact == {'members': 2, 'document_shares': 1, 'events': 1, 'event_attendees': 2,
+                      'blocking_projects': 0, 'blocking_events': 0}
+    with app.app_context():
+        before = row_counts()
+    assert leader.delete(f'/api/teams/{team_id}/delete/').status_code == 200
+    with app.app_context():
+        assert removed(before, row_counts()) == {
+            name: count for name, count in impact.items() if not name.startswith('blocking_')}
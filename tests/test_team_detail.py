@@ -0,0 +1,61 @@
+import pytest
+
+import app as vms
+
+SECTION_URLS = {
+    'members': 'members',
+    'projects': 'projects',
+    'work_logs': 'work-logs',
+    'documents': 'documents',
+    'stats': 'stats',
+    'member_hours': 'member-hours',
+}
+
+
+@pytest.fixture
+def team(app, login):
+    leader, member = login('v1'), login('v2')
+    team_id = leader.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    assert member.post(f'/api/teams/{team_id}/join/').status_code == 200
+    for client, day, hours in ((leader, '2026-02-01', 2), (member, '2026-02-03', 3.5)):
+        assert client.post('/api/volunteers/work-logs/create/', json={
+            'date': day, 'hours_worked': hours, 'description': 'Sorting donations'}).status_code == 200
+    assert leader.post('/api/projects/create/', json={'title': 'Book drive', 'description': 'Collect books',
+                                                      'is_team_project': True, 'team_id': team_id}).status_code == 200
+    login('admin').post('/api/volunteers/documents/upload/', json={
+        'title': 'Rota', 'drive_link': 'https://drive.google.com/rota', 'team_ids': [team_id]})
+    return team_id, leader
+
+
+def test_detail_sections_match_the_single_section_endpoints(team):
+    team_id, leader = team
+    detail = leader.get(f'/api/teams/{team_id}/detail/').get_json()
+    assert set(detail) == {'team'} | set(SECTION_URLS)
+    assert detail['team']['member_count'] == 2
+
+    for section, path in SECTION_URLS.items():
+        single = leader.get(f'/api/teams/{team_id}/{path}/').get_json()
+        assert detail[section] == (single if section == 'stats' else single[section]), section
+
+
+def test_detail_serves_what_the_team_page_reads(team):
+    team_id, leader = team
+    # TeamDetail.js asks for exactly these sections
+    detail = leader.get(f'/api/teams/{team_id}/detail/?sections=members,documents,work_logs').get_json()
+    assert set(detail) == {'team', 'members', 'documents', 'work_logs'}
+    assert sorted(member['username'] for member in detail['members']) == ['v1', 'v2']
+    assert len(detail['work_logs']) == 2
+    assert [document['title'] for document in detail['documents']] == ['Rota']
+
+
+def test_detail_rejects_unknown_sections_and_outsiders(team, login):
+    team_id, leader = team
+    response = leader.get(f'/api/teams/{team_id}/detail/?sections=members,payroll')
+    assert response.status_code == 400
+    assert 'payroll' in response.get_json()['error']
+
+    with vms.app.app_context():
+        vms.db.session.add(vms.User(username='v3', email='v3@example.org', role='volunteer',
+                                    password_hash=vms.generate_password_hash('pw', method='pbkdf2:sha256:1')))
+        vms.db.session.commit()
+    assert login('v3').get(f'/api/teams/{team_id}/detail/').status_code == 403
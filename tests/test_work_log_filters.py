@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+
+import app as vms
+
+
+@pytest.fixture
+def logs(app, login):
+    leader = login('v1')
+    team_id = leader.post('/api/teams/create/', json={'name': 'Drive crew'}).get_json()['team_id']
+    with app.app_context():
+        v1, v2 = (vms.User.query.filter_by(username=name).first().id for name in ('v1', 'v2'))
+        for volunteer_id, day, hours, status in (
+            (v1, date(2026, 1, 5), 1, 'approved'),
+            (v1, date(2026, 1, 20), 3, 'pending'),
+            (v1, date(2026, 2, 1), 5, 'rejected'),
+            (v2, date(2026, 1, 10), 2, 'approved'),
+            (v2, date(2026, 2, 15), 4, 'pending'),
+        ):
+            vms.db.session.add(vms.WorkLog(volunteer_id=volunteer_id, date=day, hours_worked=hours,
+                                           description='Sorting donations', status=status))
+        vms.db.session.add(vms.ArchivedWorkLog(id=10_000, volunteer_id=v1, date=date(2015, 6, 1), hours_worked=6,
+                                               description='Old drive', status='approved'))
+        vms.db.session.commit()
+    return team_id, v1
+
+
+def listed(client, query):
+    rows = client.get(f'/api/volunteers/work-logs/?fields=hours_worked&{query}').get_json()['work_logs']
+    count = client.get(f'/api/volunteers/work-logs/?count=1&{query}').get_json()['count']
+    assert count == len(rows), query
+    return sorted(row['hours_worked'] for row in rows)
+
+
+@pytest.mark.parametrize('query, hours', [
+    ('', [1, 2, 3, 4, 5, 6]),
+    ('start_date=2026-01-10&end_date=2026-02-01', [2, 3, 5]),
+    ('status=pending,rejected', [3, 4, 5]),
+    ('status=approved', [1, 2, 6]),
+    ('status=approved&start_date=2020-01-01', [1, 2]),
+    ('min_hours=2&max_hours=4', [2, 3, 4]),
+    ('team_id={team_id}', [1, 3, 5, 6]),
+    ('volunteer_id={v1}&end_date=2026-01-31', [1, 3, 6]),
+])
+def test_admin_filters_and_count_agree(logs, login, query, hours):
+    team_id, v1 = logs
+    assert listed(login('admin'), query.format(team_id=team_id, v1=v1)) == hours
+
+
+def test_volunteers_only_filter_their_own_logs(logs, login):
+    team_id, _ = logs
+    volunteer = login('v2')
+    assert listed(volunteer, '') == [2, 4]
+    assert listed(volunteer, 'status=pending') == [4]
+    # team_id is an admin filter; volunteers stay scoped to themselves
+    assert listed(volunteer, f'team_id={team_id}') == [2, 4]
+
+
+@pytest.mark.parametrize('query', ['start_date=2026-13-01', 'status=lost', 'min_hours=many'])
+def test_invalid_filters_are_rejected(logs, login, query):
+    admin = login('admin')
+    assert admin.get(f'/api/volunteers/work-logs/?{query}').status_code == 400
+    assert admin.get(f'/api/volunteers/work-logs/?count=1&{query}').status_code == 400
+
+
+def test_team_listing_filters_and_counts(logs, login):
+    team_id, _ = logs
+    leader = login('v1')
+    rows = leader.get(f'/api/teams/{team_id}/work-logs/?status=approved,pending').get_json()['work_logs']
+    assert sorted(row['hours_worked'] for row in rows) == [1, 3, 6]
+    assert leader.get(f'/api/teams/{team_id}/work-logs/?status=approved,pending&count=1').get_json() == {'count': 3}